@@ -1,20 +1,8 @@
 import streamlit as st
-from openai import OpenAI
-import sqlite3
-from fpdf import FPDF
-import base64
-from io import BytesIO
-import re
-import os
 
-# Configuración del cliente de OpenAI
-try:
-    client = OpenAI(api_key=st.secrets["OPENAI_API_KEY"])
-    st.session_state['openai_configured'] = True
-except Exception as e:
-    st.error(f"Error al configurar OpenAI: {str(e)}")
-    st.session_state['openai_configured'] = False
-    client = None
+from calculadora.analisis import proyectar_retiro
+from calculadora.interfaz import boton_pdf, configurar_ia, consultar_ia, crear_base_datos, registrar_usuario
+from calculadora.moneda import format_currency, parse_currency
 
 # Configuración inicial de la página con estilos personalizados
 st.set_page_config(
@@ -24,6 +12,12 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+# Cliente de OpenAI: uno por proceso, se crea al primer uso (ver calculadora/ia.py)
+configurar_ia()
+
+# Título y subtítulo del reporte PDF de esta variante
+ENCABEZADO_PDF = ("Informe Financiero Personalizado", "Analista IA Financiero Carlos Devis")
+
 # Estilos CSS personalizados para el formato de calculadora financiera
 def load_css():
     st.markdown("""
@@ -165,125 +159,15 @@ def load_css():
     </style>
     """, unsafe_allow_html=True)
 
-# Función para formatear números como moneda
-def format_currency(value):
-    return f"${value:,.2f}" if value else "$0.00"
-
-# Función para extraer el valor numérico de un string de moneda
-def parse_currency(currency_str):
-    if not currency_str:
-        return 0.0
-    # Eliminar símbolos de moneda y comas
-    num_str = re.sub(r'[^\d.]', '', currency_str)
-    return float(num_str) if num_str else 0.0
-
-# Función para generar PDF
-def generate_pdf(usuario_data, finanzas_data, analisis_data):
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font("Arial", size=12)
-    
-    # Encabezado
-    pdf.set_font("Arial", 'B', 16)
-    pdf.cell(200, 10, txt="Informe Financiero Personalizado", ln=1, align='C')
-    pdf.set_font("Arial", 'B', 14)
-    pdf.cell(200, 10, txt="Analista IA Financiero Carlos Devis", ln=1, align='C')
-    pdf.ln(10)
-    
-    # Datos personales
-    pdf.set_font("Arial", 'B', 12)
-    pdf.cell(200, 10, txt="Datos Personales:", ln=1)
-    pdf.set_font("Arial", size=12)
-    pdf.cell(200, 10, txt=f"Nombre: {usuario_data.get('nombre', '')}", ln=1)
-    pdf.cell(200, 10, txt=f"Edad: {usuario_data.get('edad', '')}", ln=1)
-    pdf.cell(200, 10, txt=f"Email: {usuario_data.get('email', '')}", ln=1)
-    pdf.ln(5)
-    
-    # Datos financieros
-    pdf.set_font("Arial", 'B', 12)
-    pdf.cell(200, 10, txt="Situación Financiera:", ln=1)
-    pdf.set_font("Arial", size=12)
-    pdf.cell(200, 10, txt=f"Ingresos Mensuales: {format_currency(finanzas_data.get('ingresos', 0))}", ln=1)
-    pdf.cell(200, 10, txt=f"Gastos Mensuales: {format_currency(finanzas_data.get('gastos', 0))}", ln=1)
-    pdf.cell(200, 10, txt=f"Activos Totales: {format_currency(finanzas_data.get('activos', 0))}", ln=1)
-    pdf.cell(200, 10, txt=f"Pasivos Totales: {format_currency(finanzas_data.get('pasivos', 0))}", ln=1)
-    pdf.ln(5)
-    
-    # Análisis
-    pdf.set_font("Arial", 'B', 12)
-    pdf.cell(200, 10, txt="Análisis y Recomendaciones:", ln=1)
-    pdf.set_font("Arial", size=12)
-    pdf.multi_cell(0, 10, txt=analisis_data.get('resumen', ''))
-    pdf.ln(5)
-    
-    # Plan de trabajo
-    if 'plan_trabajo' in analisis_data:
-        pdf.set_font("Arial", 'B', 12)
-        pdf.cell(200, 10, txt="Plan de Trabajo Personalizado:", ln=1)
-        pdf.set_font("Arial", size=12)
-        pdf.multi_cell(0, 10, txt=analisis_data['plan_trabajo'])
-    
-    # Generar el PDF en memoria
-    pdf_output = BytesIO()
-    pdf.output(pdf_output)
-    pdf_bytes = pdf_output.getvalue()
-    pdf_output.close()
-    
-    return pdf_bytes
-
-# Crear la base de datos y la tabla de usuarios
-def crear_base_datos():
-    conn = sqlite3.connect('usuarios.db')
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS usuarios (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nombre TEXT,
-            edad INTEGER,
-            email TEXT,
-            telefono TEXT
-        )
-    ''')
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS finanzas (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            usuario_id INTEGER,
-            ingresos_mensuales REAL,
-            gastos_mensuales REAL,
-            activos_totales REAL,
-            pasivos_totales REAL,
-            FOREIGN KEY(usuario_id) REFERENCES usuarios(id)
-        )
-    ''')
-    conn.commit()
-    conn.close()
-
-# Registrar un nuevo usuario
-def registrar_usuario(nombre, edad, email, telefono):
-    if edad < 18:
-        st.warning("Debes ser mayor de 18 años para usar este programa.")
-        return None
-    conn = sqlite3.connect('usuarios.db')
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO usuarios (nombre, edad, email, telefono)
-        VALUES (?, ?, ?, ?)
-    ''', (nombre, edad, email, telefono))
-    usuario_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
-    return usuario_id
-
 # Función para analizar la proyección de retiro
 def analizar_proyeccion_retiro(edad_actual, edad_retiro, ingresos_retiro, gastos_retiro, ahorros_retiro):
-    años_ahorro = edad_retiro - edad_actual
-    necesidad_total = (ingresos_retiro - gastos_retiro) * (100 - edad_retiro)  # Estimación simplificada
-    ahorro_necesario_anual = (necesidad_total - ahorros_retiro) / años_ahorro if años_ahorro > 0 else 0
+    proyeccion = proyectar_retiro(edad_actual, edad_retiro, ingresos_retiro, gastos_retiro, ahorros_retiro)
+    años_ahorro = proyeccion["años_ahorro"]
+    necesidad_total = proyeccion["necesidad_total"]
+    ahorro_necesario_anual = proyeccion["ahorro_necesario_anual"]
     
     return {
-        "años_ahorro": años_ahorro,
-        "necesidad_total": necesidad_total,
-        "ahorro_necesario_anual": ahorro_necesario_anual,
+        **proyeccion,
         "analisis": f"""
         Proyección de Retiro:
         - Años hasta el retiro: {años_ahorro}
@@ -381,20 +265,13 @@ def generar_plan_trabajo(ingresos, gastos, activos, pasivos):
     Respuesta en español.
     """
     
-    try:
-        with st.spinner('Generando tu plan personalizado...'):
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "Eres un asesor financiero experto que ayuda a personas a mejorar sus finanzas personales. Responde en español."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7
-            )
-        return response.choices[0].message.content
-    except Exception as e:
-        st.error(f"Error al generar el plan: {str(e)}")
-        return "No se pudo generar el plan en este momento."
+    return consultar_ia(
+        "Eres un asesor financiero experto que ayuda a personas a mejorar sus finanzas personales. Responde en español.",
+        prompt,
+        spinner='Generando tu plan personalizado...',
+        error="Error al generar el plan",
+        respaldo="No se pudo generar el plan en este momento."
+    )
 
 # Interfaz principal de Streamlit
 def main():
@@ -709,19 +586,7 @@ def main():
     
     # Botón para descargar PDF
     if 'reporte_data' in st.session_state and st.session_state['reporte_data']['usuario']:
-        if st.button("📄 Descargar Reporte Completo en PDF"):
-            pdf_bytes = generate_pdf(
-                st.session_state['reporte_data']['usuario'],
-                st.session_state['reporte_data']['finanzas'],
-                st.session_state['reporte_data']['analisis']
-            )
-            
-            st.success("Reporte generado con éxito!")
-            
-            # Crear enlace de descarga
-            b64 = base64.b64encode(pdf_bytes).decode()
-            href = f'<a href="data:application/octet-stream;base64,{b64}" download="reporte_financiero.pdf">Haz clic aquí para descargar tu reporte</a>'
-            st.markdown(href, unsafe_allow_html=True)
+        boton_pdf(st.session_state['reporte_data'], "📄 Descargar Reporte Completo en PDF", "reporte_financiero.pdf", ENCABEZADO_PDF)
     
     # Pie de página
     st.markdown("---")
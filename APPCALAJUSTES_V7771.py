@@ -1,11 +1,8 @@
 import streamlit as st
-from openai import OpenAI
-import sqlite3
-from fpdf import FPDF
-import base64
-from io import BytesIO
-import re
-import os
+
+from calculadora.analisis import ETIQUETAS_NIVEL, nivel_inversion, proyectar_retiro
+from calculadora.interfaz import boton_pdf, completar_ia, configurar_ia, crear_base_datos, registrar_usuario
+from calculadora.moneda import format_currency, parse_currency
 
 # Configuración inicial de la página
 st.set_page_config(
@@ -15,22 +12,15 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+# Cliente de OpenAI: uno por proceso, se crea al primer uso (ver calculadora/ia.py)
+configurar_ia()
+
+# Título y subtítulo del reporte PDF de esta variante
+ENCABEZADO_PDF = ("Informe Financiero", "Taller de Bienes Raíces")
+
 # Logo en base64 (aaaaa.png)
 LOGO_BASE64 = "iVBORw0KGgoAAAANSUhEUgAAABAAAAAQCAYAAAAf8/9hAAAABmJLR0QA/wD/AP+gvaeTAAAACXBIWXMAAAsTAAALEwEAmpwYAAAAB3RJTUUH4AkEEjIZJ3zJ9QAAAB1pVFh0Q29tbWVudAAAAAAAQ3JlYXRlZCB3aXRoIEdJTVBkLmUHAAAAJklEQVQ4y2NgGAWjYBSMglEwCkbBKBgFgw0wQjVfYGBg+D8QNQEAL1QBdQdXg0QAAAAASUVORK5CYII="
 
-# Configuración del cliente de OpenAI
-client = None
-if 'OPENAI_API_KEY' in st.secrets:
-    try:
-        client = OpenAI(api_key=st.secrets["OPENAI_API_KEY"])
-        st.session_state['openai_configured'] = True
-    except Exception as e:
-        st.error(f"Error al configurar OpenAI: {str(e)}")
-        st.session_state['openai_configured'] = False
-else:
-    st.warning("Funcionalidad de IA limitada - No se configuró OPENAI_API_KEY")
-    st.session_state['openai_configured'] = False
-
 # Estilos CSS personalizados
 def load_css():
     st.markdown("""
@@ -214,15 +204,6 @@ def show_header():
     """, unsafe_allow_html=True)
 
 # Funciones auxiliares
-def format_currency(value):
-    return f"${value:,.2f}" if value else "$0.00"
-
-def parse_currency(currency_str):
-    if not currency_str:
-        return 0.0
-    num_str = re.sub(r'[^\d.]', '', currency_str)
-    return float(num_str) if num_str else 0.0
-
 def help_tooltip(text):
     st.markdown(f"""
     <span class="help-icon" tabindex="0">?
@@ -230,77 +211,32 @@ def help_tooltip(text):
     </span>
     """, unsafe_allow_html=True)
 
-# Funciones de base de datos
-def crear_base_datos():
-    conn = sqlite3.connect('usuarios.db')
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS usuarios (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nombre TEXT,
-            edad INTEGER,
-            email TEXT,
-            telefono TEXT
-        )
-    ''')
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS finanzas (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            usuario_id INTEGER,
-            ingresos_mensuales REAL,
-            gastos_mensuales REAL,
-            activos_totales REAL,
-            pasivos_totales REAL,
-            FOREIGN KEY(usuario_id) REFERENCES usuarios(id)
-        )
-    ''')
-    conn.commit()
-    conn.close()
-
-def registrar_usuario(nombre, edad, email, telefono):
-    if edad < 18:
-        st.warning("Debes ser mayor de 18 años para usar este programa.")
-        return None
-    conn = sqlite3.connect('usuarios.db')
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO usuarios (nombre, edad, email, telefono)
-        VALUES (?, ?, ?, ?)
-    ''', (nombre, edad, email, telefono))
-    usuario_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
-    return usuario_id
-
 # Funciones de análisis financiero
 def analizar_proyeccion_retiro(edad_actual, edad_retiro, ingresos_retiro, gastos_retiro, ahorros_retiro, patrimonio_neto, flujo_caja):
-    años_ahorro = edad_retiro - edad_actual
-    necesidad_total = (ingresos_retiro - gastos_retiro) * (100 - edad_retiro)
-    ahorro_necesario_anual = (necesidad_total - ahorros_retiro) / años_ahorro if años_ahorro > 0 else 0
+    proyeccion = proyectar_retiro(edad_actual, edad_retiro, ingresos_retiro, gastos_retiro, ahorros_retiro)
+    años_ahorro = proyeccion["años_ahorro"]
+    necesidad_total = proyeccion["necesidad_total"]
+    ahorro_necesario_anual = proyeccion["ahorro_necesario_anual"]
     
-    if patrimonio_neto > 50000 and flujo_caja > 1000:
-        nivel = "Alto (70-100%)"
+    nivel = ETIQUETAS_NIVEL[nivel_inversion(patrimonio_neto, flujo_caja)]
+    if nivel.startswith("Alto"):
         recomendaciones = [
             "Excelente perfil para inversión en bienes raíces.",
             "Considera propiedades generadoras de ingresos pasivos."
         ]
-    elif patrimonio_neto > 20000 and flujo_caja > 500:
-        nivel = "Medio (40-69%)"
+    elif nivel.startswith("Medio"):
         recomendaciones = [
             "Buen potencial para inversión en bienes raíces.",
             "Considera comenzar con propiedades pequeñas."
         ]
     else:
-        nivel = "Bajo (0-39%)"
         recomendaciones = [
             "Enfócate en aumentar ingresos y reducir deudas.",
             "Considera cursos básicos de educación financiera."
         ]
     
     return {
-        "años_ahorro": años_ahorro,
-        "necesidad_total": necesidad_total,
-        "ahorro_necesario_anual": ahorro_necesario_anual,
+        **proyeccion,
         "nivel_inversion": nivel,
         "analisis": f"""
         Proyección de Retiro:
@@ -319,14 +255,14 @@ def analizar_situacion_financiera(ingresos, gastos, activos, pasivos):
     flujo_caja_mensual = ingresos - gastos
     patrimonio_neto = activos - pasivos
     
-    if patrimonio_neto > 50000 and flujo_caja_mensual > 1000:
-        perfil = "Alto (70-100%)"
+    nivel = nivel_inversion(patrimonio_neto, flujo_caja_mensual)
+    perfil = ETIQUETAS_NIVEL[nivel]
+    
+    if nivel == "Alto":
         descripcion = "Excelente perfil para inversión en bienes raíces."
-    elif patrimonio_neto > 20000 and flujo_caja_mensual > 500:
-        perfil = "Medio (40-69%)"
+    elif nivel == "Medio":
         descripcion = "Buen potencial para inversión en bienes raíces."
     else:
-        perfil = "Bajo (0-39%)"
         descripcion = "Enfócate en mejorar tu situación financiera."
     
     return {
@@ -364,62 +300,10 @@ def generar_plan_trabajo(ingresos, gastos, activos, pasivos):
     """
     
     try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "Eres un asesor experto en bienes raíces."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7
-        )
-        return response.choices[0].message.content
+        return completar_ia("Eres un asesor experto en bienes raíces.", prompt)
     except Exception as e:
         return f"Error al generar el plan: {str(e)}"
 
-def generate_pdf(usuario_data, finanzas_data, analisis_data):
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font("Arial", size=12)
-    
-    pdf.set_font("Arial", 'B', 16)
-    pdf.cell(200, 10, txt="Informe Financiero", ln=1, align='C')
-    pdf.cell(200, 10, txt="Taller de Bienes Raíces", ln=1, align='C')
-    pdf.ln(10)
-    
-    pdf.set_font("Arial", 'B', 12)
-    pdf.cell(200, 10, txt="Datos Personales:", ln=1)
-    pdf.set_font("Arial", size=12)
-    pdf.cell(200, 10, txt=f"Nombre: {usuario_data.get('nombre', '')}", ln=1)
-    pdf.cell(200, 10, txt=f"Email: {usuario_data.get('email', '')}", ln=1)
-    pdf.ln(5)
-    
-    pdf.set_font("Arial", 'B', 12)
-    pdf.cell(200, 10, txt="Situación Financiera:", ln=1)
-    pdf.set_font("Arial", size=12)
-    pdf.cell(200, 10, txt=f"Ingresos: {format_currency(finanzas_data.get('ingresos', 0))}/mes", ln=1)
-    pdf.cell(200, 10, txt=f"Gastos: {format_currency(finanzas_data.get('gastos', 0))}/mes", ln=1)
-    pdf.cell(200, 10, txt=f"Patrimonio: {format_currency(finanzas_data.get('activos', 0) - finanzas_data.get('pasivos', 0))}", ln=1)
-    pdf.ln(5)
-    
-    if 'perfil_inversion' in analisis_data:
-        pdf.set_font("Arial", 'B', 12)
-        pdf.cell(200, 10, txt=f"Perfil: {analisis_data['perfil_inversion']['nivel']}", ln=1)
-        pdf.set_font("Arial", size=12)
-        pdf.multi_cell(0, 10, txt=analisis_data['perfil_inversion']['descripcion'])
-        pdf.ln(5)
-    
-    if 'plan_trabajo' in analisis_data:
-        pdf.set_font("Arial", 'B', 12)
-        pdf.cell(200, 10, txt="Plan de Trabajo:", ln=1)
-        pdf.set_font("Arial", size=12)
-        pdf.multi_cell(0, 10, txt=analisis_data['plan_trabajo'])
-    
-    pdf_output = BytesIO()
-    pdf.output(pdf_output)
-    pdf_bytes = pdf_output.getvalue()
-    pdf_output.close()
-    return pdf_bytes
-
 # Interfaz principal
 def main():
     load_css()
@@ -633,17 +517,7 @@ def main():
     
     # Generar PDF
     if 'reporte_data' in st.session_state and st.session_state['reporte_data']['usuario']:
-        if st.button("📄 Generar Reporte PDF"):
-            pdf_bytes = generate_pdf(
-                st.session_state['reporte_data']['usuario'],
-                st.session_state['reporte_data']['finanzas'],
-                st.session_state['reporte_data']['analisis']
-            )
-            
-            st.success("Reporte generado correctamente")
-            b64 = base64.b64encode(pdf_bytes).decode()
-            href = f'<a href="data:application/octet-stream;base64,{b64}" download="reporte_bienes_raices.pdf">Descargar PDF</a>'
-            st.markdown(href, unsafe_allow_html=True)
+        boton_pdf(st.session_state['reporte_data'], "📄 Generar Reporte PDF", "reporte_bienes_raices.pdf", ENCABEZADO_PDF)
 
 if __name__ == "__main__":
     crear_base_datos()
@@ -1,11 +1,8 @@
 import streamlit as st
-from openai import OpenAI
-import sqlite3
-from fpdf import FPDF
-import base64
-from io import BytesIO
-import re
-import os
+
+from calculadora.analisis import ETIQUETAS_NIVEL, nivel_inversion, proyectar_retiro
+from calculadora.interfaz import boton_pdf, configurar_ia, consultar_ia, crear_base_datos, registrar_usuario
+from calculadora.moneda import format_currency, parse_currency
 
 # Configuración inicial de la página DEBE SER LO PRIMERO
 st.set_page_config(
@@ -15,18 +12,8 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-# Configuración del cliente de OpenAI (versión segura)
-client = None
-if 'OPENAI_API_KEY' in st.secrets:
-    try:
-        client = OpenAI(api_key=st.secrets["OPENAI_API_KEY"])
-        st.session_state['openai_configured'] = True
-    except Exception as e:
-        st.error(f"Error al configurar OpenAI: {str(e)}")
-        st.session_state['openai_configured'] = False
-else:
-    st.warning("Funcionalidad de IA limitada - No se configuró OPENAI_API_KEY")
-    st.session_state['openai_configured'] = False
+# Cliente de OpenAI: uno por proceso, se crea al primer uso (ver calculadora/ia.py)
+configurar_ia()
 
 # Estilos CSS personalizados para el formato de calculadora financiera
 def load_css():
@@ -238,152 +225,27 @@ def load_css():
     </style>
     """, unsafe_allow_html=True)
 
-# Función para formatear números como moneda
-def format_currency(value):
-    return f"${value:,.2f}" if value else "$0.00"
-
-# Función para extraer el valor numérico de un string de moneda
-def parse_currency(currency_str):
-    if not currency_str:
-        return 0.0
-    # Eliminar símbolos de moneda y comas
-    num_str = re.sub(r'[^\d.]', '', currency_str)
-    return float(num_str) if num_str else 0.0
-
-# Función para generar PDF
-def generate_pdf(usuario_data, finanzas_data, analisis_data):
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font("Arial", size=12)
-    
-    # Encabezado
-    pdf.set_font("Arial", 'B', 16)
-    pdf.cell(200, 10, txt="Informe Financiero - Taller de Bienes Raíces", ln=1, align='C')
-    pdf.set_font("Arial", 'B', 14)
-    pdf.cell(200, 10, txt="Análisis de Inversión en Bienes Raíces", ln=1, align='C')
-    pdf.ln(10)
-    
-    # Datos personales
-    pdf.set_font("Arial", 'B', 12)
-    pdf.cell(200, 10, txt="Datos Personales:", ln=1)
-    pdf.set_font("Arial", size=12)
-    pdf.cell(200, 10, txt=f"Nombre: {usuario_data.get('nombre', '')}", ln=1)
-    pdf.cell(200, 10, txt=f"Edad: {usuario_data.get('edad', '')}", ln=1)
-    pdf.cell(200, 10, txt=f"Email: {usuario_data.get('email', '')}", ln=1)
-    pdf.ln(5)
-    
-    # Datos financieros
-    pdf.set_font("Arial", 'B', 12)
-    pdf.cell(200, 10, txt="Situación Financiera:", ln=1)
-    pdf.set_font("Arial", size=12)
-    pdf.cell(200, 10, txt=f"Ingresos Mensuales: {format_currency(finanzas_data.get('ingresos', 0))}", ln=1)
-    pdf.cell(200, 10, txt=f"Gastos Mensuales: {format_currency(finanzas_data.get('gastos', 0))}", ln=1)
-    pdf.cell(200, 10, txt=f"Activos Totales: {format_currency(finanzas_data.get('activos', 0))}", ln=1)
-    pdf.cell(200, 10, txt=f"Pasivos Totales: {format_currency(finanzas_data.get('pasivos', 0))}", ln=1)
-    pdf.ln(5)
-    
-    # Perfil de inversión
-    if 'perfil_inversion' in analisis_data:
-        pdf.set_font("Arial", 'B', 12)
-        pdf.cell(200, 10, txt=f"Perfil de Inversión en Bienes Raíces: {analisis_data['perfil_inversion']['nivel']}", ln=1)
-        pdf.set_font("Arial", size=12)
-        pdf.multi_cell(0, 10, txt=analisis_data['perfil_inversion']['descripcion'])
-        pdf.ln(5)
-    
-    # Análisis
-    pdf.set_font("Arial", 'B', 12)
-    pdf.cell(200, 10, txt="Análisis y Recomendaciones:", ln=1)
-    pdf.set_font("Arial", size=12)
-    pdf.multi_cell(0, 10, txt=analisis_data.get('resumen', ''))
-    pdf.ln(5)
-    
-    # Plan de trabajo
-    if 'plan_trabajo' in analisis_data:
-        pdf.set_font("Arial", 'B', 12)
-        pdf.cell(200, 10, txt="Plan de Trabajo Personalizado:", ln=1)
-        pdf.set_font("Arial", size=12)
-        pdf.multi_cell(0, 10, txt=analisis_data['plan_trabajo'])
-    
-    # Recomendaciones de cursos
-    if 'recomendaciones_cursos' in analisis_data:
-        pdf.set_font("Arial", 'B', 12)
-        pdf.cell(200, 10, txt="Recomendaciones de Educación Financiera:", ln=1)
-        pdf.set_font("Arial", size=12)
-        pdf.multi_cell(0, 10, txt=analisis_data['recomendaciones_cursos'])
-    
-    # Generar el PDF en memoria
-    pdf_output = BytesIO()
-    pdf.output(pdf_output)
-    pdf_bytes = pdf_output.getvalue()
-    pdf_output.close()
-    
-    return pdf_bytes
-
-# Crear la base de datos y la tabla de usuarios
-def crear_base_datos():
-    conn = sqlite3.connect('usuarios.db')
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS usuarios (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nombre TEXT,
-            edad INTEGER,
-            email TEXT,
-            telefono TEXT
-        )
-    ''')
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS finanzas (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            usuario_id INTEGER,
-            ingresos_mensuales REAL,
-            gastos_mensuales REAL,
-            activos_totales REAL,
-            pasivos_totales REAL,
-            FOREIGN KEY(usuario_id) REFERENCES usuarios(id)
-        )
-    ''')
-    conn.commit()
-    conn.close()
-
-# Registrar un nuevo usuario
-def registrar_usuario(nombre, edad, email, telefono):
-    if edad < 18:
-        st.warning("Debes ser mayor de 18 años para usar este programa.")
-        return None
-    conn = sqlite3.connect('usuarios.db')
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO usuarios (nombre, edad, email, telefono)
-        VALUES (?, ?, ?, ?)
-    ''', (nombre, edad, email, telefono))
-    usuario_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
-    return usuario_id
-
 # Función para analizar la proyección de retiro con enfoque en bienes raíces
 def analizar_proyeccion_retiro(edad_actual, edad_retiro, ingresos_retiro, gastos_retiro, ahorros_retiro, patrimonio_neto, flujo_caja):
-    años_ahorro = edad_retiro - edad_actual
-    necesidad_total = (ingresos_retiro - gastos_retiro) * (100 - edad_retiro)  # Estimación simplificada
-    ahorro_necesario_anual = (necesidad_total - ahorros_retiro) / años_ahorro if años_ahorro > 0 else 0
+    proyeccion = proyectar_retiro(edad_actual, edad_retiro, ingresos_retiro, gastos_retiro, ahorros_retiro)
+    años_ahorro = proyeccion["años_ahorro"]
+    necesidad_total = proyeccion["necesidad_total"]
+    ahorro_necesario_anual = proyeccion["ahorro_necesario_anual"]
     
     # Análisis específico para bienes raíces
     recomendaciones = []
     cursos_recomendados = []
     
-    if patrimonio_neto > 50000 and flujo_caja > 1000:
-        nivel = "Alto"
+    nivel = nivel_inversion(patrimonio_neto, flujo_caja)
+    if nivel == "Alto":
         recomendaciones.append("Tienes un excelente perfil para comenzar a invertir en bienes raíces de inmediato.")
         recomendaciones.append("Considera propiedades generadoras de ingresos pasivos como apartamentos en arriendo o locales comerciales.")
         cursos_recomendados.append("Curso Avanzado de Inversión en Bienes Raíces")
-    elif patrimonio_neto > 20000 and flujo_caja > 500:
-        nivel = "Medio"
+    elif nivel == "Medio":
         recomendaciones.append("Tienes potencial para inversión en bienes raíces, pero necesitas mejorar tu flujo de caja.")
         recomendaciones.append("Considera comenzar con propiedades pequeñas o co-inversiones.")
         cursos_recomendados.append("Curso Intermedio de Bienes Raíces")
     else:
-        nivel = "Bajo"
         recomendaciones.append("Necesitas fortalecer tu situación financiera antes de invertir en bienes raíces.")
         recomendaciones.append("Enfócate en aumentar tus ingresos y reducir deudas.")
         cursos_recomendados.append("Curso Básico de Educación Financiera para Bienes Raíces")
@@ -393,9 +255,7 @@ def analizar_proyeccion_retiro(edad_actual, edad_retiro, ingresos_retiro, gastos
     recomendaciones.append("- https://landing.tallerdebienesraices.com/registro-ciclo-educativo/")
     
     return {
-        "años_ahorro": años_ahorro,
-        "necesidad_total": necesidad_total,
-        "ahorro_necesario_anual": ahorro_necesario_anual,
+        **proyeccion,
         "nivel_inversion": nivel,
         "analisis": f"""
         Proyección de Retiro con Enfoque en Bienes Raíces:
@@ -419,9 +279,11 @@ def analizar_situacion_financiera(ingresos, gastos, activos, pasivos):
     flujo_caja_mensual = ingresos - gastos
     patrimonio_neto = activos - pasivos
     
+    nivel = nivel_inversion(patrimonio_neto, flujo_caja_mensual)
+    perfil = ETIQUETAS_NIVEL[nivel]
+    
     # Determinar perfil de inversión en bienes raíces con recomendaciones específicas
-    if patrimonio_neto > 50000 and flujo_caja_mensual > 1000:
-        perfil = "Alto (70-100%)"
+    if nivel == "Alto":
         descripcion = "Excelente perfil para inversión en bienes raíces. Tienes la capacidad financiera para comenzar a invertir en propiedades generadoras de ingresos pasivos."
         
         # Recomendaciones para perfil alto
@@ -439,8 +301,7 @@ def analizar_situacion_financiera(ingresos, gastos, activos, pasivos):
             </ol>
         </div>
         """
-    elif patrimonio_neto > 20000 and flujo_caja_mensual > 500:
-        perfil = "Medio (40-69%)"
+    elif nivel == "Medio":
         descripcion = "Buen potencial para inversión en bienes raíces. Considera comenzar con propiedades pequeñas o co-inversiones mientras mejoras tu flujo de caja."
         
         # Recomendaciones para perfil medio
@@ -459,7 +320,6 @@ def analizar_situacion_financiera(ingresos, gastos, activos, pasivos):
         </div>
         """
     else:
-        perfil = "Bajo (0-39%)"
         descripcion = "Necesitas fortalecer tu situación financiera antes de invertir en bienes raíces. Enfócate en aumentar ingresos, reducir deudas y ahorrar."
         
         # Recomendaciones para perfil bajo
@@ -575,20 +435,13 @@ def generar_plan_trabajo(ingresos, gastos, activos, pasivos):
     Respuesta en español.
     """
     
-    try:
-        with st.spinner('Generando tu plan personalizado para bienes raíces...'):
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "Eres un asesor experto en inversión en bienes raíces que sigue la metodología de Carlos Devis. Responde en español con enfoque práctico para inversión inmobiliaria."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7
-            )
-        return response.choices[0].message.content
-    except Exception as e:
-        st.error(f"Error al generar el plan: {str(e)}")
-        return "No se pudo generar el plan en este momento."
+    return consultar_ia(
+        "Eres un asesor experto en inversión en bienes raíces que sigue la metodología de Carlos Devis. Responde en español con enfoque práctico para inversión inmobiliaria.",
+        prompt,
+        spinner='Generando tu plan personalizado para bienes raíces...',
+        error="Error al generar el plan",
+        respaldo="No se pudo generar el plan en este momento."
+    )
 
 # Función para crear tooltip de ayuda con emoji
 def emoji_help_tooltip(text, emoji="🧠"):
@@ -1066,19 +919,7 @@ def main():
     
     # Botón para descargar PDF
     if 'reporte_data' in st.session_state and st.session_state['reporte_data']['usuario']:
-        if st.button("📄 Descargar Reporte Completo en PDF"):
-            pdf_bytes = generate_pdf(
-                st.session_state['reporte_data']['usuario'],
-                st.session_state['reporte_data']['finanzas'],
-                st.session_state['reporte_data']['analisis']
-            )
-            
-            st.success("Reporte generado con éxito!")
-            
-            # Crear enlace de descarga
-            b64 = base64.b64encode(pdf_bytes).decode()
-            href = f'<a href="data:application/octet-stream;base64,{b64}" download="reporte_bienes_raices.pdf">Haz clic aquí para descargar tu reporte</a>'
-            st.markdown(href, unsafe_allow_html=True)
+        boton_pdf(st.session_state['reporte_data'], "📄 Descargar Reporte Completo en PDF", "reporte_bienes_raices.pdf")
     
     # Pie de página
     st.markdown("---")
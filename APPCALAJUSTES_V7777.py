@@ -1,11 +1,11 @@
 import streamlit as st
-from openai import OpenAI
-import sqlite3
-from fpdf import FPDF
-import base64
-from io import BytesIO
-import re
-import os
+
+from calculadora.analisis import analizar_proyeccion_retiro
+from calculadora.interfaz import (
+    analizar_situacion_financiera, boton_pdf, configurar_ia, crear_base_datos, emoji_help_tooltip,
+    generar_plan_trabajo, registrar_usuario
+)
+from calculadora.moneda import format_currency, parse_currency
 
 # Configuración inicial de la página
 st.set_page_config(
@@ -15,18 +15,8 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-# Configuración del cliente de OpenAI
-client = None
-if 'OPENAI_API_KEY' in st.secrets:
-    try:
-        client = OpenAI(api_key=st.secrets["OPENAI_API_KEY"])
-        st.session_state['openai_configured'] = True
-    except Exception as e:
-        st.error(f"Error al configurar OpenAI: {str(e)}")
-        st.session_state['openai_configured'] = False
-else:
-    st.warning("Funcionalidad de IA limitada - No se configuró OPENAI_API_KEY")
-    st.session_state['openai_configured'] = False
+# Cliente de OpenAI: uno por proceso, se crea al primer uso (ver calculadora/ia.py)
+configurar_ia()
 
 # Estilos CSS personalizados
 def load_css():
@@ -173,329 +163,6 @@ def load_css():
     </style>
     """, unsafe_allow_html=True)
 
-# Funciones utilitarias
-def format_currency(value):
-    return f"${value:,.2f}" if value else "$0.00"
-
-def parse_currency(currency_str):
-    if not currency_str:
-        return 0.0
-    num_str = re.sub(r'[^\d.]', '', currency_str)
-    return float(num_str) if num_str else 0.0
-
-def emoji_help_tooltip(text, emoji="🧠"):
-    st.markdown(f"""
-    <span class="help-icon">
-        {emoji}
-        <span class="help-text">{text}</span>
-    </span>
-    """, unsafe_allow_html=True)
-
-# Funciones de base de datos
-def crear_base_datos():
-    conn = sqlite3.connect('usuarios.db')
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS usuarios (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nombre TEXT,
-            edad INTEGER,
-            email TEXT,
-            telefono TEXT
-        )
-    ''')
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS finanzas (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            usuario_id INTEGER,
-            ingresos_mensuales REAL,
-            gastos_mensuales REAL,
-            activos_totales REAL,
-            pasivos_totales REAL,
-            FOREIGN KEY(usuario_id) REFERENCES usuarios(id)
-        )
-    ''')
-    conn.commit()
-    conn.close()
-
-def registrar_usuario(nombre, edad, email, telefono):
-    if edad < 18:
-        st.warning("Debes ser mayor de 18 años para usar este programa.")
-        return None
-    conn = sqlite3.connect('usuarios.db')
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO usuarios (nombre, edad, email, telefono)
-        VALUES (?, ?, ?, ?)
-    ''', (nombre, edad, email, telefono))
-    usuario_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
-    return usuario_id
-
-# Funciones de análisis financiero
-def analizar_proyeccion_retiro(edad_actual, edad_retiro, ingresos_retiro, gastos_retiro, ahorros_retiro, patrimonio_neto, flujo_caja):
-    años_ahorro = edad_retiro - edad_actual
-    necesidad_total = (ingresos_retiro - gastos_retiro) * (100 - edad_retiro)
-    ahorro_necesario_anual = (necesidad_total - ahorros_retiro) / años_ahorro if años_ahorro > 0 else 0
-    
-    if patrimonio_neto > 50000 and flujo_caja > 1000:
-        nivel = "Alto"
-        recomendaciones = [
-            "Tienes un excelente perfil para comenzar a invertir en bienes raíces de inmediato.",
-            "Considera propiedades generadoras de ingresos pasivos como apartamentos en arriendo o locales comerciales."
-        ]
-        cursos_recomendados = ["Curso Avanzado de Inversión en Bienes Raíces"]
-    elif patrimonio_neto > 20000 and flujo_caja > 500:
-        nivel = "Medio"
-        recomendaciones = [
-            "Tienes potencial para inversión en bienes raíces, pero necesitas mejorar tu flujo de caja.",
-            "Considera comenzar con propiedades pequeñas o co-inversiones."
-        ]
-        cursos_recomendados = ["Curso Intermedio de Bienes Raíces"]
-    else:
-        nivel = "Bajo"
-        recomendaciones = [
-            "Necesitas fortalecer tu situación financiera antes de invertir en bienes raíces.",
-            "Enfócate en aumentar tus ingresos y reducir deudas."
-        ]
-        cursos_recomendados = ["Curso Básico de Educación Financiera para Bienes Raíces"]
-    
-    return {
-        "años_ahorro": años_ahorro,
-        "necesidad_total": necesidad_total,
-        "ahorro_necesario_anual": ahorro_necesario_anual,
-        "nivel_inversion": nivel,
-        "analisis": f"""
-        Proyección de Retiro con Enfoque en Bienes Raíces:
-        - Años hasta el retiro: {años_ahorro}
-        - Necesidad total estimada: {format_currency(necesidad_total)}
-        - Ahorros actuales: {format_currency(ahorros_retiro)}
-        - Necesitas ahorrar aproximadamente {format_currency(ahorro_necesario_anual)} anuales para alcanzar tu meta.
-        
-        Perfil de Inversión: {nivel}
-        
-        Recomendaciones Específicas:
-        {"\n".join(recomendaciones)}
-        
-        Cursos Recomendados:
-        {"\n".join(cursos_recomendados)}
-        """
-    }
-
-def analizar_situacion_financiera(ingresos, gastos, activos, pasivos):
-    flujo_caja_mensual = ingresos - gastos
-    patrimonio_neto = activos - pasivos
-    
-    if patrimonio_neto > 50000 and flujo_caja_mensual > 1000:
-        perfil = "Alto (70-100%)"
-        descripcion = "Excelente perfil para inversión en bienes raíces. Tienes la capacidad financiera para comenzar a invertir en propiedades generadoras de ingresos pasivos."
-        recomendaciones = mostrar_recomendacion_curso(
-            "🚀 Recomendación para tu Perfil Alto",
-            "Mentoría Avanzada en Tiendas Online",
-            "https://landing.carlosdevis.com/mentoria-tienda-online",
-            [
-                "Estrategias avanzadas de escalamiento",
-                "Automatización de procesos",
-                "Fuentes alternativas de ingreso"
-            ]
-        )
-    elif patrimonio_neto > 20000 and flujo_caja_mensual > 500:
-        perfil = "Medio (40-69%)"
-        descripcion = "Buen potencial para inversión en bienes raíces. Considera comenzar con propiedades pequeñas o co-inversiones mientras mejoras tu flujo de caja."
-        recomendaciones = mostrar_recomendacion_curso(
-            "📈 Recomendación para tu Perfil Medio",
-            "Programa Avanzado en Tiendas Online",
-            "https://landing.carlosdevis.com/cv-avanzado-tienda-online",
-            [
-                "Modelos de negocio probados",
-                "Tácticas de conversión",
-                "Fuentes de tráfico escalables"
-            ]
-        )
-    else:
-        perfil = "Bajo (0-39%)"
-        descripcion = "Necesitas fortalecer tu situación financiera antes de invertir en bienes raíces. Enfócate en aumentar ingresos, reducir deudas y ahorrar."
-        recomendaciones = mostrar_recomendacion_curso(
-            "📚 Recomendación para tu Perfil Bajo",
-            "Programa Avanzado en Tiendas Online",
-            "https://landing.carlosdevis.com/cv-avanzado-tienda-online",
-            [
-                "Fundamentos sólidos",
-                "Gestión financiera básica",
-                "Primeros pasos en digital"
-            ]
-        )
-    
-    # Mostrar métricas
-    st.subheader("📊 Análisis Resumen de tu Situación Financiera")
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.metric("Ingresos Mensuales", format_currency(ingresos))
-        st.metric("Gastos Mensuales", format_currency(gastos))
-        st.metric("Flujo de Caja Mensual", format_currency(flujo_caja_mensual), 
-                 delta="Positivo" if flujo_caja_mensual > 0 else "Negativo",
-                 delta_color="normal" if flujo_caja_mensual > 0 else "inverse")
-    
-    with col2:
-        st.metric("Activos Totales", format_currency(activos))
-        st.metric("Pasivos Totales", format_currency(pasivos))
-        st.metric("Patrimonio Neto", format_currency(patrimonio_neto), 
-                 delta="Positivo" if patrimonio_neto > 0 else "Negativo",
-                 delta_color="normal" if patrimonio_neto > 0 else "inverse")
-    
-    # Mostrar perfil y recomendaciones
-    st.subheader("🏡 Perfil de Inversión en Bienes Raíces")
-    st.markdown(f"**Nivel:** {perfil}")
-    st.markdown(descripcion)
-    
-    st.markdown(recomendaciones)
-    
-    # Análisis específico
-    st.subheader("🔍 Análisis Específico para Bienes Raíces")
-    if flujo_caja_mensual > 0:
-        st.success(f"Flujo de caja positivo de {format_currency(flujo_caja_mensual)}/mes. Podrías destinar parte de este excedente a inversión en propiedades.")
-    else:
-        st.error(f"Flujo de caja negativo de {format_currency(abs(flujo_caja_mensual))}/mes. Necesitas equilibrar tus finanzas antes de considerar inversiones.")
-    
-    if patrimonio_neto > 50000:
-        st.success("Patrimonio neto sólido. Podrías usar parte como garantía para financiamiento de propiedades.")
-    elif patrimonio_neto > 0:
-        st.warning("Patrimonio neto positivo pero modesto. Considera estrategias de bajo riesgo como alquiler de habitaciones.")
-    else:
-        st.error("Patrimonio neto negativo. Enfócate en reducir deudas antes de invertir.")
-    
-    return {
-        "flujo_caja": flujo_caja_mensual,
-        "patrimonio": patrimonio_neto,
-        "perfil_inversion": {"nivel": perfil, "descripcion": descripcion},
-        "resumen": f"""
-        Situación Financiera Actual:
-        - Ingresos Mensuales: {format_currency(ingresos)}
-        - Gastos Mensuales: {format_currency(gastos)}
-        - Flujo de Caja: {format_currency(flujo_caja_mensual)} ({'Positivo' if flujo_caja_mensual > 0 else 'Negativo'})
-        - Activos Totales: {format_currency(activos)}
-        - Pasivos Totales: {format_currency(pasivos)}
-        - Patrimonio Neto: {format_currency(patrimonio_neto)} ({'Positivo' if patrimonio_neto > 0 else 'Negativo'})
-        
-        Perfil de Inversión en Bienes Raíces: {perfil}
-        {descripcion}
-        """
-    }
-
-def mostrar_recomendacion_curso(titulo, curso, enlace, tips):
-    return f"""
-    **{titulo}**  
-    **Curso recomendado:** {curso}  
-    [Enlace al curso]({enlace})
-    
-    **3 Tips importantes:**
-    1. **{tips[0]}**
-    2. **{tips[1]}**
-    3. **{tips[2]}**
-    """
-
-def generar_pdf(usuario_data, finanzas_data, analisis_data):
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font("Arial", size=12)
-    
-    # Encabezado
-    pdf.set_font("Arial", 'B', 16)
-    pdf.cell(200, 10, txt="Informe Financiero - Taller de Bienes Raíces", ln=1, align='C')
-    pdf.set_font("Arial", 'B', 14)
-    pdf.cell(200, 10, txt="Análisis de Inversión en Bienes Raíces", ln=1, align='C')
-    pdf.ln(10)
-    
-    # Datos personales
-    pdf.set_font("Arial", 'B', 12)
-    pdf.cell(200, 10, txt="Datos Personales:", ln=1)
-    pdf.set_font("Arial", size=12)
-    pdf.cell(200, 10, txt=f"Nombre: {usuario_data.get('nombre', '')}", ln=1)
-    pdf.cell(200, 10, txt=f"Edad: {usuario_data.get('edad', '')}", ln=1)
-    pdf.cell(200, 10, txt=f"Email: {usuario_data.get('email', '')}", ln=1)
-    pdf.ln(5)
-    
-    # Datos financieros
-    pdf.set_font("Arial", 'B', 12)
-    pdf.cell(200, 10, txt="Situación Financiera:", ln=1)
-    pdf.set_font("Arial", size=12)
-    pdf.cell(200, 10, txt=f"Ingresos Mensuales: {format_currency(finanzas_data.get('ingresos', 0))}", ln=1)
-    pdf.cell(200, 10, txt=f"Gastos Mensuales: {format_currency(finanzas_data.get('gastos', 0))}", ln=1)
-    pdf.cell(200, 10, txt=f"Activos Totales: {format_currency(finanzas_data.get('activos', 0))}", ln=1)
-    pdf.cell(200, 10, txt=f"Pasivos Totales: {format_currency(finanzas_data.get('pasivos', 0))}", ln=1)
-    pdf.ln(5)
-    
-    # Perfil de inversión
-    if 'perfil_inversion' in analisis_data:
-        pdf.set_font("Arial", 'B', 12)
-        pdf.cell(200, 10, txt=f"Perfil de Inversión en Bienes Raíces: {analisis_data['perfil_inversion']['nivel']}", ln=1)
-        pdf.set_font("Arial", size=12)
-        pdf.multi_cell(0, 10, txt=analisis_data['perfil_inversion']['descripcion'])
-        pdf.ln(5)
-    
-    # Análisis
-    pdf.set_font("Arial", 'B', 12)
-    pdf.cell(200, 10, txt="Análisis y Recomendaciones:", ln=1)
-    pdf.set_font("Arial", size=12)
-    pdf.multi_cell(0, 10, txt=analisis_data.get('resumen', ''))
-    pdf.ln(5)
-    
-    # Plan de trabajo
-    if 'plan_trabajo' in analisis_data:
-        pdf.set_font("Arial", 'B', 12)
-        pdf.cell(200, 10, txt="Plan de Trabajo Personalizado:", ln=1)
-        pdf.set_font("Arial", size=12)
-        pdf.multi_cell(0, 10, txt=analisis_data['plan_trabajo'])
-    
-    # Generar el PDF en memoria
-    pdf_output = BytesIO()
-    pdf.output(pdf_output)
-    pdf_bytes = pdf_output.getvalue()
-    pdf_output.close()
-    
-    return pdf_bytes
-
-def generar_plan_trabajo(ingresos, gastos, activos, pasivos):
-    if not st.session_state.get('openai_configured', False):
-        return "Servicio de IA no disponible. Configura tu clave de OpenAI API para habilitar esta función."
-    
-    prompt = f"""
-    Como experto en bienes raíces y finanzas personales, analiza esta situación:
-    - Ingresos: {format_currency(ingresos)}/mes
-    - Gastos: {format_currency(gastos)}/mes
-    - Activos: {format_currency(activos)}
-    - Pasivos: {format_currency(pasivos)}
-    
-    Crea un plan detallado para inversión en bienes raíces que incluya:
-    1. Diagnóstico de la situación actual
-    2. Estrategias para mejorar flujo de caja
-    3. Plan de reducción de deudas
-    4. Recomendaciones de inversión personalizadas
-    5. Metas a corto, mediano y largo plazo
-    6. Ejercicios prácticos
-    7. Recomendaciones de cursos
-    
-    Usa lenguaje claro y motivador, con ejemplos concretos.
-    Respuesta en español.
-    """
-    
-    try:
-        with st.spinner('Generando tu plan personalizado...'):
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "Eres un asesor experto en inversión en bienes raíces. Responde en español con enfoque práctico."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7
-            )
-        return response.choices[0].message.content
-    except Exception as e:
-        st.error(f"Error al generar el plan: {str(e)}")
-        return "No se pudo generar el plan en este momento."
-
 # Interfaz principal
 def main():
     load_css()
@@ -1001,17 +668,7 @@ def main():
     
     # Descargar PDF
     if 'reporte_data' in st.session_state and st.session_state['reporte_data']['usuario']:
-        if st.button("📄 Descargar Reporte Completo en PDF"):
-            pdf_bytes = generar_pdf(
-                st.session_state['reporte_data']['usuario'],
-                st.session_state['reporte_data']['finanzas'],
-                st.session_state['reporte_data']['analisis']
-            )
-            
-            st.success("Reporte generado con éxito!")
-            b64 = base64.b64encode(pdf_bytes).decode()
-            href = f'<a href="data:application/octet-stream;base64,{b64}" download="reporte_bienes_raices.pdf">Haz clic aquí para descargar</a>'
-            st.markdown(href, unsafe_allow_html=True)
+        boton_pdf(st.session_state['reporte_data'], "📄 Descargar Reporte Completo en PDF", "reporte_bienes_raices.pdf")
     
     # Pie de página
     st.markdown("---")
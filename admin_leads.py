@@ -0,0 +1,123 @@
+import hmac
+import time
+
+import streamlit as st
+
+from calculadora import base_datos, sesiones
+
+# Panel de administración de registros (ejecutar con: streamlit run admin_leads.py)
+st.set_page_config(
+    page_title="Registros - Taller de Bienes Raíces",
+    page_icon="📇",
+    layout="wide"
+)
+
+def verificar_acceso():
+    if 'ADMIN_PASSWORD' not in st.secrets:
+        st.error("Configura ADMIN_PASSWORD en secrets.toml para habilitar el panel.")
+        return False
+    if st.session_state.get('admin_autenticado'):
+        return True
+    clave = st.text_input("Contraseña de administrador", type="password")
+    if clave and hmac.compare_digest(clave.encode(), str(st.secrets["ADMIN_PASSWORD"]).encode()):
+        st.session_state['admin_autenticado'] = True
+        return True
+    if clave:
+        st.error("Contraseña incorrecta")
+    return False
+
+@st.cache_resource
+def preparar_base_datos(ruta):
+    # Migraciones y compactación una vez por proceso, no en cada rerun
+    base_datos.crear_base_datos(ruta)
+
+def reiniciar_paginacion():
+    st.session_state['admin_cursores'] = [None]
+
+def main():
+    st.title("📇 Registros del Taller")
+    if not verificar_acceso():
+        return
+    preparar_base_datos(base_datos.DB_PATH)
+
+    # Conteos por perfil desde la tabla resumen (sin recorrer usuarios)
+    resumen = base_datos.resumen_por_perfil()
+    perfiles = [*base_datos.PERFILES, base_datos.SIN_PERFIL]
+    cols = st.columns(len(perfiles) + 1)
+    cols[0].metric("Total", f"{sum(resumen.values()):,}")
+    for col, perfil in zip(cols[1:], perfiles):
+        col.metric(perfil, f"{resumen.get(perfil, 0):,}")
+
+    col1, col2 = st.columns([3, 1])
+    busqueda = col1.text_input("Buscar por nombre o email", key="admin_busqueda",
+                               on_change=reiniciar_paginacion)
+    perfil = col2.selectbox("Perfil", ["Todos", *perfiles], key="admin_perfil",
+                            on_change=reiniciar_paginacion)
+
+    # Pila de cursores: cada entrada es el último id de la página anterior
+    if 'admin_cursores' not in st.session_state:
+        reiniciar_paginacion()
+    cursores = st.session_state['admin_cursores']
+
+    filas = base_datos.listar_usuarios(
+        busqueda,
+        perfil=None if perfil == "Todos" else perfil,
+        antes_de_id=cursores[-1],
+        limite=base_datos.TAMANO_PAGINA + 1
+    )
+    hay_siguiente = len(filas) > base_datos.TAMANO_PAGINA
+    filas = filas[:base_datos.TAMANO_PAGINA]
+
+    st.dataframe(
+        [
+            {"ID": id_, "Nombre": nombre, "Email": email, "Teléfono": telefono,
+             "Perfil": perfil_usuario or base_datos.SIN_PERFIL}
+            for id_, nombre, email, telefono, perfil_usuario in filas
+        ],
+        hide_index=True
+    )
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+    if col1.button("⬅️ Anterior", disabled=len(cursores) == 1):
+        cursores.pop()
+        st.rerun()
+    col2.markdown(f"Página {len(cursores)}")
+    if col3.button("Siguiente ➡️", disabled=not hay_siguiente):
+        cursores.append(filas[-1][0])
+        st.rerun()
+
+    mostrar_memoria_sesiones()
+
+def mostrar_memoria_sesiones():
+    # Fotos que escribe cada proceso de la app (ver calculadora/sesiones.py)
+    st.subheader("🧠 Memoria por sesión")
+    fotos = sesiones.leer_fotos()
+    if not fotos:
+        st.info("No hay procesos de la app activos o aún no escriben su primera foto.")
+        return
+    for foto in fotos:
+        filas = foto['sesiones']
+        col1, col2, col3 = st.columns(3)
+        col1.metric(f"{foto['app']} (pid {foto['pid']})", f"{len(filas)} sesiones")
+        col2.metric("Memoria del proceso", f"{foto['rss_bytes'] / 1e6:,.0f} MB")
+        col3.metric("Estado de sesiones", f"{sum(f['bytes'] for f in filas) / 1024:,.0f} KB",
+                    delta=f"{sum(f['bytes_en_disco'] for f in filas) / 1024:,.0f} KB en disco", delta_color="off")
+        st.dataframe(
+            [
+                {"Sesión": fila['sesion'], "Inactiva (min)": fila['inactiva_s'] // 60,
+                 "KB": round(fila['bytes'] / 1024), "KB en disco": round(fila['bytes_en_disco'] / 1024),
+                 "Reruns completos": fila.get('reruns_completos', 0),
+                 "Reruns evitados": fila.get('reruns_evitados', 0),
+                 "Claves más pesadas": ", ".join(f"{m['clave']} ({m['bytes'] // 1024} KB)" for m in fila['mayores'])}
+                for fila in filas
+            ],
+            hide_index=True
+        )
+        st.caption(f"Actualizado hace {time.time() - foto['actualizado']:.0f} s. "
+                   f"El texto de la IA y la proyección de retiro pasan a disco tras "
+                   f"{sesiones.INACTIVIDAD_SEGUNDOS // 60} min sin uso. "
+                   f"Reruns evitados: interacciones que solo volvieron a ejecutar su sección "
+                   f"({sum(f.get('reruns_evitados', 0) for f in filas)} en total).")
+
+if __name__ == "__main__":
+    main()
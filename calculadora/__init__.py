@@ -0,0 +1 @@
+"""Lógica compartida de la Calculadora Financiera del Taller de Bienes Raíces."""
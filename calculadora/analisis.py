@@ -0,0 +1,162 @@
+"""Cálculo del perfil de inversión y de la proyección de retiro (sin interfaz)."""
+from calculadora.moneda import format_currency
+
+# (nivel, patrimonio neto mínimo, flujo de caja mensual mínimo), de mayor a menor
+UMBRALES_NIVEL = (
+    ("Alto", 50000, 1000),
+    ("Medio", 20000, 500),
+)
+
+# Cómo se muestra cada nivel en el perfil de inversión
+ETIQUETAS_NIVEL = {
+    "Alto": "Alto (70-100%)",
+    "Medio": "Medio (40-69%)",
+    "Bajo": "Bajo (0-39%)",
+}
+
+
+def nivel_inversion(patrimonio_neto, flujo_caja):
+    """"Alto", "Medio" o "Bajo": el criterio de todas las variantes de la app."""
+    for nivel, patrimonio_minimo, flujo_minimo in UMBRALES_NIVEL:
+        if patrimonio_neto > patrimonio_minimo and flujo_caja > flujo_minimo:
+            return nivel
+    return "Bajo"
+
+
+def proyectar_retiro(edad_actual, edad_retiro, ingresos_retiro, gastos_retiro, ahorros_retiro):
+    """Años hasta el retiro, necesidad total estimada (hasta los 100 años) y ahorro anual necesario."""
+    años_ahorro = edad_retiro - edad_actual
+    necesidad_total = (ingresos_retiro - gastos_retiro) * (100 - edad_retiro)
+    ahorro_necesario_anual = (necesidad_total - ahorros_retiro) / años_ahorro if años_ahorro > 0 else 0
+    return {
+        "años_ahorro": años_ahorro,
+        "necesidad_total": necesidad_total,
+        "ahorro_necesario_anual": ahorro_necesario_anual,
+        "ahorros_actuales": ahorros_retiro,
+    }
+
+
+def calcular_situacion_financiera(ingresos, gastos, activos, pasivos):
+    """Flujo de caja, patrimonio, perfil y textos del análisis (sin interfaz)."""
+    flujo_caja_mensual = ingresos - gastos
+    patrimonio_neto = activos - pasivos
+    nivel = nivel_inversion(patrimonio_neto, flujo_caja_mensual)
+    perfil = ETIQUETAS_NIVEL[nivel]
+    
+    if nivel == "Alto":
+        descripcion = "Excelente perfil para inversión en bienes raíces. Tienes la capacidad financiera para comenzar a invertir en propiedades generadoras de ingresos pasivos."
+        recomendaciones = mostrar_recomendacion_curso(
+            "🚀 Recomendación para tu Perfil Alto",
+            "Mentoría Avanzada en Tiendas Online",
+            "https://landing.carlosdevis.com/mentoria-tienda-online",
+            [
+                "Estrategias avanzadas de escalamiento",
+                "Automatización de procesos",
+                "Fuentes alternativas de ingreso"
+            ]
+        )
+    elif nivel == "Medio":
+        descripcion = "Buen potencial para inversión en bienes raíces. Considera comenzar con propiedades pequeñas o co-inversiones mientras mejoras tu flujo de caja."
+        recomendaciones = mostrar_recomendacion_curso(
+            "📈 Recomendación para tu Perfil Medio",
+            "Programa Avanzado en Tiendas Online",
+            "https://landing.carlosdevis.com/cv-avanzado-tienda-online",
+            [
+                "Modelos de negocio probados",
+                "Tácticas de conversión",
+                "Fuentes de tráfico escalables"
+            ]
+        )
+    else:
+        descripcion = "Necesitas fortalecer tu situación financiera antes de invertir en bienes raíces. Enfócate en aumentar ingresos, reducir deudas y ahorrar."
+        recomendaciones = mostrar_recomendacion_curso(
+            "📚 Recomendación para tu Perfil Bajo",
+            "Programa Avanzado en Tiendas Online",
+            "https://landing.carlosdevis.com/cv-avanzado-tienda-online",
+            [
+                "Fundamentos sólidos",
+                "Gestión financiera básica",
+                "Primeros pasos en digital"
+            ]
+        )
+    
+    return {
+        "flujo_caja": flujo_caja_mensual,
+        "patrimonio": patrimonio_neto,
+        "perfil_inversion": {"nivel": perfil, "descripcion": descripcion},
+        "recomendaciones": recomendaciones,
+        "resumen": f"""
+        Situación Financiera Actual:
+        - Ingresos Mensuales: {format_currency(ingresos)}
+        - Gastos Mensuales: {format_currency(gastos)}
+        - Flujo de Caja: {format_currency(flujo_caja_mensual)} ({'Positivo' if flujo_caja_mensual > 0 else 'Negativo'})
+        - Activos Totales: {format_currency(activos)}
+        - Pasivos Totales: {format_currency(pasivos)}
+        - Patrimonio Neto: {format_currency(patrimonio_neto)} ({'Positivo' if patrimonio_neto > 0 else 'Negativo'})
+        
+        Perfil de Inversión en Bienes Raíces: {perfil}
+        {descripcion}
+        """
+    }
+
+
+def mostrar_recomendacion_curso(titulo, curso, enlace, tips):
+    return f"""
+    **{titulo}**  
+    **Curso recomendado:** {curso}  
+    [Enlace al curso]({enlace})
+    
+    **3 Tips importantes:**
+    1. **{tips[0]}**
+    2. **{tips[1]}**
+    3. **{tips[2]}**
+    """
+
+
+def analizar_proyeccion_retiro(edad_actual, edad_retiro, ingresos_retiro, gastos_retiro, ahorros_retiro, patrimonio_neto, flujo_caja):
+    proyeccion = proyectar_retiro(edad_actual, edad_retiro, ingresos_retiro, gastos_retiro, ahorros_retiro)
+    años_ahorro = proyeccion["años_ahorro"]
+    necesidad_total = proyeccion["necesidad_total"]
+    ahorro_necesario_anual = proyeccion["ahorro_necesario_anual"]
+    nivel = nivel_inversion(patrimonio_neto, flujo_caja)
+    
+    if nivel == "Alto":
+        recomendaciones = [
+            "Tienes un excelente perfil para comenzar a invertir en bienes raíces de inmediato.",
+            "Considera propiedades generadoras de ingresos pasivos como apartamentos en arriendo o locales comerciales."
+        ]
+        cursos_recomendados = ["Curso Avanzado de Inversión en Bienes Raíces"]
+    elif nivel == "Medio":
+        recomendaciones = [
+            "Tienes potencial para inversión en bienes raíces, pero necesitas mejorar tu flujo de caja.",
+            "Considera comenzar con propiedades pequeñas o co-inversiones."
+        ]
+        cursos_recomendados = ["Curso Intermedio de Bienes Raíces"]
+    else:
+        recomendaciones = [
+            "Necesitas fortalecer tu situación financiera antes de invertir en bienes raíces.",
+            "Enfócate en aumentar tus ingresos y reducir deudas."
+        ]
+        cursos_recomendados = ["Curso Básico de Educación Financiera para Bienes Raíces"]
+    texto_recomendaciones = "\n".join(recomendaciones)
+    texto_cursos = "\n".join(cursos_recomendados)
+    
+    return {
+        **proyeccion,
+        "nivel_inversion": nivel,
+        "analisis": f"""
+        Proyección de Retiro con Enfoque en Bienes Raíces:
+        - Años hasta el retiro: {años_ahorro}
+        - Necesidad total estimada: {format_currency(necesidad_total)}
+        - Ahorros actuales: {format_currency(ahorros_retiro)}
+        - Necesitas ahorrar aproximadamente {format_currency(ahorro_necesario_anual)} anuales para alcanzar tu meta.
+        
+        Perfil de Inversión: {nivel}
+        
+        Recomendaciones Específicas:
+        {texto_recomendaciones}
+        
+        Cursos Recomendados:
+        {texto_cursos}
+        """
+    }
@@ -0,0 +1,63 @@
+"""Arranque rápido: las dependencias pesadas se importan al primer uso.
+
+El cliente de OpenAI, el motor del PDF (fpdf, fontTools, matplotlib) y el
+clasificador de extractos (pandas, scikit-learn) suman cerca de un segundo
+de imports y solo se usan después de apretar un botón. Los módulos que los
+necesitan los importan dentro de la función que los usa, como ya hacían
+`importacion` y `extractos` con pandas, y el primer render no los espera.
+
+Para que el primer clic tampoco los espere, la app llama a `precalentar()`
+al terminar su primer run: un hilo de fondo importa `PESADOS` mientras el
+usuario llena el formulario. Si el script pide uno de esos módulos mientras
+el hilo lo está importando, Python lo hace esperar a que termine; nunca se
+importa dos veces.
+
+`CALCULADORA_PRECALENTAR=0` lo desactiva (el benchmark de arranque lo usa
+para ver qué carga el primer render por sí solo):
+
+    python -m calculadora.benchmark --solo arranque
+"""
+import importlib
+import os
+import sys
+import threading
+import time
+
+# En el orden en que la app suele necesitarlos
+PESADOS = (
+    "openai",
+    "calculadora.reporte_pdf",
+    "pandas",
+    "sklearn.feature_extraction.text",
+    "sklearn.linear_model",
+)
+
+ACTIVO = os.environ.get('CALCULADORA_PRECALENTAR', "1") != "0"
+
+# módulo -> segundos que tardó en importarse en el hilo de fondo
+tiempos = {}
+_hilo = None
+_bloqueo = threading.Lock()
+
+
+def _importar_todo():
+    for modulo in PESADOS:
+        inicio = time.perf_counter()
+        try:
+            importlib.import_module(modulo)
+        except Exception as e:
+            # El módulo se vuelve a intentar al primer uso y ahí se ve el error
+            print(f"No se pudo precalentar {modulo}: {e}", file=sys.stderr)
+            continue
+        tiempos[modulo] = time.perf_counter() - inicio
+
+
+def precalentar():
+    """Importa `PESADOS` en un hilo de fondo, una vez por proceso."""
+    global _hilo
+    if not ACTIVO:
+        return
+    with _bloqueo:
+        if _hilo is None:
+            _hilo = threading.Thread(target=_importar_todo, name="calculadora-precalentar", daemon=True)
+            _hilo.start()
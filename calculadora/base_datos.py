@@ -0,0 +1,467 @@
+"""Acceso a la base de datos SQLite de usuarios y finanzas.
+
+Uso de la compactación (una sola vez sobre una base existente):
+
+    python -m calculadora.base_datos --compactar
+"""
+import argparse
+import json
+import os
+import re
+import secrets
+import sqlite3
+
+from calculadora import percentiles
+
+DB_PATH = os.environ.get('CALCULADORA_DB', 'usuarios.db')
+
+# El correo se normaliza igual en Python y en el índice único de SQLite
+EMAIL_NORMALIZADO_SQL = "lower(trim(email))"
+# Forma mínima de un correo ya normalizado: algo@dominio.tld, sin espacios
+_EMAIL_VALIDO = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+
+PERFILES = ("Alto", "Medio", "Bajo")
+SIN_PERFIL = "Sin analizar"
+
+TAMANO_PAGINA = 50
+
+
+def normalizar_email(email):
+    return (email or "").strip().lower()
+
+
+def email_valido(email):
+    return _EMAIL_VALIDO.fullmatch(normalizar_email(email)) is not None
+
+
+def conectar(db_path=None):
+    return sqlite3.connect(db_path or DB_PATH)
+
+
+def crear_base_datos(db_path=None):
+    conn = conectar(db_path)
+    cursor = conn.cursor()
+    # WAL permite que las exportaciones lean mientras la app sigue escribiendo
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS usuarios (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nombre TEXT,
+            edad INTEGER,
+            email TEXT,
+            telefono TEXT
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS finanzas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            usuario_id INTEGER,
+            ingresos_mensuales REAL,
+            gastos_mensuales REAL,
+            activos_totales REAL,
+            pasivos_totales REAL,
+            FOREIGN KEY(usuario_id) REFERENCES usuarios(id)
+        )
+    ''')
+    _agregar_columna(cursor, 'usuarios', 'perfil', 'TEXT')
+    _agregar_columna(cursor, 'finanzas', 'perfil', 'TEXT')
+    _agregar_columna(cursor, 'finanzas', 'creado_en', 'TEXT')
+    if _agregar_columna(cursor, 'usuarios', 'actualizado_en', 'TEXT'):
+        cursor.execute("UPDATE usuarios SET actualizado_en = datetime('now')")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_usuarios_actualizado ON usuarios (actualizado_en, id)")
+    _crear_secuencia_cambios(cursor)
+    conn.commit()
+    _crear_busqueda_y_resumen(cursor)
+    percentiles.crear_tabla(cursor)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS reportes_compartidos (
+            id TEXT PRIMARY KEY,
+            usuario_id INTEGER,
+            huella TEXT UNIQUE NOT NULL,
+            datos TEXT NOT NULL,
+            creado_en TEXT NOT NULL,
+            FOREIGN KEY(usuario_id) REFERENCES usuarios(id)
+        )
+    ''')
+    conn.commit()
+    try:
+        _crear_indice_email(cursor)
+    except sqlite3.IntegrityError:
+        # Bases creadas antes del índice único pueden tener correos repetidos
+        compactar_usuarios(conn, vacuum=False)
+        _crear_indice_email(cursor)
+    conn.commit()
+    conn.close()
+
+
+def _agregar_columna(cursor, tabla, columna, tipo):
+    columnas = [fila[1] for fila in cursor.execute(f"PRAGMA table_info({tabla})")]
+    if columna in columnas:
+        return False
+    cursor.execute(f"ALTER TABLE {tabla} ADD COLUMN {columna} {tipo}")
+    return True
+
+
+def _crear_secuencia_cambios(cursor):
+    """`usuarios.version`: número de cambio creciente, la marca de agua de la exportación.
+
+    `actualizado_en` tiene resolución de un segundo y no sirve para saber qué
+    cambió después de la última exportación. Cada INSERT o UPDATE de un
+    usuario le asigna el mayor `version` más uno; SQLite tiene un solo
+    escritor, así que los números se confirman en orden.
+    """
+    if _agregar_columna(cursor, 'usuarios', 'version', 'INTEGER'):
+        # Bases existentes: numerar en el orden de la marca anterior
+        cursor.execute('''
+            UPDATE usuarios SET version = orden.n
+            FROM (SELECT id, row_number() OVER (ORDER BY actualizado_en, id) AS n FROM usuarios) AS orden
+            WHERE usuarios.id = orden.id
+        ''')
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_usuarios_version ON usuarios (version)")
+    siguiente = "(SELECT coalesce(max(version), 0) + 1 FROM usuarios)"
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS usuarios_ai_version AFTER INSERT ON usuarios BEGIN
+            UPDATE usuarios SET version = {siguiente} WHERE id = NEW.id;
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS usuarios_au_version AFTER UPDATE ON usuarios
+        WHEN NEW.version IS OLD.version BEGIN
+            UPDATE usuarios SET version = {siguiente} WHERE id = NEW.id;
+        END
+    ''')
+
+
+def _existe_tabla(cursor, nombre):
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (nombre,))
+    return cursor.fetchone() is not None
+
+
+def _crear_busqueda_y_resumen(cursor):
+    """Índice FTS5 de nombre/email y tabla resumen de usuarios por perfil.
+
+    Ambos se mantienen con triggers sobre `usuarios`, así el panel de
+    administración nunca recorre la tabla completa.
+    """
+    fts_nueva = not _existe_tabla(cursor, 'usuarios_fts')
+    resumen_nuevo = not _existe_tabla(cursor, 'resumen_perfiles')
+
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS usuarios_fts USING fts5(
+            nombre, email,
+            content='usuarios', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS resumen_perfiles (
+            perfil TEXT PRIMARY KEY,
+            total INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_usuarios_perfil ON usuarios (perfil, id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_finanzas_usuario ON finanzas (usuario_id)")
+
+    perfil_nuevo = f"coalesce(NEW.perfil, '{SIN_PERFIL}')"
+    perfil_viejo = f"coalesce(OLD.perfil, '{SIN_PERFIL}')"
+    cursor.executescript(f'''
+        CREATE TRIGGER IF NOT EXISTS usuarios_ai AFTER INSERT ON usuarios BEGIN
+            INSERT INTO usuarios_fts (rowid, nombre, email) VALUES (NEW.id, NEW.nombre, NEW.email);
+            INSERT INTO resumen_perfiles (perfil, total) VALUES ({perfil_nuevo}, 1)
+                ON CONFLICT (perfil) DO UPDATE SET total = total + 1;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS usuarios_ad AFTER DELETE ON usuarios BEGIN
+            INSERT INTO usuarios_fts (usuarios_fts, rowid, nombre, email) VALUES ('delete', OLD.id, OLD.nombre, OLD.email);
+            UPDATE resumen_perfiles SET total = total - 1 WHERE perfil = {perfil_viejo};
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS usuarios_au_busqueda AFTER UPDATE OF nombre, email ON usuarios BEGIN
+            INSERT INTO usuarios_fts (usuarios_fts, rowid, nombre, email) VALUES ('delete', OLD.id, OLD.nombre, OLD.email);
+            INSERT INTO usuarios_fts (rowid, nombre, email) VALUES (NEW.id, NEW.nombre, NEW.email);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS usuarios_au_perfil AFTER UPDATE OF perfil ON usuarios
+        WHEN OLD.perfil IS NOT NEW.perfil BEGIN
+            UPDATE resumen_perfiles SET total = total - 1 WHERE perfil = {perfil_viejo};
+            INSERT INTO resumen_perfiles (perfil, total) VALUES ({perfil_nuevo}, 1)
+                ON CONFLICT (perfil) DO UPDATE SET total = total + 1;
+        END;
+
+        -- Versiones anteriores de la app insertan sin fecha de actualización
+        CREATE TRIGGER IF NOT EXISTS usuarios_ai_fecha AFTER INSERT ON usuarios
+        WHEN NEW.actualizado_en IS NULL BEGIN
+            UPDATE usuarios SET actualizado_en = datetime('now') WHERE id = NEW.id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS finanzas_ai AFTER INSERT ON finanzas
+        WHEN NEW.perfil IS NOT NULL BEGIN
+            UPDATE usuarios SET perfil = NEW.perfil, actualizado_en = NEW.creado_en
+            WHERE id = NEW.usuario_id;
+        END;
+    ''')
+
+    # Bases existentes: poblar una sola vez con lo que ya hay en `usuarios`
+    if fts_nueva:
+        cursor.execute("INSERT INTO usuarios_fts (usuarios_fts) VALUES ('rebuild')")
+    if resumen_nuevo:
+        cursor.execute(f'''
+            INSERT INTO resumen_perfiles (perfil, total)
+            SELECT coalesce(perfil, '{SIN_PERFIL}'), COUNT(*) FROM usuarios GROUP BY 1
+        ''')
+
+
+def _crear_indice_email(cursor):
+    cursor.execute(f'''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_usuarios_email
+        ON usuarios ({EMAIL_NORMALIZADO_SQL})
+    ''')
+
+
+def guardar_usuario(nombre, edad, email, telefono, db_path=None):
+    """Inserta o actualiza el usuario identificado por su correo y devuelve su id.
+
+    Un correo vacío o inválido lanza ValueError: todos caerían en la misma
+    fila del índice único y se sobrescribirían entre sí.
+    """
+    if not email_valido(email):
+        raise ValueError(f"Correo inválido: {email!r}")
+    conn = conectar(db_path)
+    cursor = conn.cursor()
+    cursor.execute(f'''
+        INSERT INTO usuarios (nombre, edad, email, telefono, actualizado_en)
+        VALUES (?, ?, ?, ?, datetime('now'))
+        ON CONFLICT ({EMAIL_NORMALIZADO_SQL}) DO UPDATE SET
+            nombre = excluded.nombre,
+            edad = excluded.edad,
+            telefono = excluded.telefono,
+            actualizado_en = excluded.actualizado_en
+        RETURNING id
+    ''', (nombre, edad, normalizar_email(email), telefono))
+    usuario_id = cursor.fetchone()[0]
+    conn.commit()
+    conn.close()
+    return usuario_id
+
+
+def buscar_usuario_por_email(email, db_path=None):
+    conn = conectar(db_path)
+    cursor = conn.cursor()
+    cursor.execute(f'''
+        SELECT id, nombre, edad, email, telefono FROM usuarios
+        WHERE {EMAIL_NORMALIZADO_SQL} = ?
+    ''', (normalizar_email(email),))
+    fila = cursor.fetchone()
+    conn.close()
+    return fila
+
+
+def guardar_finanzas(usuario_id, ingresos, gastos, activos, pasivos, perfil, db_path=None):
+    """Guarda una foto del análisis financiero; el perfil se copia a `usuarios` por trigger."""
+    conn = conectar(db_path)
+    cursor = conn.cursor()
+    cursor.execute('''
+        INSERT INTO finanzas (usuario_id, ingresos_mensuales, gastos_mensuales,
+                              activos_totales, pasivos_totales, perfil, creado_en)
+        VALUES (?, ?, ?, ?, ?, ?, datetime('now'))
+    ''', (usuario_id, ingresos, gastos, activos, pasivos, perfil))
+    finanzas_id = cursor.lastrowid
+    cursor.execute("SELECT edad FROM usuarios WHERE id = ?", (usuario_id,))
+    fila = cursor.fetchone()
+    edad = fila[0] if fila else None
+    # Cada usuario cuenta una vez en los percentiles: este análisis reemplaza al anterior
+    anterior = percentiles.registrar(cursor, usuario_id, edad, ingresos - gastos, activos - pasivos)
+    conn.commit()
+    conn.close()
+    percentiles.agregar_en_memoria(edad, ingresos - gastos, activos - pasivos, anterior)
+    return finanzas_id
+
+
+def percentiles_usuario(edad, flujo_caja, patrimonio_neto, db_path=None):
+    return percentiles.percentiles_usuario(
+        lambda: conectar(db_path), edad, flujo_caja, patrimonio_neto
+    )
+
+
+def guardar_reporte(usuario_id, reporte_data, huella, db_path=None):
+    """Guarda una foto del reporte y devuelve su id opaco para compartirlo.
+
+    `huella` identifica el contenido: volver a compartir el mismo reporte
+    devuelve el mismo id en lugar de crear otra copia.
+    """
+    conn = conectar(db_path)
+    cursor = conn.cursor()
+    cursor.execute('''
+        INSERT INTO reportes_compartidos (id, usuario_id, huella, datos, creado_en)
+        VALUES (?, ?, ?, ?, datetime('now'))
+        ON CONFLICT (huella) DO UPDATE SET huella = excluded.huella
+        RETURNING id
+    ''', (secrets.token_urlsafe(16), usuario_id, huella,
+          json.dumps(reporte_data, ensure_ascii=False, default=str)))
+    reporte_id = cursor.fetchone()[0]
+    conn.commit()
+    conn.close()
+    return reporte_id
+
+
+def cargar_reporte(reporte_id, db_path=None):
+    """`reporte_data` guardado con ese id, o None si no existe."""
+    conn = conectar(db_path)
+    cursor = conn.cursor()
+    cursor.execute("SELECT datos FROM reportes_compartidos WHERE id = ?", (reporte_id,))
+    fila = cursor.fetchone()
+    conn.close()
+    return json.loads(fila[0]) if fila else None
+
+
+def _consulta_fts(texto):
+    # Cada palabra se busca como prefijo literal; las comillas evitan que la
+    # sintaxis de FTS5 (AND, NEAR, *, ...) escrita por el usuario se interprete
+    palabras = texto.split()
+    return " ".join('"' + palabra.replace('"', '""') + '"*' for palabra in palabras)
+
+
+def listar_usuarios(busqueda="", perfil=None, antes_de_id=None, limite=TAMANO_PAGINA, db_path=None):
+    """Página de usuarios ordenada del más reciente al más antiguo.
+
+    La paginación es por clave (`antes_de_id` es el último id de la página
+    anterior), de modo que cualquier página cuesta lo mismo sin importar
+    cuántas filas haya antes.
+    """
+    condiciones = []
+    parametros = []
+    if busqueda.strip():
+        # Con búsqueda se recorre el índice FTS en orden de rowid
+        tabla = "usuarios_fts f JOIN usuarios u ON u.id = f.rowid"
+        clave = "f.rowid"
+        condiciones.append("usuarios_fts MATCH ?")
+        parametros.append(_consulta_fts(busqueda))
+    else:
+        tabla = "usuarios u"
+        clave = "u.id"
+    if perfil == SIN_PERFIL:
+        condiciones.append("u.perfil IS NULL")
+    elif perfil:
+        condiciones.append("u.perfil = ?")
+        parametros.append(perfil)
+    if antes_de_id is not None:
+        condiciones.append(f"{clave} < ?")
+        parametros.append(antes_de_id)
+
+    where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+    conn = conectar(db_path)
+    cursor = conn.cursor()
+    cursor.execute(f'''
+        SELECT u.id, u.nombre, u.email, u.telefono, u.perfil
+        FROM {tabla}
+        {where}
+        ORDER BY {clave} DESC
+        LIMIT ?
+    ''', (*parametros, limite))
+    filas = cursor.fetchall()
+    conn.close()
+    return filas
+
+
+def resumen_por_perfil(db_path=None):
+    conn = conectar(db_path)
+    cursor = conn.cursor()
+    cursor.execute("SELECT perfil, total FROM resumen_perfiles WHERE total > 0 ORDER BY perfil")
+    resumen = dict(cursor.fetchall())
+    conn.close()
+    return resumen
+
+
+def compactar_usuarios(conn, vacuum=True):
+    """Fusiona los usuarios con el mismo correo normalizado.
+
+    Conserva el id más antiguo de cada correo (es el que pueden referenciar
+    las filas de `finanzas`), le copia los datos del registro más reciente,
+    reasigna las finanzas y los reportes compartidos de los duplicados y
+    los elimina. Devuelve el número de filas eliminadas.
+
+    Las filas sin correo no son el mismo usuario: no se fusionan, y su
+    correo vacío pasa a NULL, que el índice único no compara.
+    """
+    cursor = conn.cursor()
+    cursor.execute("UPDATE usuarios SET email = NULL WHERE trim(email) = ''")
+    cursor.execute(f'''
+        CREATE TEMP TABLE duplicados AS
+        SELECT id, MIN(id) OVER (PARTITION BY {EMAIL_NORMALIZADO_SQL}) AS id_conservado,
+               MAX(id) OVER (PARTITION BY {EMAIL_NORMALIZADO_SQL}) AS id_reciente
+        FROM usuarios
+        WHERE email IS NOT NULL
+    ''')
+    cursor.execute('''
+        UPDATE usuarios SET
+            nombre = r.nombre, edad = r.edad, telefono = r.telefono,
+            perfil = coalesce(r.perfil, usuarios.perfil)
+        FROM duplicados d JOIN usuarios r ON r.id = d.id_reciente
+        WHERE usuarios.id = d.id AND d.id = d.id_conservado AND d.id_reciente <> d.id
+    ''')
+    # Solo los correos que cambian: cada UPDATE sube `version` y se reexporta
+    cursor.execute(f"UPDATE usuarios SET email = {EMAIL_NORMALIZADO_SQL} WHERE email <> {EMAIL_NORMALIZADO_SQL}")
+    for tabla in ('finanzas', 'reportes_compartidos'):
+        cursor.execute(f'''
+            UPDATE {tabla} SET usuario_id = d.id_conservado
+            FROM duplicados d
+            WHERE {tabla}.usuario_id = d.id AND d.id <> d.id_conservado
+        ''')
+    _recontar_percentiles(cursor)
+    cursor.execute('''
+        DELETE FROM usuarios WHERE id IN (
+            SELECT id FROM duplicados WHERE id <> id_conservado
+        )
+    ''')
+    eliminados = cursor.rowcount
+    cursor.execute("DROP TABLE duplicados")
+    conn.commit()
+    if eliminados:
+        percentiles.olvidar_en_memoria()
+    if vacuum:
+        # Recupera el espacio de las filas eliminadas
+        conn.execute("VACUUM")
+    return eliminados
+
+
+def _recontar_percentiles(cursor):
+    """Cuenta una sola vez a cada usuario fusionado, con su último análisis.
+
+    Se quitan los aportes de todos los ids del grupo (el conservado y sus
+    duplicados) y se registra el conservado, que ya tiene la edad del
+    registro más reciente, con la última foto de `finanzas` reasignada.
+    """
+    cursor.execute('''
+        SELECT id, id_conservado FROM duplicados
+        WHERE id_conservado IN (SELECT id_conservado FROM duplicados WHERE id <> id_conservado)
+    ''')
+    grupo = cursor.fetchall()
+    for usuario_id, _ in grupo:
+        percentiles.quitar(cursor, usuario_id)
+    for usuario_id in sorted({conservado for _, conservado in grupo}):
+        cursor.execute('''
+            SELECT u.edad, f.ingresos_mensuales - f.gastos_mensuales,
+                   f.activos_totales - f.pasivos_totales
+            FROM finanzas f JOIN usuarios u ON u.id = f.usuario_id
+            WHERE f.usuario_id = ? AND f.ingresos_mensuales IS NOT NULL
+            ORDER BY f.id DESC
+            LIMIT 1
+        ''', (usuario_id,))
+        ultima = cursor.fetchone()
+        if ultima is not None:
+            percentiles.registrar(cursor, usuario_id, *ultima)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mantenimiento de la base de datos de usuarios")
+    parser.add_argument("--db", default=DB_PATH, help="Ruta del archivo SQLite")
+    parser.add_argument("--compactar", action="store_true",
+                        help="Fusiona usuarios duplicados por correo y crea el índice único")
+    args = parser.parse_args()
+
+    crear_base_datos(args.db)
+    if args.compactar:
+        conn = conectar(args.db)
+        eliminados = compactar_usuarios(conn)
+        conn.close()
+        print(f"Usuarios duplicados eliminados: {eliminados}")
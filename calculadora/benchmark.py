@@ -0,0 +1,337 @@
+"""Benchmarks de las funciones centrales de la calculadora.
+
+Uso:
+
+    python -m calculadora.benchmark --salida bench.json
+    python -m calculadora.benchmark --salida bench.json --base bench_base.json
+    python -m calculadora.benchmark --app APPCALAJUSTES_V7780.py --solo pdf rerun
+    python -m calculadora.benchmark --solo arranque
+
+Cada caso se ejecuta varias repeticiones de N llamadas y se guarda el tiempo
+por llamada (mediana, mínimo y máximo entre repeticiones) en JSON. Con
+`--base` se compara contra un resultado anterior usando el mínimo, que es
+lo menos sensible al ruido de la máquina: un caso que empeora más que
+`--tolerancia` cuenta como regresión y el comando termina con código 1,
+para frenar el despliegue de una nueva versión de la app.
+
+La base de datos y la caché de reportes van a una carpeta temporal; el
+benchmark nunca toca `usuarios.db`.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from calculadora import arranque, base_datos, extractos, importacion
+from calculadora.analisis import analizar_proyeccion_retiro, calcular_situacion_financiera
+from calculadora.dinero import ColumnaDinero
+from calculadora.moneda import format_currency, format_currency_serie, parse_currency, parse_currency_serie
+from calculadora.reporte_pdf import generar_pdf
+from calculadora.totales import GrafoTotales
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_POR_DEFECTO = os.path.join(RAIZ, "APPCALAJUSTES_V7780.py")
+TOLERANCIA = 0.15
+
+MONTOS_TEXTO = ["$1,234.56", "$0", "", "-$500.25", "$12,345,678.90", "abc", "3500"]
+MONTOS = [0, 1234.56, -500.25, 12_345_678.9, 3_500_000]
+
+REPORTE = {
+    'usuario': {'nombre': "María José Núñez", 'edad': 42, 'email': "maria@example.com", 'telefono': "3001234567"},
+    'finanzas': {
+        'ingresos': 8_500_000, 'gastos': 5_200_000, 'activos': 420_000_000, 'pasivos': 180_000_000,
+        'detalle_balance': {"Casa": 250_000_000, "Carro": 40_000_000, "Hipoteca": -150_000_000},
+    },
+}
+_situacion = calcular_situacion_financiera(8_500_000, 5_200_000, 420_000_000, 180_000_000)
+REPORTE['analisis'] = {
+    'resumen': _situacion['resumen'],
+    'perfil_inversion': _situacion['perfil_inversion'],
+    'proyeccion_retiro': analizar_proyeccion_retiro(42, 65, 40_000, 30_000, 10_000, 240_000_000, 3_300_000),
+}
+
+
+def medir(funcion, numero, repeticiones):
+    """Segundos por llamada de cada repetición de `numero` llamadas."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        for _ in range(numero):
+            funcion()
+        tiempos.append((time.perf_counter() - inicio) / numero)
+    return tiempos
+
+
+def _resumen(tiempos, numero, unidades=1):
+    mediana = statistics.median(tiempos)
+    return {
+        "mediana_s": mediana,
+        "min_s": min(tiempos),
+        "max_s": max(tiempos),
+        "llamadas": numero,
+        "repeticiones": len(tiempos),
+        "por_segundo": unidades / mediana if mediana else None,
+    }
+
+
+def caso_parse_currency():
+    def correr():
+        for texto in MONTOS_TEXTO:
+            parse_currency(texto)
+    return _resumen(medir(correr, 2000, 5), 2000, len(MONTOS_TEXTO))
+
+
+def caso_format_currency_serie():
+    # Tabla de portafolio de 1,000 filas: un tercio en cero, como en el balance
+    montos = [0 if i % 3 == 0 else (i * 7_919.37) * (-1) ** i for i in range(1000)]
+    return _resumen(medir(lambda: format_currency_serie(montos), 20, 5), 20, len(montos))
+
+
+def caso_parse_currency_serie():
+    import pandas as pd
+
+    serie = pd.Series([format_currency(valor * 37.01) for valor in range(-100_000, 100_000)])
+    return _resumen(medir(lambda: parse_currency_serie(serie), 1, 5), 1, len(serie))
+
+
+def caso_importacion():
+    import io
+
+    tipos = ("activo", "pasivo", "ingreso", "gasto")
+    lineas = ["tipo,concepto,valor,deuda"] + [
+        f'{tipos[i % 4]},Partida {i % 500},"{format_currency(i * 1_013.37)}",'
+        + (f'"{format_currency(i * 211.5)}"' if i % 4 == 0 else "")
+        for i in range(5000)
+    ]
+    contenido = "\n".join(lineas).encode()
+    return _resumen(medir(lambda: importacion.importar(io.BytesIO(contenido), "balance.csv"), 1, 5), 1, 5000)
+
+
+def caso_extractos():
+    import io
+
+    # Un año de movimientos de una tarjeta: ~50,000 cargos de unos pocos cientos de comercios
+    comercios = ["COMPRA EXITO", "UBER TRIP", "NETFLIX COM", "DROGUERIA LA REBAJA", "PAGO PSE ENEL",
+                 "TIENDA DON PEPE", "FERRETERIA EL TORNILLO", "RESTAURANTE LA 70"]
+    lineas = ["Fecha;Descripción;Valor"] + [
+        f"{i % 28 + 1:02d}/{i % 12 + 1:02d}/2025;{comercios[i % len(comercios)]} {i % 300} #{i};-{i * 37 % 500_000}"
+        for i in range(50_000)
+    ]
+    contenido = "\n".join(lineas).encode()
+    return _resumen(medir(lambda: extractos.clasificar_extracto(io.BytesIO(contenido), "extracto.csv"), 1, 5),
+                    1, 50_000)
+
+
+def caso_format_currency():
+    def correr():
+        for valor in MONTOS:
+            format_currency(valor)
+    return _resumen(medir(correr, 2000, 5), 2000, len(MONTOS))
+
+
+# Operación de referencia sobre una columna de balance: neto, total y 12.5 %
+FILAS_COLUMNA = 100_000
+
+
+def caso_dinero_columna():
+    import numpy as np
+
+    nombres = range(FILAS_COLUMNA)
+    valores = ColumnaDinero(nombres, np.arange(FILAS_COLUMNA, dtype=np.int64) * 100_037)
+    deudas = ColumnaDinero(valores.nombres, np.arange(FILAS_COLUMNA, dtype=np.int64) * 31_013)
+    return _resumen(medir(lambda: (valores - deudas).porcentaje(12.5).total(), 5, 5), 5, FILAS_COLUMNA)
+
+
+def caso_totales_fila():
+    # Lo que cuesta un cambio en un campo del balance: una fila y sus totales
+    grafo = GrafoTotales()
+    montos = iter(range(1, 10**9))
+
+    def correr():
+        grafo.fijar("activos_valor", "Inmueble 1", next(montos))
+        return grafo.pesos("patrimonio_neto")
+    return _resumen(medir(correr, 2000, 5), 2000)
+
+
+def caso_dinero_decimal():
+    # La misma cuenta con decimal.Decimal, como referencia
+    from decimal import ROUND_HALF_UP, Decimal
+
+    centavo = Decimal("0.01")
+    valores = [Decimal(i * 100_037) / 100 for i in range(FILAS_COLUMNA)]
+    deudas = [Decimal(i * 31_013) / 100 for i in range(FILAS_COLUMNA)]
+    tasa = Decimal("0.125")
+
+    def correr():
+        return sum(((v - d) * tasa).quantize(centavo, ROUND_HALF_UP) for v, d in zip(valores, deudas))
+    return _resumen(medir(correr, 1, 5), 1, FILAS_COLUMNA)
+
+
+def caso_situacion_financiera():
+    return _resumen(medir(lambda: calcular_situacion_financiera(8_500_000, 5_200_000, 420_000_000, 180_000_000), 2000, 5), 2000)
+
+
+def caso_proyeccion_retiro():
+    return _resumen(medir(lambda: analizar_proyeccion_retiro(42, 65, 40_000, 30_000, 10_000, 240_000_000, 3_300_000), 2000, 5), 2000)
+
+
+def caso_pdf():
+    # La primera llamada carga fuentes y dibuja los gráficos; se mide aparte
+    inicio = time.perf_counter()
+    generar_pdf(REPORTE['usuario'], REPORTE['finanzas'], REPORTE['analisis'])
+    primera = time.perf_counter() - inicio
+    resultado = _resumen(medir(lambda: generar_pdf(REPORTE['usuario'], REPORTE['finanzas'], REPORTE['analisis']), 5, 5), 5)
+    resultado["primera_s"] = primera
+    return resultado
+
+
+def caso_registrar_usuario():
+    contador = iter(range(10**9))
+
+    def correr():
+        n = next(contador)
+        base_datos.guardar_usuario(f"Usuario {n}", 30 + n % 40, f"usuario{n}@example.com", "3000000000")
+    return _resumen(medir(correr, 200, 5), 200)
+
+
+def caso_rerun(app):
+    from streamlit.testing.v1 import AppTest
+
+    # AppTest resuelve las rutas relativas desde este módulo, no desde el directorio actual
+    prueba = AppTest.from_file(os.path.abspath(app), default_timeout=60)
+    prueba.secrets["BENCHMARK"] = "1"
+    inicio = time.perf_counter()
+    prueba.run()
+    primera = time.perf_counter() - inicio
+    if prueba.exception:
+        raise RuntimeError(f"La app falló en AppTest: {prueba.exception[0].message}")
+    resultado = _resumen(medir(prueba.run, 3, 5), 3)
+    resultado["primera_s"] = primera
+    return resultado
+
+
+# Primer render de la app en un proceso nuevo; streamlit ya está importado, como en el servidor
+_PRIMER_RENDER = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+prueba = AppTest.from_file(sys.argv[1], default_timeout=120)
+prueba.secrets["BENCHMARK"] = "1"
+inicio = time.perf_counter()
+prueba.run()
+segundos = time.perf_counter() - inicio
+print(json.dumps({"s": segundos, "fallo": bool(prueba.exception),
+                  "pesados": [m for m in sys.argv[2:] if m in sys.modules]}))
+"""
+
+
+def _proceso_nuevo(codigo, *argumentos):
+    # La base de datos temporal de `ejecutar`, no `usuarios.db` de la carpeta actual
+    entorno = dict(os.environ, CALCULADORA_PRECALENTAR="0", CALCULADORA_DB=os.path.abspath(base_datos.DB_PATH),
+                   PYTHONPATH=os.pathsep.join(filter(None, [RAIZ, os.environ.get('PYTHONPATH')])))
+    salida = subprocess.run([sys.executable, "-c", codigo, *argumentos], env=entorno,
+                            capture_output=True, text=True, check=True)
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def caso_arranque(app, repeticiones=3):
+    # Arranque en frío: cada medición en un intérprete nuevo, sin nada importado de antes
+    tiempos = []
+    for _ in range(repeticiones):
+        render = _proceso_nuevo(_PRIMER_RENDER, os.path.abspath(app), *arranque.PESADOS)
+        if render["fallo"]:
+            raise RuntimeError("La app falló en AppTest")
+        tiempos.append(render["s"])
+    resultado = _resumen(tiempos, 1)
+    # Lo que el primer render cargó igual; debería quedar vacío
+    resultado["pesados_en_primer_render"] = render["pesados"]
+    resultado["importar_s"] = {
+        modulo: _proceso_nuevo(
+            f"import json, time; inicio = time.perf_counter(); import {modulo}; "
+            f"print(json.dumps(time.perf_counter() - inicio))"
+        )
+        for modulo in arranque.PESADOS
+    }
+    return resultado
+
+
+CASOS = {
+    "parse_currency": lambda args: caso_parse_currency(),
+    "parse_currency_serie": lambda args: caso_parse_currency_serie(),
+    "format_currency": lambda args: caso_format_currency(),
+    "format_currency_serie": lambda args: caso_format_currency_serie(),
+    "importacion": lambda args: caso_importacion(),
+    "extractos": lambda args: caso_extractos(),
+    "dinero_columna": lambda args: caso_dinero_columna(),
+    "dinero_decimal": lambda args: caso_dinero_decimal(),
+    "totales_fila": lambda args: caso_totales_fila(),
+    "situacion_financiera": lambda args: caso_situacion_financiera(),
+    "proyeccion_retiro": lambda args: caso_proyeccion_retiro(),
+    "pdf": lambda args: caso_pdf(),
+    "registrar_usuario": lambda args: caso_registrar_usuario(),
+    "rerun": lambda args: caso_rerun(args.app),
+    "arranque": lambda args: caso_arranque(args.app),
+}
+
+
+def ejecutar(args):
+    temporal = tempfile.mkdtemp(prefix="calculadora-bench-")
+    base_datos.DB_PATH = os.path.join(temporal, "bench.db")
+    os.environ['CALCULADORA_CACHE_DIR'] = os.path.join(temporal, "cache")
+    base_datos.crear_base_datos()
+
+    resultados = {}
+    for nombre in args.solo or CASOS:
+        print(f"{nombre}...", end=" ", flush=True)
+        resultados[nombre] = CASOS[nombre](args)
+        print(f"{resultados[nombre]['mediana_s'] * 1e6:,.1f} µs")
+    return {
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "app": os.path.basename(args.app),
+        "resultados": resultados,
+    }
+
+
+def comparar(actual, base, tolerancia=TOLERANCIA):
+    """Lista de (caso, min_base, min_actual, cambio, es_regresion)."""
+    filas = []
+    for nombre, resultado in actual["resultados"].items():
+        anterior = base["resultados"].get(nombre)
+        if not anterior:
+            continue
+        cambio = resultado["min_s"] / anterior["min_s"] - 1
+        filas.append((nombre, anterior["min_s"], resultado["min_s"], cambio, cambio > tolerancia))
+    return filas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks de la calculadora financiera")
+    parser.add_argument("--salida", default="bench.json", help="Archivo JSON de resultados")
+    parser.add_argument("--base", help="JSON de una corrida anterior para comparar")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA,
+                        help="Empeoramiento relativo aceptado (0.15 = 15%%)")
+    parser.add_argument("--app", default=APP_POR_DEFECTO, help="Versión de la app para medir el rerun")
+    parser.add_argument("--solo", nargs="+", choices=list(CASOS), help="Casos a ejecutar")
+    args = parser.parse_args()
+
+    actual = ejecutar(args)
+    with open(args.salida, "w", encoding="utf-8") as archivo:
+        json.dump(actual, archivo, indent=2, ensure_ascii=False)
+    print(f"Resultados -> {args.salida}")
+
+    if args.base:
+        with open(args.base, encoding="utf-8") as archivo:
+            base = json.load(archivo)
+        regresiones = 0
+        for nombre, anterior, ahora, cambio, es_regresion in comparar(actual, base, args.tolerancia):
+            marca = "REGRESIÓN" if es_regresion else "ok"
+            print(f"{nombre:22} {anterior * 1e6:12,.1f} µs -> {ahora * 1e6:12,.1f} µs  {cambio:+7.1%}  {marca}")
+            regresiones += es_regresion
+        if regresiones:
+            sys.exit(1)
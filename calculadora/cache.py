@@ -0,0 +1,193 @@
+"""Caché de bytes direccionada por contenido.
+
+La clave es la huella SHA-256 de los datos de entrada, así que dos
+solicitudes con los mismos datos comparten resultado sin importar la sesión.
+Los valores viven en memoria con política LRU limitada por tamaño; si se
+indica un directorio, cada valor nuevo también se escribe a disco (LRU
+limitado por tamaño), así sobrevive a la memoria y a un reinicio del proceso
+y se recupera desde ahí antes de volver a generarlo.
+Con `ttl_segundos`, una entrada que no se usa durante ese tiempo vence, en
+memoria y en disco. La carpeta se crea (o se deja) con permisos 0700 y cada
+archivo con 0600.
+
+El tamaño y el orden LRU del disco se llevan en memoria: la carpeta se recorre
+una sola vez, al crear la caché, y cada escritura solo borra lo que expulsa.
+Si varios procesos comparten la carpeta, cada uno expulsa según su propio
+índice; lo que escribieron los demás lo ve al leerlo o al reiniciar.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+def huella(*objetos):
+    """SHA-256 estable de objetos JSON (el orden de las llaves no importa)."""
+    contenido = json.dumps(objetos, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(contenido.encode("utf-8")).hexdigest()
+
+
+class CacheContenido:
+    def __init__(self, max_bytes_memoria=32 * 1024 * 1024, directorio=None, max_bytes_disco=256 * 1024 * 1024,
+                 ttl_segundos=None):
+        self.max_bytes_memoria = max_bytes_memoria
+        self.directorio = directorio
+        self.max_bytes_disco = max_bytes_disco
+        self.ttl_segundos = ttl_segundos
+        self._memoria = OrderedDict()
+        self._usos = {}
+        self._bytes_memoria = 0
+        # clave -> (bytes, último uso) de los archivos en disco, del menos al más reciente
+        self._disco = OrderedDict()
+        self._bytes_disco = 0
+        self._bloqueo = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        if directorio:
+            # Los valores pueden ser reportes con datos personales: solo el dueño del proceso los lee
+            os.makedirs(directorio, mode=0o700, exist_ok=True)
+            os.chmod(directorio, 0o700)
+            self._indexar_disco()
+
+    def __len__(self):
+        return len(self._memoria)
+
+    def obtener(self, clave):
+        with self._bloqueo:
+            datos = self._memoria.get(clave)
+            if datos is not None and self._vencida(self._usos[clave]):
+                self._bytes_memoria -= len(self._memoria.pop(clave))
+                del self._usos[clave]
+                datos = None
+            if datos is not None:
+                self._memoria.move_to_end(clave)
+                self._usos[clave] = time.time()
+                self.aciertos += 1
+                return datos
+        datos = self._leer_disco(clave)
+        with self._bloqueo:
+            if datos is None:
+                self.fallos += 1
+                return None
+            self.aciertos += 1
+            self._guardar_memoria(clave, datos)
+        return datos
+
+    def guardar(self, clave, datos):
+        with self._bloqueo:
+            self._guardar_memoria(clave, datos)
+        self._escribir_disco(clave, datos)
+
+    def obtener_o_generar(self, clave, generar):
+        datos = self.obtener(clave)
+        if datos is None:
+            datos = generar()
+            self.guardar(clave, datos)
+        return datos
+
+    def _vencida(self, ultimo_uso):
+        return self.ttl_segundos is not None and time.time() - ultimo_uso > self.ttl_segundos
+
+    def _guardar_memoria(self, clave, datos):
+        if clave in self._memoria:
+            self._bytes_memoria -= len(self._memoria.pop(clave))
+        self._memoria[clave] = datos
+        self._usos[clave] = time.time()
+        self._bytes_memoria += len(datos)
+        # Hasta el límite, aunque salga la recién guardada: con 0 solo queda el disco
+        while self._memoria and self._bytes_memoria > self.max_bytes_memoria:
+            clave_vieja, datos_viejos = self._memoria.popitem(last=False)
+            self._bytes_memoria -= len(datos_viejos)
+            del self._usos[clave_vieja]
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, clave)
+
+    def _indexar_disco(self):
+        """Único recorrido de la carpeta: arma el índice LRU y aplica el TTL y el límite."""
+        entradas = []
+        for entrada in os.scandir(self.directorio):
+            if not entrada.is_file():
+                continue
+            if entrada.name.endswith(".tmp"):
+                # Escritura interrumpida de una corrida anterior
+                self._borrar(entrada.path)
+                continue
+            estado = entrada.stat()
+            entradas.append((estado.st_mtime, entrada.name, estado.st_size))
+        with self._bloqueo:
+            for ultimo_uso, clave, tamano in sorted(entradas):
+                self._disco[clave] = (tamano, ultimo_uso)
+                self._bytes_disco += tamano
+            expulsadas = self._expulsar_disco()
+        self._borrar_claves(expulsadas)
+
+    def _expulsar_disco(self):
+        """Saca del índice lo vencido y lo que pasa del límite; devuelve las claves a borrar."""
+        expulsadas = []
+        while self._disco:
+            clave, (tamano, ultimo_uso) = next(iter(self._disco.items()))
+            if self._bytes_disco <= self.max_bytes_disco and not self._vencida(ultimo_uso):
+                break
+            del self._disco[clave]
+            self._bytes_disco -= tamano
+            expulsadas.append(clave)
+        return expulsadas
+
+    def _olvidar_disco(self, clave):
+        tamano, _ = self._disco.pop(clave, (0, None))
+        self._bytes_disco -= tamano
+
+    def _leer_disco(self, clave):
+        if not self.directorio:
+            return None
+        with self._bloqueo:
+            indexada = self._disco.get(clave)
+            vencida = indexada is not None and self._vencida(indexada[1])
+            if vencida:
+                self._olvidar_disco(clave)
+        if vencida:
+            self._borrar(self._ruta(clave))
+            return None
+        try:
+            with open(self._ruta(clave), "rb") as archivo:
+                datos = archivo.read()
+            # Actualiza la fecha de uso para que la expulsión en disco también sea LRU tras reiniciar
+            os.utime(self._ruta(clave))
+        except FileNotFoundError:
+            with self._bloqueo:
+                self._olvidar_disco(clave)
+            return None
+        with self._bloqueo:
+            # Puede haberla escrito otro proceso que comparte la carpeta
+            self._olvidar_disco(clave)
+            self._disco[clave] = (len(datos), time.time())
+            self._bytes_disco += len(datos)
+        return datos
+
+    def _escribir_disco(self, clave, datos):
+        if not self.directorio:
+            return
+        # Proceso e hilo: otros procesos pueden compartir la misma carpeta
+        temporal = f"{self._ruta(clave)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(os.open(temporal, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "wb") as archivo:
+            archivo.write(datos)
+        os.replace(temporal, self._ruta(clave))
+        with self._bloqueo:
+            self._olvidar_disco(clave)
+            self._disco[clave] = (len(datos), time.time())
+            self._bytes_disco += len(datos)
+            expulsadas = self._expulsar_disco()
+        self._borrar_claves(expulsadas)
+
+    def _borrar_claves(self, claves):
+        for clave in claves:
+            self._borrar(self._ruta(clave))
+
+    def _borrar(self, ruta):
+        try:
+            os.remove(ruta)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,268 @@
+"""Prueba de carga: N sesiones simuladas recorriendo la app completa.
+
+Uso:
+
+    python -m calculadora.carga --sesiones 8
+    python -m calculadora.carga --rampa 1 2 4 8 16 32 --salida carga.json
+    python -m calculadora.carga --app APPCALAJUSTES_V7780.py --latencia-ia 1.5
+
+Cada sesión es un `AppTest` sobre el `main()` real de la app y hace lo que
+haría un asistente del taller: registrarse, llenar algunos campos del
+balance y del flujo de caja (un rerun por campo, como en el navegador),
+analizar, pedir la estrategia con IA, calcular el retiro y generar el PDF.
+La IA responde desde `calculadora.stub_ia` con la latencia indicada.
+
+Todas las sesiones comparten el proceso, igual que en un servidor de
+Streamlit, así que el GIL, las cachés y SQLite se reparten como en
+producción. Se informa la latencia por rerun (p50/p95/p99), la CPU usada y
+la memoria residente máxima. En modo rampa se repite con cada cantidad de
+sesiones y se marca la saturación: el primer nivel en que el rendimiento
+deja de crecer o el p95 pasa el límite.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from calculadora import base_datos, stub_ia
+from calculadora.reporte_pdf import generar_pdf
+from calculadora.sesiones import rss_bytes
+
+APP_POR_DEFECTO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                               "APPCALAJUSTES_V7780.py")
+LIMITE_P95 = 1.0
+# Crecimiento mínimo de rendimiento entre niveles para no considerar saturación
+CRECIMIENTO_MINIMO = 0.10
+
+BOTON_GUARDAR = "Guardar información personal"
+BOTON_ANALIZAR = "Analizar mi situación financiera para bienes raíces"
+BOTON_ESTRATEGIA = "Generar estrategia personalizada"
+BOTON_RETIRO = "Calcular proyección de retiro con bienes raíces"
+
+CAMPOS_BALANCE = (
+    ("activo_valor_Inmueble 1", 150_000_000, 400_000_000),
+    ("activo_deuda_Inmueble 1", 0, 120_000_000),
+    ("activo_valor_Automóvil 1", 10_000_000, 80_000_000),
+    ("activo_valor_Efectivo cuenta 1", 0, 30_000_000),
+    ("pasivo_valor_Tarjeta de crédito 1", 0, 15_000_000),
+    ("ingreso_Ingresos mensuales adulto 1", 2_000_000, 15_000_000),
+    ("ingreso_Otros ingresos", 0, 3_000_000),
+    ("gasto_Alimentación", 500_000, 2_500_000),
+    ("gasto_Transporte", 100_000, 800_000),
+    ("gasto_Servicios públicos", 150_000, 600_000),
+)
+
+
+def _boton(prueba, etiqueta):
+    return next(boton for boton in prueba.button if boton.label == etiqueta)
+
+
+def _por_etiqueta(elementos, etiqueta):
+    return next(elemento for elemento in elementos if elemento.label == etiqueta)
+
+
+def simular_sesion(app, numero, pausa=0.0):
+    """Recorre el flujo completo. Devuelve [(paso, segundos), ...]."""
+    from streamlit.testing.v1 import AppTest
+
+    azar = random.Random(numero)
+    tiempos = []
+    # AppTest resuelve las rutas relativas desde este módulo, no desde el directorio actual
+    prueba = AppTest.from_file(os.path.abspath(app), default_timeout=120)
+
+    def paso(nombre, accion=None):
+        if accion:
+            accion()
+        inicio = time.perf_counter()
+        prueba.run()
+        tiempos.append((nombre, time.perf_counter() - inicio))
+        if prueba.exception:
+            raise RuntimeError(f"Sesión {numero}, paso {nombre}: {prueba.exception[0].message}")
+        if pausa:
+            time.sleep(pausa)
+
+    paso("inicio")
+    paso("registro", lambda: (
+        _por_etiqueta(prueba.text_input, "Nombre completo").input(f"Asistente {numero}"),
+        _por_etiqueta(prueba.number_input, "Edad").set_value(azar.randint(22, 64)),
+        _por_etiqueta(prueba.text_input, "Email").input(f"asistente{numero}@example.com"),
+        _por_etiqueta(prueba.text_input, "Teléfono").input(f"300{numero:07d}"),
+        _boton(prueba, BOTON_GUARDAR).click(),
+    ))
+    for clave, minimo, maximo in CAMPOS_BALANCE:
+        valor = azar.randrange(minimo, maximo + 1, 1000)
+        paso("balance", lambda clave=clave, valor=valor: prueba.text_input(key=clave).input(f"${valor:,}"))
+    paso("analizar", lambda: _boton(prueba, BOTON_ANALIZAR).click())
+    paso("estrategia", lambda: _boton(prueba, BOTON_ESTRATEGIA).click())
+    paso("retiro", lambda: _boton(prueba, BOTON_RETIRO).click())
+
+    # El botón de descarga no se puede pulsar en AppTest: se genera el mismo PDF
+    reporte_data = prueba.session_state['reporte_data']
+    inicio = time.perf_counter()
+    generar_pdf(reporte_data['usuario'], reporte_data['finanzas'], reporte_data['analisis'])
+    tiempos.append(("pdf", time.perf_counter() - inicio))
+    return tiempos
+
+
+class _MuestreoMemoria:
+    def __init__(self, intervalo=0.1):
+        self.intervalo = intervalo
+        self.maximo = rss_bytes()
+        self._detener = threading.Event()
+        self._hilo = threading.Thread(target=self._muestrear, daemon=True)
+
+    def _muestrear(self):
+        while not self._detener.wait(self.intervalo):
+            self.maximo = max(self.maximo, rss_bytes())
+
+    def __enter__(self):
+        self._hilo.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._detener.set()
+        self._hilo.join()
+
+
+def percentiles(valores):
+    if len(valores) < 2:
+        valor = valores[0] if valores else None
+        return {"p50": valor, "p95": valor, "p99": valor}
+    cortes = statistics.quantiles(valores, n=100, method="inclusive")
+    return {"p50": cortes[49], "p95": cortes[94], "p99": cortes[98]}
+
+
+def ejecutar_nivel(app, sesiones, pausa=0.0, escalonar=0.0):
+    def lanzar(numero):
+        time.sleep(numero * escalonar)
+        return simular_sesion(app, numero, pausa)
+
+    cpu_inicio = time.process_time()
+    inicio = time.perf_counter()
+    with _MuestreoMemoria() as memoria, ThreadPoolExecutor(max_workers=sesiones) as pool:
+        resultados = list(pool.map(lanzar, range(sesiones)))
+    duracion = time.perf_counter() - inicio
+    cpu = time.process_time() - cpu_inicio
+
+    reruns = [segundos for tiempos in resultados for paso, segundos in tiempos if paso != "pdf"]
+    por_paso = {}
+    for tiempos in resultados:
+        for paso, segundos in tiempos:
+            por_paso.setdefault(paso, []).append(segundos)
+    return {
+        "sesiones": sesiones,
+        "duracion_s": duracion,
+        "sesiones_por_minuto": 60 * sesiones / duracion,
+        "reruns_por_segundo": len(reruns) / duracion,
+        "rerun": percentiles(reruns),
+        "pasos": {paso: percentiles(valores) for paso, valores in por_paso.items()},
+        "cpu_s": cpu,
+        "cpu_porcentaje": 100 * cpu / duracion,
+        "rss_max_mb": memoria.maximo / 2**20,
+    }
+
+
+def buscar_saturacion(niveles, limite_p95=LIMITE_P95):
+    """Primer nivel en que el rendimiento no crece lo suficiente o el p95 pasa el límite."""
+    anterior = None
+    for nivel in niveles:
+        if nivel["rerun"]["p95"] > limite_p95:
+            return nivel["sesiones"]
+        if anterior and nivel["reruns_por_segundo"] < anterior["reruns_por_segundo"] * (1 + CRECIMIENTO_MINIMO):
+            return nivel["sesiones"]
+        anterior = nivel
+    return None
+
+
+def _imprimir(nivel):
+    rerun = nivel["rerun"]
+    print(f"{nivel['sesiones']:4d} sesiones  {nivel['reruns_por_segundo']:7.1f} reruns/s  "
+          f"p50 {rerun['p50'] * 1000:7.0f} ms  p95 {rerun['p95'] * 1000:7.0f} ms  p99 {rerun['p99'] * 1000:7.0f} ms  "
+          f"CPU {nivel['cpu_porcentaje']:5.0f}%  RSS {nivel['rss_max_mb']:6.0f} MB")
+
+
+def _apptest_concurrente():
+    """Permite varios `AppTest.run` a la vez en el mismo proceso.
+
+    AppTest está pensado para un run a la vez: activa `global.appTest` y
+    asigna un `Runtime` simulado globales al empezar, y los restaura al
+    terminar, dejando sin runtime a los demás runs en curso. Aquí la opción
+    queda activa todo el tiempo y `Runtime.instance()` recurre al último
+    runtime simulado cuando otro run ya lo limpió.
+    """
+    from streamlit import config
+    from streamlit.runtime import Runtime
+
+    config.set_option("global.appTest", True)
+    ultimo = []
+
+    def instance(cls):
+        if cls._instance is not None:
+            ultimo[:] = [cls._instance]
+            return cls._instance
+        if ultimo:
+            return ultimo[0]
+        raise RuntimeError("Runtime hasn't been created!")
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: cls._instance is not None or bool(ultimo))
+
+
+def preparar_entorno(latencia_ia):
+    """Base de datos, caché y secretos temporales, e IA apuntando al stub local."""
+    from streamlit import config
+
+    temporal = tempfile.mkdtemp(prefix="calculadora-carga-")
+    base_datos.DB_PATH = os.path.join(temporal, "carga.db")
+    os.environ['CALCULADORA_CACHE_DIR'] = os.path.join(temporal, "cache")
+    base_datos.crear_base_datos()
+
+    # Secretos en archivo y no con `AppTest.secrets`: este reemplaza `st.secrets`
+    # global en cada run y las sesiones concurrentes se pisarían entre sí
+    secretos = os.path.join(temporal, "secrets.toml")
+    with open(secretos, "w", encoding="utf-8") as archivo:
+        archivo.write('OPENAI_API_KEY = "stub"\n')
+    config.set_option("secrets.files", [secretos])
+    _apptest_concurrente()
+
+    servidor, url = stub_ia.iniciar(latencia_ia)
+    os.environ['OPENAI_BASE_URL'] = url
+    return servidor
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prueba de carga de la calculadora con sesiones simuladas")
+    parser.add_argument("--app", default=APP_POR_DEFECTO, help="Versión de la app a probar")
+    parser.add_argument("--sesiones", type=int, default=4, help="Sesiones concurrentes")
+    parser.add_argument("--rampa", type=int, nargs="+", help="Cantidades de sesiones a probar en orden")
+    parser.add_argument("--latencia-ia", type=float, default=0.5, help="Segundos de respuesta del stub de IA")
+    parser.add_argument("--pausa", type=float, default=0.0, help="Segundos de espera entre pasos de una sesión")
+    parser.add_argument("--escalonar", type=float, default=0.0, help="Segundos entre el inicio de cada sesión")
+    parser.add_argument("--limite-p95", type=float, default=LIMITE_P95, help="p95 de rerun aceptable, en segundos")
+    parser.add_argument("--salida", help="Archivo JSON con los resultados")
+    args = parser.parse_args()
+
+    servidor = preparar_entorno(args.latencia_ia)
+    # Una sesión de calentamiento carga módulos, fuentes y cachés antes de medir
+    simular_sesion(args.app, -1)
+    niveles = []
+    for sesiones in args.rampa or [args.sesiones]:
+        niveles.append(ejecutar_nivel(args.app, sesiones, args.pausa, args.escalonar))
+        _imprimir(niveles[-1])
+    servidor.shutdown()
+
+    resultado = {"app": os.path.basename(args.app), "latencia_ia_s": args.latencia_ia, "niveles": niveles}
+    if args.rampa:
+        resultado["saturacion"] = buscar_saturacion(niveles, args.limite_p95)
+        if resultado["saturacion"]:
+            print(f"Saturación a partir de {resultado['saturacion']} sesiones")
+        else:
+            print("No se alcanzó la saturación en la rampa probada")
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            json.dump(resultado, archivo, indent=2, ensure_ascii=False)
@@ -0,0 +1,164 @@
+"""Montos exactos en centavos enteros y columnas de montos sobre arreglos int64.
+
+Los montos se guardan como centavos (`int`/`numpy.int64`), así sumar o
+restar cientos de partidas nunca acumula error de punto flotante. Se
+convierte a pesos (`float`) solo al mostrar o al llamar código que espera
+pesos:
+
+    activos = ColumnaDinero(["Casa", "Carro"])
+    activos.fijar_pesos("Casa", parse_currency("$250,000,000.10"))
+    activos["Carro"] = 4_000_000_005          # centavos
+    activos.total_pesos()                     # 290000000.15, exacto
+
+Una `ColumnaDinero` guarda una columna del balance (nombres + arreglo de
+centavos) y opera sobre todo el arreglo a la vez: suma, resta, negación,
+porcentajes con redondeo exacto y participación de cada fila en el total.
+Para decenas de miles de filas es mucho más rápida que `decimal.Decimal`.
+"""
+import numpy as np
+
+from calculadora.moneda import LOCALE_POR_DEFECTO, parse_currency_serie
+
+
+def a_centavos(pesos):
+    """Pesos (float) a centavos enteros, redondeando al centavo más cercano."""
+    return int(round(pesos * 100))
+
+
+def a_pesos(centavos):
+    return centavos / 100
+
+
+_MAXIMO = np.iinfo(np.int64).max
+_MINIMO = np.iinfo(np.int64).min
+
+
+def _revisar_desborde(desbordes):
+    if desbordes.any():
+        raise OverflowError("El resultado no cabe en centavos int64")
+
+
+def _maximo_absoluto(centavos):
+    if not len(centavos):
+        return 0
+    return max(int(centavos.max()), -int(centavos.min()))
+
+
+def _redondear_division(numerador, divisor):
+    """División entera de arreglos redondeando la mitad lejos de cero."""
+    signo = np.sign(numerador)
+    return signo * ((np.abs(numerador) + divisor // 2) // divisor)
+
+
+class ColumnaDinero:
+    __slots__ = ("nombres", "centavos", "_indices")
+
+    def __init__(self, nombres, centavos=None):
+        self.nombres = tuple(nombres)
+        # Se arma al primer acceso por nombre; las columnas derivadas lo comparten
+        self._indices = None
+        if centavos is None:
+            self.centavos = np.zeros(len(self.nombres), dtype=np.int64)
+        else:
+            self.centavos = np.asarray(centavos, dtype=np.int64)
+            if self.centavos.shape != (len(self.nombres),):
+                raise ValueError(f"Se esperaban {len(self.nombres)} montos y llegaron {self.centavos.shape}")
+
+    @classmethod
+    def desde_pesos(cls, nombres, pesos):
+        return cls(nombres, np.rint(np.asarray(pesos, dtype=np.float64) * 100).astype(np.int64))
+
+    @classmethod
+    def desde_textos(cls, nombres, textos, locale=LOCALE_POR_DEFECTO):
+        """Columna a partir de textos como "$1,234.56" (ver `parse_currency_serie`)."""
+        import pandas as pd
+
+        return cls.desde_pesos(nombres, parse_currency_serie(pd.Series(list(textos)), locale).to_numpy())
+
+    def __len__(self):
+        return len(self.nombres)
+
+    def __repr__(self):
+        return f"ColumnaDinero({len(self)} filas, total={self.total_pesos():,.2f})"
+
+    def _indice(self, nombre):
+        if self._indices is None:
+            self._indices = {nombre: i for i, nombre in enumerate(self.nombres)}
+        return self._indices[nombre]
+
+    def _derivada(self, centavos):
+        columna = ColumnaDinero.__new__(ColumnaDinero)
+        columna.nombres = self.nombres
+        columna._indices = self._indices
+        columna.centavos = centavos
+        return columna
+
+    def __getitem__(self, nombre):
+        return int(self.centavos[self._indice(nombre)])
+
+    def __setitem__(self, nombre, centavos):
+        self.centavos[self._indice(nombre)] = centavos
+
+    def fijar_pesos(self, nombre, pesos):
+        self[nombre] = a_centavos(pesos)
+
+    def _otro(self, otro):
+        if isinstance(otro, ColumnaDinero):
+            if otro.nombres is not self.nombres and otro.nombres != self.nombres:
+                raise ValueError("Las columnas tienen filas distintas")
+            return otro.centavos
+        return np.int64(otro)
+
+    # numpy da la vuelta en silencio al pasar de int64: se revisa el signo del resultado
+    def __add__(self, otro):
+        otros = self._otro(otro)
+        with np.errstate(over="ignore"):
+            resultado = self.centavos + otros
+        _revisar_desborde(((self.centavos ^ resultado) & (otros ^ resultado)) < 0)
+        return self._derivada(resultado)
+
+    def __sub__(self, otro):
+        otros = self._otro(otro)
+        with np.errstate(over="ignore"):
+            resultado = self.centavos - otros
+        _revisar_desborde(((self.centavos ^ otros) & (self.centavos ^ resultado)) < 0)
+        return self._derivada(resultado)
+
+    def __neg__(self):
+        _revisar_desborde(self.centavos == _MINIMO)
+        return self._derivada(-self.centavos)
+
+    def total(self):
+        """Suma exacta en centavos (un `int` de Python si no cabe en int64)."""
+        if _maximo_absoluto(self.centavos) > _MAXIMO // max(len(self), 1):
+            return sum(self.centavos.tolist())
+        return int(self.centavos.sum())
+
+    def total_pesos(self):
+        return a_pesos(self.total())
+
+    def porcentaje(self, por_ciento):
+        """Columna con el `por_ciento` de cada monto, redondeado al centavo.
+
+        El porcentaje se toma con dos decimales (12.5 -> 1250 centésimas de
+        punto) y el resto de la cuenta es entera.
+        """
+        centesimas = int(round(por_ciento * 100))
+        # El producto y la mitad del divisor que suma el redondeo deben caber en int64
+        if centesimas and _maximo_absoluto(self.centavos) > (_MAXIMO - 5_000) // abs(centesimas):
+            raise OverflowError("El resultado no cabe en centavos int64")
+        return self._derivada(_redondear_division(self.centavos * centesimas, 10_000))
+
+    def participacion(self):
+        """Porcentaje que cada fila representa del total (floats, para mostrar)."""
+        total = self.total()
+        if total == 0:
+            return np.zeros(len(self), dtype=np.float64)
+        return self.centavos * (100 / total)
+
+    def pesos(self):
+        return self.centavos / 100
+
+    def como_dict(self):
+        """{nombre: pesos}, para guardar en la sesión o en el reporte."""
+        return dict(zip(self.nombres, self.pesos().tolist()))
@@ -0,0 +1,168 @@
+"""Estado compartido entre las secciones de la app y conteo de reruns evitados.
+
+La app se divide en fragmentos (`st.fragment`): registro, balance, flujo,
+estrategia, retiro y reporte. Tocar un widget vuelve a ejecutar solo el
+fragmento que lo contiene, no toda la página. Los fragmentos no comparten
+variables locales: todo lo que uno escribe y otro lee pasa por `EstadoApp`,
+una vista con nombres y tipos fijos sobre `st.session_state`. Los datos
+siguen viviendo en `st.session_state`, donde los buscan `sesiones` y
+`grabacion`.
+
+Cuando un fragmento cambia algo que otro muestra (se registra el usuario,
+se importa un archivo) llama a `EstadoApp.publicar()`, que pide un rerun
+de toda la app. Lo mismo pasa, una sola vez, cuando un cambio en los montos
+deja sucia una sección de `totales.SECCIONES` que estaba al día.
+
+    @fragmento("retiro")
+    def seccion_retiro(estado):
+        ...
+
+    seccion_retiro(EstadoApp())
+
+`fragmento` cuenta los runs completos y los reruns de cada fragmento en
+`st.session_state['_reruns']`: cada rerun de un fragmento es un rerun de
+toda la página que no ocurrió. `sesiones` incluye estos números en la foto
+del proceso y el panel de administración los muestra.
+"""
+import functools
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from calculadora import grabacion, sesiones
+from calculadora.totales import GrafoTotales
+
+# Montos de cada campo, para volver a dibujarlos (las claves de siempre en la sesión)
+VALORES = {
+    "activos": ("activos_values", ("valor", "deuda")),
+    "pasivos": ("pasivos_values", ("valor", "deuda")),
+    "ingresos": ("ingresos_values", ("valor",)),
+    "gastos": ("gastos_values", ("valor",)),
+}
+
+
+class EstadoApp:
+    def __init__(self, session_state=None):
+        self._sesion = st.session_state if session_state is None else session_state
+        if 'reporte_data' not in self._sesion:
+            self._sesion['reporte_data'] = {'usuario': {}, 'finanzas': {}, 'analisis': {}}
+
+    # Registro
+    @property
+    def registrado(self) -> bool:
+        return 'usuario_id' in self._sesion
+
+    @property
+    def usuario_id(self) -> int | None:
+        return self._sesion.get('usuario_id')
+
+    @usuario_id.setter
+    def usuario_id(self, valor: int | None):
+        self._sesion['usuario_id'] = valor
+
+    # Lo que va al reporte
+    @property
+    def reporte_data(self) -> dict:
+        return self._sesion['reporte_data']
+
+    @property
+    def usuario(self) -> dict:
+        return self.reporte_data['usuario']
+
+    @usuario.setter
+    def usuario(self, valor: dict):
+        self.reporte_data['usuario'] = valor
+
+    @property
+    def finanzas(self) -> dict:
+        return self.reporte_data['finanzas']
+
+    @finanzas.setter
+    def finanzas(self, valor: dict):
+        self.reporte_data['finanzas'] = valor
+
+    @property
+    def analisis(self) -> dict:
+        return self.reporte_data['analisis']
+
+    @property
+    def plan_inversion(self) -> tuple | None:
+        return self._sesion.get('plan_inversion')
+
+    @plan_inversion.setter
+    def plan_inversion(self, valor: tuple):
+        self._sesion['plan_inversion'] = valor
+
+    # Balance y flujo de caja
+    @property
+    def totales(self) -> GrafoTotales:
+        if 'totales' not in self._sesion:
+            self._sesion['totales'] = GrafoTotales()
+        return self._sesion['totales']
+
+    def valores(self, seccion: str, nombres=()) -> dict:
+        """{nombre: {"valor": pesos, ...}} de una sección; se crea en cero la primera vez."""
+        clave, campos = VALORES[seccion]
+        if clave not in self._sesion:
+            self._sesion[clave] = {nombre: dict.fromkeys(campos, 0.0) for nombre in nombres}
+        return self._sesion[clave]
+
+    @property
+    def importado(self) -> dict | None:
+        """Columnas de activos y pasivos importadas de un archivo (ver `importacion`)."""
+        return self._sesion.get('importado')
+
+    @importado.setter
+    def importado(self, valor: dict | None):
+        self._sesion['importado'] = valor
+
+    # Comunicación entre fragmentos
+    def avisar(self, seccion: str, texto: str):
+        """Mensaje para mostrar en `seccion` en su próximo run (sobrevive a `publicar`)."""
+        self._sesion.setdefault('_avisos', {})[seccion] = texto
+
+    def tomar_aviso(self, seccion: str) -> str | None:
+        return self._sesion.get('_avisos', {}).pop(seccion, None)
+
+    def publicar(self):
+        """Pide un rerun de toda la app: otro fragmento debe ver lo que cambió."""
+        st.rerun(scope="app")
+
+    # Conteo de reruns
+    def _reruns(self) -> dict:
+        if '_reruns' not in self._sesion:
+            self._sesion['_reruns'] = {"completos": 0, "fragmentos": {}}
+        return self._sesion['_reruns']
+
+    def comenzar_run_completo(self):
+        self._reruns()["completos"] += 1
+        self._sesion['_sucias_publicadas'] = set(self.totales.sucias)
+
+    def contar_fragmento(self, nombre: str):
+        fragmentos = self._reruns()["fragmentos"]
+        fragmentos[nombre] = fragmentos.get(nombre, 0) + 1
+
+    def secciones_nuevas_sucias(self) -> set:
+        """Secciones que quedaron sucias desde el último run completo."""
+        return self.totales.sucias - self._sesion.get('_sucias_publicadas', set())
+
+
+def fragmento(nombre):
+    """Decorador: la sección corre como `st.fragment` y cuenta sus reruns propios."""
+    def decorar(funcion):
+        @st.fragment
+        @functools.wraps(funcion)
+        def seccion(estado, *args, **kwargs):
+            ctx = get_script_run_ctx()
+            solo_fragmento = bool(ctx and ctx.fragment_ids_this_run)
+            if solo_fragmento:
+                # main() no corre en un rerun de fragmento: lo que hace al comienzo de cada run
+                grabacion.comenzar_run()
+                sesiones.comenzar_run()
+                estado.contar_fragmento(nombre)
+            resultado = funcion(estado, *args, **kwargs)
+            if solo_fragmento and estado.secciones_nuevas_sucias():
+                estado.publicar()
+            return resultado
+        return seccion
+    return decorar
@@ -0,0 +1,140 @@
+"""Recursos estáticos de la app: estilos, HTML fijo y logo.
+
+Lo que no cambia entre reruns se arma una sola vez, al importar el módulo,
+y la app solo envía las constantes:
+
+- `ESTILOS_HTML`: `calculadora/estilos.css` minificado dentro de `<style>`.
+- `TABLA_EJEMPLO_HTML`: la tabla de ejemplo del balance, con sus totales.
+- `ENCABEZADO_HTML`: título, logo e introducción.
+
+El logo no se descarga de GitHub ni va en base64 dentro del HTML: Streamlit
+lo sirve desde `static/` (`server.enableStaticServing` en
+`.streamlit/config.toml`) en `app/static/logo.jpeg`, con ETag y
+Last-Modified para la caché del navegador. La URL lleva la huella del archivo
+(`?v=...`), así un logo nuevo cambia la URL y nunca se ve uno viejo en caché.
+
+`static/logo.jpeg` es una copia reducida de la imagen original, al doble del
+alto con que se muestra. Para regenerarla después de cambiar la imagen:
+
+    python -m calculadora.estaticos
+"""
+import hashlib
+import os
+import re
+
+from calculadora.moneda import format_currency_serie
+
+_AQUI = os.path.dirname(os.path.abspath(__file__))
+FUENTE_CSS = os.path.join(_AQUI, "estilos.css")
+FUENTE_LOGO = os.path.join(os.path.dirname(_AQUI), "WhatsApp Image 2025-05-19 at 12.57.14 PM.jpeg")
+# Streamlit sirve la carpeta static/ que está junto al script de la app
+DIRECTORIO_STATIC = os.path.join(os.path.dirname(_AQUI), "static")
+LOGO = "logo.jpeg"
+# .logo se muestra con 80px de alto; el doble para pantallas de alta densidad
+ALTO_LOGO = 160
+
+# (descripción, valor, deuda); None deja la celda vacía
+FILAS_EJEMPLO = (
+    ("Inmueble 1", 80_000, 30_000),
+    ("Inmueble 2", None, None),
+    ("Automóvil 1", 15_000, 18_000),
+    ("Automóvil 2", None, None),
+    ("Muebles", 5_000, 1_500),
+    ("Joyas", None, None),
+    ("Arte", None, None),
+    ("Efectivo cuenta 1", 2_000, None),
+    ("Efectivo cuenta 2", 1_500, None),
+    ("Deudas por cobrar", 3_000, None),
+    ("Acciones", None, None),
+    ("Bonos o títulos valores", None, None),
+    ("Fondo de retiro", 30_000, None),
+    ("Bonos o derechos laborales", None, None),
+    ("Tarjeta de crédito 1", None, 6_500),
+    ("Tarjeta de crédito 2", None, 8_200),
+    ("Tarjeta de crédito 3", None, None),
+    ("Otra deuda 1", None, 4_700),
+    ("Otra deuda 2", None, None),
+    ("Otra deuda 3", None, None),
+    ("Otros", None, None),
+)
+
+
+def minificar_css(css):
+    """Quita comentarios y espacios que no cambian nada. Los espacios entre selectores se quedan."""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    return css.replace(";}", "}").strip()
+
+
+def _estilos():
+    with open(FUENTE_CSS, encoding="utf-8") as archivo:
+        return f"<style>{minificar_css(archivo.read())}</style>"
+
+
+def _celdas(montos):
+    textos = format_currency_serie([monto or 0 for monto in montos])
+    return [texto if monto is not None else "" for texto, monto in zip(textos, montos)]
+
+
+def _tabla_ejemplo():
+    nombres, valores, deudas = zip(*FILAS_EJEMPLO)
+    netos = [(valor or 0) - (deuda or 0) for valor, deuda in zip(valores, deudas)]
+    filas = "".join(
+        f"<tr><td>{nombre}</td><td>{valor}</td><td>{deuda}</td><td>{neto}</td></tr>"
+        for nombre, valor, deuda, neto in zip(nombres, _celdas(valores), _celdas(deudas), _celdas(netos))
+    )
+    total = "".join(
+        f"<td><strong>{texto}</strong></td>"
+        for texto in _celdas([sum(filter(None, valores)), sum(filter(None, deudas)), sum(netos)])
+    )
+    return (
+        '<table class="example-table"><thead><tr>'
+        "<th>Descripción</th><th>Valor</th><th>Deuda</th><th>Neto</th>"
+        f"</tr></thead><tbody>{filas}<tr><td><strong>Total</strong></td>{total}</tr></tbody></table>"
+    )
+
+
+def construir():
+    """Genera `static/logo.jpeg` a partir de la imagen original. Devuelve su tamaño en bytes."""
+    from PIL import Image
+
+    os.makedirs(DIRECTORIO_STATIC, exist_ok=True)
+    destino = os.path.join(DIRECTORIO_STATIC, LOGO)
+    with Image.open(FUENTE_LOGO) as imagen:
+        ancho = round(imagen.width * ALTO_LOGO / imagen.height)
+        reducida = imagen.convert("RGB").resize((ancho, ALTO_LOGO), Image.LANCZOS)
+    reducida.save(destino, "JPEG", quality=85, optimize=True, progressive=True)
+    return os.path.getsize(destino)
+
+
+def _url_logo():
+    ruta = os.path.join(DIRECTORIO_STATIC, LOGO)
+    if not os.path.exists(ruta):
+        construir()
+    with open(ruta, "rb") as archivo:
+        version = hashlib.sha256(archivo.read()).hexdigest()[:12]
+    return f"app/static/{LOGO}?v={version}"
+
+
+ESTILOS_HTML = _estilos()
+TABLA_EJEMPLO_HTML = _tabla_ejemplo()
+LOGO_URL = _url_logo()
+ENCABEZADO_HTML = (
+    '<div class="header-container"><div>'
+    '<h1 style="margin:0;color:#1E3A8A;">Taller de Bienes Raíces</h1>'
+    '<h3 style="margin:0;color:#6B7280;">Calculadora Financiera para Inversión Inmobiliaria</h3>'
+    f'</div><img src="{LOGO_URL}" class="logo" alt="Logo"></div>'
+    '<div class="calculator-container">'
+    "Esta herramienta te ayudará a analizar tu capacidad para invertir en bienes raíces, "
+    "crear un plan de acción y establecer metas claras para construir patrimonio inmobiliario."
+    "</div>"
+)
+
+
+if __name__ == "__main__":
+    tamano_logo = construir()
+    print(f"static/{LOGO}: {os.path.getsize(FUENTE_LOGO):,} -> {tamano_logo:,} bytes")
+    print(f"estilos: {os.path.getsize(FUENTE_CSS):,} -> {len(ESTILOS_HTML.encode()):,} bytes")
+    print(f"tabla de ejemplo: {len(TABLA_EJEMPLO_HTML.encode()):,} bytes")
@@ -0,0 +1,243 @@
+"""Exportación incremental de usuarios y análisis a Parquet particionado.
+
+Uso:
+
+    python -m calculadora.exportar --destino exportacion/
+
+Genera dos conjuntos de datos con particiones estilo Hive por mes y perfil:
+
+    exportacion/analisis/mes=2026-10/perfil=Alto/part-<corrida>-0.parquet
+    exportacion/usuarios/mes=2026-10/perfil=Alto/part-<corrida>-0.parquet
+
+Cada corrida solo escribe las filas posteriores a la marca de agua guardada en
+`exportacion/_marca_agua.json`: el id de `finanzas` para los análisis y el
+número de cambio `usuarios.version` para los usuarios (cada fila exportada
+lleva su `version`; la más alta por `id` es la vigente). Las filas se leen
+por lotes con paginación por clave, así la memoria queda acotada y la base no
+se bloquea durante toda la exportación.
+
+Los archivos se escriben primero en `exportacion/_pendiente/<corrida>/` (los
+lectores de datasets ignoran las carpetas que empiezan con "_"). La corrida
+se confirma al guardar la marca de agua junto con el nombre de la corrida, y
+recién entonces los archivos pasan a su partición. Si algo falla antes de
+confirmar, la carpeta pendiente se descarta y la siguiente corrida vuelve a
+exportar las mismas filas; si falla después, la siguiente termina de mover
+los archivos. Así un reintento nunca duplica filas.
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+import uuid
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from calculadora import base_datos
+
+TAMANO_LOTE = 50_000
+ARCHIVO_MARCA = "_marca_agua.json"
+CARPETA_PENDIENTE = "_pendiente"
+
+ESQUEMA_ANALISIS = pa.schema([
+    ("id", pa.int64()),
+    ("usuario_id", pa.int64()),
+    ("nombre", pa.string()),
+    ("edad", pa.int64()),
+    ("email", pa.string()),
+    ("telefono", pa.string()),
+    ("ingresos_mensuales", pa.float64()),
+    ("gastos_mensuales", pa.float64()),
+    ("activos_totales", pa.float64()),
+    ("pasivos_totales", pa.float64()),
+    ("creado_en", pa.timestamp("s")),
+    ("mes", pa.string()),
+    ("perfil", pa.string()),
+])
+
+ESQUEMA_USUARIOS = pa.schema([
+    ("id", pa.int64()),
+    ("nombre", pa.string()),
+    ("edad", pa.int64()),
+    ("email", pa.string()),
+    ("telefono", pa.string()),
+    ("actualizado_en", pa.timestamp("s")),
+    ("version", pa.int64()),
+    ("mes", pa.string()),
+    ("perfil", pa.string()),
+])
+
+CONSULTA_ANALISIS = f'''
+    SELECT f.id, f.usuario_id, u.nombre, u.edad, u.email, u.telefono,
+           f.ingresos_mensuales, f.gastos_mensuales, f.activos_totales, f.pasivos_totales,
+           f.creado_en, coalesce(substr(f.creado_en, 1, 7), 'desconocido'),
+           coalesce(f.perfil, '{base_datos.SIN_PERFIL}')
+    FROM finanzas f LEFT JOIN usuarios u ON u.id = f.usuario_id
+    WHERE f.id > ?
+    ORDER BY f.id
+    LIMIT ?
+'''
+
+CONSULTA_USUARIOS = f'''
+    SELECT id, nombre, edad, email, telefono,
+           actualizado_en, version, coalesce(substr(actualizado_en, 1, 7), 'desconocido'),
+           coalesce(perfil, '{base_datos.SIN_PERFIL}')
+    FROM usuarios
+    WHERE version > ?
+    ORDER BY version
+    LIMIT ?
+'''
+
+
+def leer_marca_agua(destino):
+    ruta = os.path.join(destino, ARCHIVO_MARCA)
+    if not os.path.exists(ruta):
+        return {"analisis": 0, "usuarios": 0}
+    with open(ruta, encoding="utf-8") as archivo:
+        return json.load(archivo)
+
+
+def _traducir_marca_usuarios(db_path, marca):
+    # Marcas de versiones anteriores: (actualizado_en, id) en lugar de `version`
+    if not isinstance(marca["usuarios"], list):
+        return
+    conn = base_datos.conectar(db_path)
+    try:
+        fila = conn.execute(
+            "SELECT coalesce(max(version), 0) FROM usuarios WHERE (actualizado_en, id) <= (?, ?)",
+            marca["usuarios"]
+        ).fetchone()
+    finally:
+        conn.close()
+    marca["usuarios"] = fila[0]
+
+
+def guardar_marca_agua(destino, marca):
+    ruta = os.path.join(destino, ARCHIVO_MARCA)
+    temporal = ruta + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as archivo:
+        json.dump(marca, archivo)
+    os.replace(temporal, ruta)
+
+
+def _a_lote(filas, esquema):
+    columnas = list(zip(*filas))
+    arreglos = []
+    for campo, valores in zip(esquema, columnas):
+        if pa.types.is_timestamp(campo.type):
+            arreglos.append(pa.array(valores, pa.string()).cast(campo.type))
+        else:
+            arreglos.append(pa.array(valores, campo.type))
+    return pa.RecordBatch.from_arrays(arreglos, schema=esquema)
+
+
+def _lotes_analisis(db_path, marca, tamano_lote):
+    # Una consulta corta por lote: la conexión no mantiene una transacción abierta
+    conn = base_datos.conectar(db_path)
+    try:
+        while True:
+            filas = conn.execute(CONSULTA_ANALISIS, (marca["analisis"], tamano_lote)).fetchall()
+            if not filas:
+                return
+            marca["analisis"] = filas[-1][0]
+            yield _a_lote(filas, ESQUEMA_ANALISIS)
+    finally:
+        conn.close()
+
+
+def _lotes_usuarios(db_path, marca, tamano_lote):
+    conn = base_datos.conectar(db_path)
+    try:
+        while True:
+            filas = conn.execute(CONSULTA_USUARIOS, (marca["usuarios"], tamano_lote)).fetchall()
+            if not filas:
+                return
+            marca["usuarios"] = filas[-1][6]
+            yield _a_lote(filas, ESQUEMA_USUARIOS)
+    finally:
+        conn.close()
+
+
+def _escribir(lotes, esquema, carpeta, corrida, contador):
+    def contar():
+        for lote in lotes:
+            contador[0] += lote.num_rows
+            yield lote
+
+    ds.write_dataset(
+        contar(),
+        carpeta,
+        schema=esquema,
+        format="parquet",
+        partitioning=["mes", "perfil"],
+        partitioning_flavor="hive",
+        basename_template=f"part-{corrida}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+        max_rows_per_group=TAMANO_LOTE,
+    )
+
+
+def _publicar_pendiente(destino, marca):
+    """Mueve a su partición los archivos de la corrida confirmada en `marca`, si quedó alguna."""
+    corrida = marca.get("pendiente")
+    if corrida is None:
+        return
+    origen = os.path.join(destino, CARPETA_PENDIENTE, corrida)
+    for carpeta, _, archivos in os.walk(origen):
+        relativa = os.path.relpath(carpeta, origen)
+        for nombre in archivos:
+            os.makedirs(os.path.join(destino, relativa), exist_ok=True)
+            # Cada nombre lleva la corrida: no pisa archivos de otras corridas
+            os.replace(os.path.join(carpeta, nombre), os.path.join(destino, relativa, nombre))
+    shutil.rmtree(origen, ignore_errors=True)
+    del marca["pendiente"]
+    guardar_marca_agua(destino, marca)
+
+
+def _descartar_sin_confirmar(destino):
+    # Corridas que fallaron antes de guardar su marca: sus filas se vuelven a exportar
+    shutil.rmtree(os.path.join(destino, CARPETA_PENDIENTE), ignore_errors=True)
+
+
+def exportar(destino, db_path=None, tamano_lote=TAMANO_LOTE):
+    """Exporta las filas nuevas desde la última corrida. Devuelve filas escritas por conjunto."""
+    os.makedirs(destino, exist_ok=True)
+    marca = leer_marca_agua(destino)
+    _publicar_pendiente(destino, marca)
+    _descartar_sin_confirmar(destino)
+    _traducir_marca_usuarios(db_path, marca)
+    corrida = f"{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    temporal = os.path.join(destino, CARPETA_PENDIENTE, corrida)
+
+    escritas = {}
+    for nombre, lotes, esquema in (
+        ("analisis", _lotes_analisis(db_path, marca, tamano_lote), ESQUEMA_ANALISIS),
+        ("usuarios", _lotes_usuarios(db_path, marca, tamano_lote), ESQUEMA_USUARIOS),
+    ):
+        contador = [0]
+        _escribir(lotes, esquema, os.path.join(temporal, nombre), corrida, contador)
+        escritas[nombre] = contador[0]
+
+    # Punto de confirmación: la marca avanza junto con el nombre de la corrida
+    # cuyos archivos le corresponden, en un solo reemplazo atómico
+    if os.path.isdir(temporal):
+        marca["pendiente"] = corrida
+    guardar_marca_agua(destino, marca)
+    _publicar_pendiente(destino, marca)
+    return escritas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporta usuarios y análisis a Parquet")
+    parser.add_argument("--destino", default="exportacion", help="Carpeta de salida")
+    parser.add_argument("--db", default=base_datos.DB_PATH, help="Ruta del archivo SQLite")
+    parser.add_argument("--lote", type=int, default=TAMANO_LOTE, help="Filas por lote")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    escritas = exportar(args.destino, args.db, args.lote)
+    duracion = time.perf_counter() - inicio
+    for nombre, filas in escritas.items():
+        print(f"{nombre}: {filas:,} filas nuevas")
+    print(f"Tiempo: {duracion:.2f} s")
@@ -0,0 +1,320 @@
+"""Extractos bancarios (CSV u OFX) clasificados en las categorías de gastos.
+
+    with open("extracto_2025.csv", "rb") as archivo:
+        resultado = clasificar_extracto(archivo, "extracto_2025.csv")
+    resultado["gastos"].como_dict()     # promedio mensual por categoría
+    resultado["movimientos"]            # tabla con la categoría de cada movimiento
+
+Cada descripción se normaliza ("COMPRA EXITO CALLE 80 #123" -> "compra exito
+calle") y se clasifica una sola vez por descripción distinta, así un año de
+movimientos cuesta lo que sus comercios distintos:
+
+1. Un autómata Aho–Corasick con todas las `PALABRAS_CLAVE` recorre el texto
+   una vez y se queda con la palabra clave más larga encontrada.
+2. Lo que no tiene palabra clave lo clasifica un modelo de scikit-learn
+   (TF-IDF de n-gramas de caracteres + regresión logística) entrenado con
+   las palabras clave y con lo que el paso 1 ya clasificó en ese extracto.
+   Si el modelo no llega a `UMBRAL_MODELO` de probabilidad, va a "Otros gastos".
+
+Solo cuentan los cargos (montos negativos o columna de débitos). Los totales
+salen de una suma agrupada en centavos y se dividen por los meses que cubre
+el extracto.
+"""
+import collections
+import functools
+import io
+import re
+
+from calculadora.dinero import ColumnaDinero
+from calculadora.importacion import (
+    CATEGORIAS_GASTOS, ErrorImportacion, leer_texto, normalizar, separador_csv,
+)
+from calculadora.moneda import LOCALE_POR_DEFECTO, parse_currency_serie
+
+OTROS = CATEGORIAS_GASTOS[-1]
+UMBRAL_MODELO = 0.5
+# Descripciones ya clasificadas que se suman al entrenamiento del modelo
+MAX_ENTRENAMIENTO = 2000
+
+# Normalizadas (sin tildes, minúsculas). Las de 4 letras o menos deben ser palabra completa.
+PALABRAS_CLAVE = {
+    "Gasto de Inmueble 1": (
+        "arriendo", "arrendamiento", "administracion", "predial", "cuota hipoteca", "credito hipotecario",
+        "leasing habitacional", "inmobiliaria",
+    ),
+    "Alimentación": (
+        "exito", "carulla", "jumbo", "olimpica", "d1", "ara", "makro", "pricesmart", "surtimax",
+        "supermercado", "minimercado", "mercado", "fruver", "panaderia", "restaurante", "rappi", "ifood",
+        "domicilios", "mcdonalds", "frisby", "crepes", "juan valdez", "starbucks", "el corral", "kfc",
+    ),
+    "Educación": (
+        "universidad", "colegio", "jardin infantil", "matricula", "pension escolar", "icetex", "coursera",
+        "udemy", "platzi", "libreria", "panamericana", "instituto",
+    ),
+    "Transporte": (
+        "uber", "didi", "cabify", "indriver", "taxi", "transmilenio", "tullave", "metro", "peaje", "parqueadero",
+        "terpel", "primax", "biomax", "texaco", "esso", "mobil", "gasolina", "combustible", "avianca", "latam",
+        "wingo", "tecnomecanica", "lavadero",
+    ),
+    "Salud": (
+        "drogueria", "drogas", "farmacia", "cruz verde", "farmatodo", "locatel", "colsanitas", "compensar eps",
+        "sanitas", "clinica", "hospital", "odontolog", "laboratorio", "optica", "medico", "eps",
+    ),
+    "Entretenimiento": (
+        "netflix", "spotify", "disney", "hbo", "prime video", "youtube", "apple com", "steam", "playstation",
+        "xbox", "cine colombia", "cinemark", "procinal", "tuboleta", "bar", "discoteca", "gimnasio", "smart fit",
+        "bodytech",
+    ),
+    "Servicios públicos": (
+        "enel", "codensa", "epm", "vanti", "gas natural", "acueducto", "eaab", "emcali", "air e", "afinia",
+        "claro", "movistar", "tigo", "etb", "une", "wom", "directv", "internet", "energia", "servicios publicos",
+    ),
+    "Seguros": (
+        "seguro", "seguros", "soat", "allianz", "mapfre", "sura", "seguros bolivar", "axa colpatria",
+        "liberty", "equidad", "poliza",
+    ),
+}
+
+COLUMNAS = {
+    "fecha": "fecha", "date": "fecha", "fecha transaccion": "fecha", "fecha movimiento": "fecha",
+    "descripcion": "descripcion", "detalle": "descripcion", "concepto": "descripcion",
+    "movimiento": "descripcion", "description": "descripcion", "memo": "descripcion", "comercio": "descripcion",
+    "valor": "valor", "monto": "valor", "importe": "valor", "amount": "valor",
+    "debito": "debito", "debitos": "debito", "cargo": "debito", "cargos": "debito", "retiros": "debito",
+    "credito": "credito", "creditos": "credito", "abono": "credito", "abonos": "credito",
+}
+
+_FECHA_OFX = re.compile(r"^\d{8}$")
+_FECHA_ISO = re.compile(r"^\d{4}-\d{2}-\d{2}(?:[T ]|$)")
+_OFX_MOVIMIENTO = re.compile(r"<STMTTRN>(.*?)(?:</STMTTRN>|(?=<STMTTRN>)|</BANKTRANLIST>)", re.S | re.I)
+
+
+class Automata:
+    """Aho–Corasick: todas las palabras clave de un texto en una sola pasada."""
+
+    def __init__(self, palabras):
+        # palabras: {palabra: categoría}
+        self._transiciones = [{}]
+        self._falla = [0]
+        self._salidas = [()]
+        for palabra, categoria in palabras.items():
+            estado = 0
+            for caracter in palabra:
+                siguiente = self._transiciones[estado].get(caracter)
+                if siguiente is None:
+                    siguiente = len(self._transiciones)
+                    self._transiciones.append({})
+                    self._falla.append(0)
+                    self._salidas.append(())
+                    self._transiciones[estado][caracter] = siguiente
+                estado = siguiente
+            self._salidas[estado] += ((len(palabra), categoria),)
+
+        # Enlaces de falla por niveles: el sufijo más largo que también es prefijo
+        cola = collections.deque(self._transiciones[0].values())
+        while cola:
+            estado = cola.popleft()
+            for caracter, hijo in self._transiciones[estado].items():
+                cola.append(hijo)
+                falla = self._falla[estado]
+                while falla and caracter not in self._transiciones[falla]:
+                    falla = self._falla[falla]
+                self._falla[hijo] = self._transiciones[falla].get(caracter, 0)
+                self._salidas[hijo] += self._salidas[self._falla[hijo]]
+
+    def buscar(self, texto):
+        """Categoría de la palabra clave más larga del texto, o None.
+
+        La palabra debe empezar donde empieza una palabra del texto; las de
+        cuatro letras o menos deben además ser la palabra completa ("ara" no
+        está en "para").
+        """
+        transiciones, falla, salidas = self._transiciones, self._falla, self._salidas
+        estado = 0
+        mejor_largo, mejor = 0, None
+        for fin, caracter in enumerate(texto):
+            while estado and caracter not in transiciones[estado]:
+                estado = falla[estado]
+            estado = transiciones[estado].get(caracter, 0)
+            for largo, categoria in salidas[estado]:
+                if largo <= mejor_largo:
+                    continue
+                inicio = fin - largo + 1
+                if inicio and texto[inicio - 1] != " ":
+                    continue
+                if largo <= 4 and fin + 1 < len(texto) and texto[fin + 1] != " ":
+                    continue
+                mejor_largo, mejor = largo, categoria
+        return mejor
+
+
+@functools.lru_cache(maxsize=1)
+def _automata():
+    return Automata({palabra: categoria for categoria, palabras in PALABRAS_CLAVE.items() for palabra in palabras})
+
+
+def _normalizar_descripciones(descripciones):
+    """Minúsculas sin tildes, sin signos ni números sueltos (referencias, fechas)."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    # Lo mismo que `importacion.normalizar`, pero con Arrow sobre toda la columna
+    textos = pa.array(descripciones, type=pa.string(), from_pandas=True)
+    textos = pc.utf8_lower(pc.utf8_normalize(textos, "NFKD"))
+    textos = pc.replace_substring_regex(textos, r"\p{Mn}+", "")
+    textos = pc.replace_substring_regex(textos, r"[^a-z0-9]+|\b[0-9]+\b", " ")
+    textos = pc.utf8_trim_whitespace(pc.replace_substring_regex(textos, " +", " "))
+    return textos.to_numpy(zero_copy_only=False)
+
+
+def _modelo(textos, categorias):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import make_pipeline
+
+    modelo = make_pipeline(
+        TfidfVectorizer(analyzer="char_wb", ngram_range=(3, 4), sublinear_tf=True),
+        LogisticRegression(C=10, max_iter=300),
+    )
+    return modelo.fit(textos, categorias)
+
+
+def categorizar(descripciones):
+    """Categoría de gasto de cada descripción (arreglo de textos) y cómo se obtuvo.
+
+    Devuelve dos arreglos: la categoría y el origen ("palabra clave",
+    "modelo" u "otros").
+    """
+    import numpy as np
+    import pandas as pd
+
+    # Primero lo idéntico y luego lo que solo cambia en números de referencia
+    codigos, unicas = pd.factorize(pd.Series(descripciones, dtype=object).fillna(""))
+    codigos_normalizados, normalizadas = pd.factorize(_normalizar_descripciones(unicas))
+    codigos = codigos_normalizados[codigos]
+    normalizadas = np.asarray(normalizadas, dtype=object)
+    automata = _automata()
+    categorias = np.array([automata.buscar(texto) for texto in normalizadas], dtype=object)
+    origen = np.where(pd.isna(categorias), "otros", "palabra clave").astype(object)
+
+    sin_categoria = pd.isna(categorias) & (normalizadas != "")
+    if sin_categoria.any():
+        textos = [palabra for palabras in PALABRAS_CLAVE.values() for palabra in palabras]
+        etiquetas = [categoria for categoria, palabras in PALABRAS_CLAVE.items() for _ in palabras]
+        conocidas = np.flatnonzero(~pd.isna(categorias))[:MAX_ENTRENAMIENTO]
+        modelo = _modelo(textos + normalizadas[conocidas].tolist(), etiquetas + categorias[conocidas].tolist())
+        probabilidades = modelo.predict_proba(normalizadas[sin_categoria])
+        seguras = probabilidades.max(axis=1) >= UMBRAL_MODELO
+        predichas = modelo.classes_[probabilidades.argmax(axis=1)]
+        indices = np.flatnonzero(sin_categoria)[seguras]
+        categorias[indices] = predichas[seguras]
+        origen[indices] = "modelo"
+    categorias[pd.isna(categorias)] = OTROS
+    return categorias[codigos], origen[codigos]
+
+
+def _tabla_csv(texto):
+    import pandas as pd
+
+    tabla = pd.read_csv(io.StringIO(texto), sep=separador_csv(texto), dtype=str,
+                        skipinitialspace=True, keep_default_na=False)
+    renombres = {}
+    for columna in tabla.columns:
+        destino = COLUMNAS.get(normalizar(columna))
+        if destino and destino not in renombres.values():
+            renombres[columna] = destino
+    tabla = tabla.rename(columns=renombres)
+    if "descripcion" not in tabla.columns or not ({"valor", "debito"} & set(tabla.columns)):
+        raise ErrorImportacion(
+            "El extracto debe tener una columna de descripción y una de valor (o de débitos)."
+        )
+    return tabla
+
+
+def _tabla_ofx(texto):
+    import pandas as pd
+
+    bloques = pd.Series(_OFX_MOVIMIENTO.findall(texto), dtype=object)
+    if bloques.empty:
+        raise ErrorImportacion("El archivo OFX no tiene movimientos (<STMTTRN>).")
+
+    def campo(nombre):
+        return bloques.str.extract(f"<{nombre}>([^<\\r\\n]*)", flags=re.I, expand=False).fillna("").str.strip()
+
+    return pd.DataFrame({
+        "fecha": campo("DTPOSTED").str[:8],
+        "descripcion": (campo("NAME") + " " + campo("MEMO")).str.strip(),
+        "valor": campo("TRNAMT"),
+    })
+
+
+def _fechas(textos):
+    import pandas as pd
+
+    # Un año tiene pocas fechas distintas: se interpreta cada una una sola vez
+    codigos, unicas = pd.factorize(textos)
+    muestra = [u for u in unicas[:20] if u]
+    # Año primero (OFX, ISO) no se lee con el día primero: 2025-01-02 es 2 de enero
+    if muestra and all(_FECHA_OFX.match(u) for u in muestra):
+        opciones = {"format": "%Y%m%d"}
+    elif muestra and all(_FECHA_ISO.match(u) for u in muestra):
+        opciones = {"format": "ISO8601"}
+    else:
+        opciones = {"format": "mixed", "dayfirst": True}
+    fechas = pd.to_datetime(pd.Series(unicas), errors="coerce", **opciones)
+    return fechas.to_numpy()[codigos] if len(unicas) else fechas.to_numpy()
+
+
+def leer_extracto(archivo, nombre_archivo, locale=LOCALE_POR_DEFECTO):
+    """Cargos del extracto: tabla con fecha, descripción y monto (positivo, en pesos)."""
+    import pandas as pd
+
+    texto = leer_texto(archivo)
+    try:
+        if nombre_archivo.lower().endswith((".ofx", ".qfx")) or texto.lstrip().upper().startswith("OFXHEADER"):
+            tabla = _tabla_ofx(texto)
+        else:
+            tabla = _tabla_csv(texto)
+    except (ValueError, pd.errors.ParserError) as e:
+        if isinstance(e, ErrorImportacion):
+            raise
+        raise ErrorImportacion(f"No se pudo leer el extracto: {e}") from e
+
+    if "debito" in tabla.columns:
+        montos = parse_currency_serie(tabla["debito"], locale)
+        cargo = montos > 0
+    else:
+        montos = parse_currency_serie(tabla["valor"], locale, invalido=float("nan"))
+        # Sin negativos el banco lista solo los cargos, como montos positivos
+        cargo = montos < 0 if (montos < 0).any() else montos > 0
+        montos = montos.abs()
+    fechas = _fechas(tabla["fecha"]) if "fecha" in tabla.columns else pd.NaT
+    return pd.DataFrame({
+        "fecha": fechas,
+        "descripcion": tabla["descripcion"],
+        "monto": montos,
+    })[cargo.to_numpy()].reset_index(drop=True)
+
+
+def clasificar_extracto(archivo, nombre_archivo, locale=LOCALE_POR_DEFECTO):
+    """Lee, clasifica y resume un extracto. Devuelve un diccionario con:
+
+    - "gastos": `ColumnaDinero` sobre `CATEGORIAS_GASTOS` con el promedio mensual.
+    - "meses": meses que cubre el extracto (1 si no tiene fechas).
+    - "movimientos": tabla de cargos con su "categoria" y "origen".
+    """
+    import numpy as np
+    import pandas as pd
+
+    movimientos = leer_extracto(archivo, nombre_archivo, locale)
+    movimientos["categoria"], movimientos["origen"] = categorizar(movimientos["descripcion"].to_numpy())
+
+    meses = max(1, movimientos["fecha"].dt.to_period("M").nunique()) if len(movimientos) else 1
+    centavos = pd.Series(np.rint(movimientos["monto"].to_numpy() * 100).astype(np.int64))
+    por_categoria = centavos.groupby(movimientos["categoria"].to_numpy()).sum()
+    por_categoria = por_categoria.reindex(CATEGORIAS_GASTOS, fill_value=0).to_numpy()
+    return {
+        "gastos": ColumnaDinero(CATEGORIAS_GASTOS, np.rint(por_categoria / meses).astype(np.int64)),
+        "meses": meses,
+        "movimientos": movimientos,
+    }
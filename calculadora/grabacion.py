@@ -0,0 +1,152 @@
+"""Grabación opcional de las interacciones de una sesión para repetirlas después.
+
+Se activa con la variable de entorno `CALCULADORA_GRABACIONES=<carpeta>`.
+Cada sesión escribe un archivo JSON Lines con una línea por cambio de widget:
+
+    {"paso": 3, "t": 12.4, "tipo": "text_input", "clave": "activo_valor_Inmueble 1", "valor": "$250,000,000"}
+    {"paso": 4, "t": 15.0, "tipo": "button", "etiqueta": "Analizar mi situación financiera para bienes raíces", "orden": 0, "valor": true}
+
+Un paso es un rerun del script; un widget se graba a partir del segundo
+run en que aparece, cuando su valor cambia. Los widgets con `key` se identifican por ella y los demás por su
+etiqueta y su posición entre los widgets con la misma etiqueta. Solo se
+guardan claves y valores, anonimizados: correos y textos libres se
+reemplazan por marcadores con la misma forma y los montos se redondean a
+dos cifras significativas. `calculadora.repeticion` vuelve a ejecutar estas
+grabaciones contra cualquier versión de la app.
+"""
+import functools
+import json
+import math
+import os
+import re
+import threading
+import time
+import uuid
+
+import streamlit as st
+from streamlit.delta_generator import DeltaGenerator
+
+from calculadora.moneda import parse_currency
+
+DIRECTORIO = os.environ.get('CALCULADORA_GRABACIONES')
+
+TIPOS = (
+    "text_input", "text_area", "number_input", "selectbox", "multiselect",
+    "radio", "slider", "checkbox", "toggle", "button",
+)
+
+_CORREO = re.compile(r"^[^@\s]+@[^@\s]+$")
+_instrumentado = False
+_bloqueo = threading.Lock()
+
+
+def _redondear(valor):
+    if not valor:
+        return valor
+    cifras = 2 - int(math.floor(math.log10(abs(valor)))) - 1
+    return round(valor, cifras)
+
+
+def _monto(valor):
+    """Monto que lee la app de este texto, o None si es texto libre.
+
+    `parse_currency` descarta las letras; aquí solo se aceptan las de un
+    código de moneda ("COP 2.500.000") para no tomar "Casa 2" por un monto.
+    """
+    letras = re.sub(r"[^A-Za-z]", "", valor)
+    if letras and not (len(letras) == 3 and letras.isupper()):
+        return None
+    return parse_currency(valor, invalido=None)
+
+
+def anonimizar(tipo, valor):
+    if tipo in ("number_input", "slider") and isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return valor
+    if tipo not in ("text_input", "text_area") or not isinstance(valor, str) or not valor:
+        return valor
+    if valor.isdigit():
+        # Teléfonos, documentos y montos sin formato: misma cantidad de dígitos
+        return "3" + "0" * (len(valor) - 1)
+    monto = _monto(valor)
+    if monto is not None:
+        monto = _redondear(monto)
+        return f"${monto:,.0f}" if monto == int(monto) else f"${monto:,.2f}"
+    if _CORREO.match(valor):
+        return f"anonimo{len(valor)}@example.com"
+    # Texto libre: misma longitud y cantidad de palabras, sin el contenido
+    return " ".join("x" * len(palabra) for palabra in valor.split())
+
+
+class Grabadora:
+    def __init__(self, directorio):
+        os.makedirs(directorio, exist_ok=True)
+        self.ruta = os.path.join(directorio, f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}.jsonl")
+        self.inicio = time.time()
+        self.paso = -1
+        self.anteriores = {}
+        self.ordenes = {}
+
+    def comenzar_run(self):
+        self.paso += 1
+        self.ordenes = {}
+
+    def observar(self, tipo, etiqueta, clave, valor):
+        if clave is not None:
+            identidad = {"clave": str(clave)}
+        else:
+            orden = self.ordenes.get((tipo, etiqueta), 0)
+            self.ordenes[(tipo, etiqueta)] = orden + 1
+            identidad = {"etiqueta": etiqueta, "orden": orden}
+        llave = (tipo, json.dumps(identidad, sort_keys=True, ensure_ascii=False))
+
+        visto = llave in self.anteriores
+        anterior = self.anteriores.get(llave)
+        self.anteriores[llave] = valor
+        # Un widget que recién aparece solo fija su valor de partida; un botón cuenta al pulsarse
+        if not visto or (tipo == "button" and not valor) or (tipo != "button" and valor == anterior):
+            return
+        registro = {"paso": self.paso, "t": round(time.time() - self.inicio, 3), "tipo": tipo, **identidad,
+                    "valor": anonimizar(tipo, valor)}
+        with open(self.ruta, "a", encoding="utf-8") as archivo:
+            archivo.write(json.dumps(registro, ensure_ascii=False, default=str) + "\n")
+
+
+def _grabadora():
+    try:
+        return st.session_state.get('_grabadora')
+    except Exception:
+        # Fuera de un run de Streamlit no hay sesión que grabar
+        return None
+
+
+def _envolver(tipo, original):
+    @functools.wraps(original)
+    def widget(self, label, *args, **kwargs):
+        valor = original(self, label, *args, **kwargs)
+        grabadora = _grabadora()
+        if grabadora is not None:
+            grabadora.observar(tipo, label, kwargs.get("key"), valor)
+        return valor
+    return widget
+
+
+def _instrumentar():
+    global _instrumentado
+    with _bloqueo:
+        if _instrumentado:
+            return
+        for tipo in TIPOS:
+            setattr(DeltaGenerator, tipo, _envolver(tipo, getattr(DeltaGenerator, tipo)))
+            # `st.text_input` y compañía quedaron ligados al método original al importar streamlit
+            setattr(st, tipo, getattr(st._main, tipo))
+        _instrumentado = True
+
+
+def comenzar_run():
+    """Llamar al inicio de cada run del script. No hace nada si no se graba."""
+    if not DIRECTORIO:
+        return
+    _instrumentar()
+    if '_grabadora' not in st.session_state:
+        st.session_state['_grabadora'] = Grabadora(DIRECTORIO)
+    st.session_state['_grabadora'].comenzar_run()
@@ -0,0 +1,130 @@
+"""Gráficos del reporte renderizados con matplotlib en modo sin pantalla.
+
+Se usa `Figure` + el lienzo Agg directamente (sin pyplot), de modo que no
+hay estado global compartido entre hilos ni ventanas. Cada gráfico se
+escribe como PNG en un buffer en memoria y se guarda en caché por la huella
+de sus datos: regenerar un reporte con los mismos números no vuelve a
+dibujar nada.
+"""
+from io import BytesIO
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.ticker import FuncFormatter
+
+from calculadora.cache import CacheContenido, huella
+from calculadora.moneda import format_currency
+
+AZUL = "#1E3A8A"
+GRIS = "#6B7280"
+VERDE = "#10B981"
+ROJO = "#EF4444"
+
+# Tasas de rendimiento anual para la banda de la proyección de retiro
+TASAS_RETIRO = (0.03, 0.05, 0.07)
+
+# Cambiar al modificar el estilo de los gráficos
+VERSION_GRAFICOS = "1"
+
+_cache = CacheContenido(max_bytes_memoria=16 * 1024 * 1024)
+
+_formato_moneda = FuncFormatter(lambda valor, _: format_currency(valor).replace(".00", ""))
+
+
+def _png(figura):
+    FigureCanvasAgg(figura)
+    buffer = BytesIO()
+    figura.savefig(buffer, format="png", dpi=150, bbox_inches="tight")
+    return buffer.getvalue()
+
+
+def _cacheado(nombre, datos, dibujar):
+    clave = huella(VERSION_GRAFICOS, nombre, datos)
+    return _cache.obtener_o_generar(clave, lambda: _png(dibujar(datos)))
+
+
+def _figura():
+    figura = Figure(figsize=(7, 3.2))
+    ejes = figura.add_subplot()
+    ejes.spines[["top", "right"]].set_visible(False)
+    return figura, ejes
+
+
+def _dibujar_activos_pasivos(datos):
+    detalle = datos["detalle"]
+    figura, ejes = _figura()
+    nombres = list(detalle)
+    valores = [detalle[nombre] for nombre in nombres]
+    colores = [VERDE if valor >= 0 else ROJO for valor in valores]
+    ejes.barh(nombres, valores, color=colores)
+    ejes.axvline(0, color=GRIS, linewidth=0.8)
+    ejes.invert_yaxis()
+    ejes.xaxis.set_major_formatter(_formato_moneda)
+    ejes.set_title("Activos y pasivos (neto por concepto)", color=AZUL)
+    figura.set_figheight(max(2.5, 0.35 * len(nombres) + 1))
+    return figura
+
+
+def _dibujar_flujo_caja(datos):
+    figura, ejes = _figura()
+    saldo = datos["ingresos"] - datos["gastos"]
+    barras = ejes.bar(
+        ["Ingresos", "Gastos", "Saldo mensual"],
+        [datos["ingresos"], datos["gastos"], saldo],
+        color=[VERDE, ROJO, AZUL if saldo >= 0 else ROJO]
+    )
+    ejes.bar_label(barras, labels=[format_currency(b.get_height()) for b in barras], fontsize=8)
+    ejes.axhline(0, color=GRIS, linewidth=0.8)
+    ejes.yaxis.set_major_formatter(_formato_moneda)
+    ejes.set_title("Flujo de caja mensual", color=AZUL)
+    return figura
+
+
+def _dibujar_proyeccion_retiro(datos):
+    figura, ejes = _figura()
+    años = list(range(datos["años_ahorro"] + 1))
+    series = []
+    for tasa in TASAS_RETIRO:
+        saldo = datos["ahorros_actuales"]
+        serie = [saldo]
+        for _ in años[1:]:
+            saldo = saldo * (1 + tasa) + datos["ahorro_anual"]
+            serie.append(saldo)
+        series.append(serie)
+    baja, media, alta = series
+    ejes.fill_between(años, baja, alta, color=AZUL, alpha=0.2,
+                      label=f"Rendimiento {TASAS_RETIRO[0]:.0%} - {TASAS_RETIRO[-1]:.0%}")
+    ejes.plot(años, media, color=AZUL, label=f"Rendimiento {TASAS_RETIRO[1]:.0%}")
+    ejes.axhline(datos["necesidad_total"], color=ROJO, linestyle="--", label="Necesidad total")
+    ejes.yaxis.set_major_formatter(_formato_moneda)
+    ejes.set_xlabel("Años hasta el retiro")
+    ejes.set_title("Proyección de ahorro para el retiro", color=AZUL)
+    ejes.legend(fontsize=8, frameon=False)
+    return figura
+
+
+def grafico_activos_pasivos(detalle):
+    """`detalle` es {concepto: neto}; los conceptos en cero no se dibujan."""
+    detalle = {nombre: valor for nombre, valor in detalle.items() if valor}
+    if not detalle:
+        return None
+    return _cacheado("activos_pasivos", {"detalle": detalle}, _dibujar_activos_pasivos)
+
+
+def grafico_flujo_caja(ingresos, gastos):
+    if not ingresos and not gastos:
+        return None
+    return _cacheado("flujo_caja", {"ingresos": ingresos, "gastos": gastos}, _dibujar_flujo_caja)
+
+
+def grafico_proyeccion_retiro(proyeccion):
+    # Algunas variantes guardan la proyección solo como texto
+    if not isinstance(proyeccion, dict) or proyeccion.get("años_ahorro", 0) <= 0:
+        return None
+    datos = {
+        "años_ahorro": proyeccion["años_ahorro"],
+        "ahorros_actuales": proyeccion.get("ahorros_actuales", 0),
+        "ahorro_anual": max(proyeccion["ahorro_necesario_anual"], 0),
+        "necesidad_total": proyeccion["necesidad_total"],
+    }
+    return _cacheado("proyeccion_retiro", datos, _dibujar_proyeccion_retiro)
@@ -0,0 +1,43 @@
+"""Cliente de OpenAI compartido por todas las variantes de la app.
+
+Cada variante creaba su propio `OpenAI(...)` al cargar el script, es decir
+un cliente (con su pool de conexiones HTTP) por rerun. Aquí hay uno solo
+por clave y por proceso: todas las sesiones y todas las variantes que sirve
+el proceso (ver `variantes.py`) reutilizan las mismas conexiones abiertas.
+La librería se importa al crear el primer cliente (ver `arranque`).
+
+    texto = completar(clave, "Eres un asesor...", prompt)
+"""
+import os
+import threading
+
+MODELO = "gpt-3.5-turbo"
+TEMPERATURA = 0.7
+
+# (clave, URL base) -> cliente; la URL base cambia en las pruebas de carga
+_clientes = {}
+_bloqueo = threading.Lock()
+
+
+def cliente(api_key):
+    """Cliente de OpenAI para `api_key`, creado una vez por proceso."""
+    llave = (api_key, os.environ.get('OPENAI_BASE_URL'))
+    with _bloqueo:
+        if llave not in _clientes:
+            from openai import OpenAI
+
+            _clientes[llave] = OpenAI(api_key=api_key)
+        return _clientes[llave]
+
+
+def completar(api_key, sistema, prompt, modelo=MODELO, temperatura=TEMPERATURA):
+    """Respuesta del modelo a `prompt` con el mensaje de sistema `sistema`."""
+    response = cliente(api_key).chat.completions.create(
+        model=modelo,
+        messages=[
+            {"role": "system", "content": sistema},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=temperatura
+    )
+    return response.choices[0].message.content
@@ -0,0 +1,273 @@
+"""Importación del balance y el presupuesto desde un archivo CSV o Excel.
+
+El archivo tiene una fila por partida y estas columnas (los encabezados
+aceptan variantes como "Descripción" o "Monto"):
+
+    tipo,concepto,valor,deuda
+    activo,Apartamento Chapinero,"$420,000,000","$180,000,000"
+    activo,Local comercial,"$250,000,000",
+    pasivo,Tarjeta Visa,"$3,500,000",
+    ingreso,Salario,"$8,000,000",
+    gasto,Mercado,"$1,200,000",
+
+Los activos y pasivos pueden ser tantos como se quiera. Los ingresos y
+gastos se suman en las categorías del flujo de caja de la app
+(`CATEGORIAS_INGRESOS`, `CATEGORIAS_GASTOS`); lo que no coincide con
+ninguna va a "Otros ingresos"/"Otros gastos".
+
+El archivo subido (hasta `MAX_BYTES`) se carga entero en memoria; de ahí
+los CSV y las hojas de Excel (.xlsx, con openpyxl en modo de solo lectura)
+se recorren por bloques de `TAMANO_BLOQUE` filas y cada bloque se valida y
+convierte por columnas (`parse_currency_serie`); los totales salen de una
+suma agrupada en centavos enteros, sin recorrer las filas en Python.
+"""
+import functools
+import io
+import itertools
+import operator
+import unicodedata
+import zipfile
+
+from calculadora.dinero import ColumnaDinero
+from calculadora.moneda import LOCALE_POR_DEFECTO, detectar_locale, parse_currency_serie
+
+CATEGORIAS_INGRESOS = ("Ingresos mensuales adulto 1", "Ingresos mensuales adulto 2", "Otros ingresos")
+CATEGORIAS_GASTOS = (
+    "Gasto de Inmueble 1", "Gasto de Inmueble 2", "Alimentación", "Educación", "Transporte",
+    "Salud", "Entretenimiento", "Servicios públicos", "Seguros", "Otros gastos",
+)
+
+TIPOS = {
+    "activo": "activos", "activos": "activos",
+    "pasivo": "pasivos", "pasivos": "pasivos",
+    "ingreso": "ingresos", "ingresos": "ingresos",
+    "gasto": "gastos", "gastos": "gastos",
+}
+ENCABEZADOS = {
+    "tipo": "tipo", "clase": "tipo",
+    "concepto": "concepto", "nombre": "concepto", "descripcion": "concepto", "detalle": "concepto",
+    "valor": "valor", "monto": "valor", "importe": "valor",
+    "deuda": "deuda", "saldo deuda": "deuda", "deuda pendiente": "deuda",
+}
+OBLIGATORIAS = ("tipo", "concepto", "valor")
+
+TAMANO_BLOQUE = 50_000
+MAX_ERRORES = 20
+MAX_BYTES = 20 * 1024 * 1024
+# Centavos que caben en int64; los montos (y sus sumas) deben quedar por debajo
+LIMITE_CENTAVOS = float(2 ** 63)
+
+PLANTILLA_CSV = (
+    "tipo,concepto,valor,deuda\n"
+    'activo,Apartamento,"$420,000,000","$180,000,000"\n'
+    'activo,Carro,"$60,000,000",\n'
+    'pasivo,Tarjeta de crédito,"$3,500,000",\n'
+    'ingreso,Salario,"$8,000,000",\n'
+    'gasto,Alimentación,"$1,200,000",\n'
+)
+
+
+class ErrorImportacion(ValueError):
+    """El archivo no se puede leer o no tiene las columnas necesarias."""
+
+
+def normalizar(texto):
+    """Minúsculas, sin tildes ni espacios sobrantes: "  Alimentación " -> "alimentacion"."""
+    sin_tildes = unicodedata.normalize("NFKD", str(texto)).encode("ascii", "ignore").decode()
+    return " ".join(sin_tildes.lower().split())
+
+
+def _por_categoria(categorias):
+    return {normalizar(categoria): categoria for categoria in categorias}
+
+
+def leer_bytes(archivo):
+    """Contenido de un archivo subido, con el límite de `MAX_BYTES`."""
+    contenido = archivo.read(MAX_BYTES + 1)
+    if len(contenido) > MAX_BYTES:
+        raise ErrorImportacion(f"El archivo pasa de {MAX_BYTES // (1024 * 1024)} MB.")
+    return contenido
+
+
+def leer_texto(archivo):
+    """Contenido de un archivo subido como texto, con el límite de `MAX_BYTES`."""
+    return leer_bytes(archivo).decode("utf-8-sig", errors="replace")
+
+
+def separador_csv(texto):
+    # Excel en español guarda los CSV con punto y coma
+    primera = texto.split("\n", 1)[0]
+    return ";" if primera.count(";") > primera.count(",") else ","
+
+
+def _celda(valor):
+    if valor is None:
+        return ""
+    # Excel guarda los enteros como float: 420000000.0 -> "420000000"
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return str(valor)
+
+
+def _bloques_excel(contenido):
+    """Bloques de TAMANO_BLOQUE filas de la primera hoja, leída en modo streaming."""
+    import pandas as pd
+
+    try:
+        from openpyxl import load_workbook
+        from openpyxl.utils.exceptions import InvalidFileException
+    except ImportError as e:
+        raise ErrorImportacion(f"No se puede leer Excel en este servidor ({e}); sube el archivo como CSV.") from e
+    try:
+        libro = load_workbook(io.BytesIO(contenido), read_only=True, data_only=True)
+    except (InvalidFileException, zipfile.BadZipFile, KeyError) as e:
+        raise ErrorImportacion(f"No se pudo leer el archivo de Excel: {e}") from e
+    try:
+        filas = libro.active.iter_rows(values_only=True)
+        encabezado = next(filas, None)
+        if encabezado is None:
+            raise ErrorImportacion("La hoja de Excel está vacía.")
+        columnas = [_celda(valor) for valor in encabezado]
+        ancho = len(columnas)
+        # El índice es la fila de la hoja menos 2, como en los bloques del CSV
+        numero = 0
+        while True:
+            lote = list(itertools.islice(filas, TAMANO_BLOQUE))
+            if not lote:
+                return
+            datos = [[_celda(valor) for valor in fila[:ancho]] + [""] * (ancho - len(fila)) for fila in lote]
+            yield pd.DataFrame(datos, columns=columnas, index=pd.RangeIndex(numero, numero + len(lote)), dtype=str)
+            numero += len(lote)
+    finally:
+        libro.close()
+
+
+def _bloques(archivo, nombre_archivo):
+    import pandas as pd
+
+    if nombre_archivo.lower().endswith(".xlsx"):
+        yield from _bloques_excel(leer_bytes(archivo))
+        return
+    texto = leer_texto(archivo)
+    yield from pd.read_csv(io.StringIO(texto), sep=separador_csv(texto), dtype=str, chunksize=TAMANO_BLOQUE,
+                           skipinitialspace=True, keep_default_na=False)
+
+
+def _columnas(bloque):
+    renombres = {}
+    for columna in bloque.columns:
+        destino = ENCABEZADOS.get(normalizar(columna))
+        if destino and destino not in renombres.values():
+            renombres[columna] = destino
+    bloque = bloque.rename(columns=renombres)
+    faltan = [columna for columna in OBLIGATORIAS if columna not in bloque.columns]
+    if faltan:
+        raise ErrorImportacion(
+            f"Faltan columnas: {', '.join(faltan)}. Se esperan: tipo, concepto, valor y (opcional) deuda."
+        )
+    if "deuda" not in bloque.columns:
+        bloque["deuda"] = ""
+    return bloque[["tipo", "concepto", "valor", "deuda"]]
+
+
+def importar(archivo, nombre_archivo, locale=LOCALE_POR_DEFECTO):
+    """Lee y valida el archivo. Devuelve un diccionario con:
+
+    - "activos_valor", "activos_deuda", "pasivos_valor", "pasivos_deuda":
+      `ColumnaDinero` con una fila por concepto (se suman los repetidos).
+    - "ingresos", "gastos": `ColumnaDinero` sobre las categorías de la app.
+    - "filas": filas leídas; "errores": lista de textos (vacía si todo está bien).
+    """
+    import pandas as pd
+
+    ingresos_por_nombre = _por_categoria(CATEGORIAS_INGRESOS)
+    gastos_por_nombre = _por_categoria(CATEGORIAS_GASTOS)
+    sumas = []
+    errores = []
+    filas = 0
+    magnitudes = [0.0, 0.0]
+    try:
+        for bloque in _bloques(archivo, nombre_archivo):
+            bloque = _columnas(bloque).fillna("")
+            # Número de línea en el archivo: encabezado + base 1
+            lineas = bloque.index + 2
+            if locale == "auto":
+                locale = detectar_locale(pd.concat([bloque["valor"], bloque["deuda"]]))
+
+            tipo = bloque["tipo"].map(normalizar).map(TIPOS)
+            concepto = bloque["concepto"].str.strip()
+            valor = parse_currency_serie(bloque["valor"], locale, invalido=float("nan"))
+            deuda = parse_currency_serie(bloque["deuda"], locale, invalido=float("nan"))
+            deuda = deuda.where(bloque["deuda"].str.strip() != "", 0.0)
+            # Infinitos y montos que no caben en centavos int64 (NaN ya es error)
+            valor_fuera = valor.notna() & ~(valor.abs() * 100 < LIMITE_CENTAVOS)
+            deuda_fuera = deuda.notna() & ~(deuda.abs() * 100 < LIMITE_CENTAVOS)
+
+            mascaras = (
+                (tipo.isna(), "tipo desconocido (usa activo, pasivo, ingreso o gasto)"),
+                (concepto == "", "falta el concepto"),
+                (valor.isna(), "valor vacío o no es un monto"),
+                (valor_fuera, "valor fuera de rango"),
+                (deuda.isna(), "deuda no es un monto"),
+                (deuda_fuera, "deuda fuera de rango"),
+            )
+            for mascara, mensaje in mascaras:
+                for linea in lineas[mascara.to_numpy()][:MAX_ERRORES]:
+                    errores.append(f"Línea {linea}: {mensaje}")
+            validas = ~functools.reduce(operator.or_, (mascara for mascara, _ in mascaras))
+            magnitudes[0] += float(valor[validas].abs().sum())
+            magnitudes[1] += float(deuda[validas].abs().sum())
+
+            # Ingresos y gastos van a las categorías fijas del flujo de caja
+            clave = concepto.where(~tipo.isin(["ingresos", "gastos"]), "")
+            normalizado = concepto.map(normalizar)
+            clave = clave.mask(tipo == "ingresos", normalizado.map(ingresos_por_nombre).fillna(CATEGORIAS_INGRESOS[-1]))
+            clave = clave.mask(tipo == "gastos", normalizado.map(gastos_por_nombre).fillna(CATEGORIAS_GASTOS[-1]))
+
+            centavos = pd.DataFrame({
+                "tipo": tipo, "clave": clave,
+                "valor": (valor.where(validas, 0) * 100).round().astype("int64"),
+                "deuda": (deuda.where(validas, 0) * 100).round().astype("int64"),
+            })[validas.to_numpy()]
+            sumas.append(centavos.groupby(["tipo", "clave"], sort=False)[["valor", "deuda"]].sum())
+            filas += len(bloque)
+    except ErrorImportacion:
+        raise
+    except (ValueError, UnicodeError, pd.errors.ParserError) as e:
+        raise ErrorImportacion(f"No se pudo leer el archivo: {e}") from e
+    # Cota de cualquier suma agrupada: si cabe, ningún total se desborda
+    if max(magnitudes) * 100 >= LIMITE_CENTAVOS:
+        raise ErrorImportacion("Los montos del archivo suman más de lo que se puede calcular.")
+
+    total = pd.concat(sumas).groupby(level=["tipo", "clave"], sort=False).sum() if sumas else None
+    return {
+        **_secciones(total),
+        "filas": filas,
+        "errores": errores[:MAX_ERRORES] + ([f"... y {len(errores) - MAX_ERRORES} errores más"] if len(errores) > MAX_ERRORES else []),
+    }
+
+
+def _secciones(total):
+    def de_tipo(tipo):
+        if total is None or tipo not in total.index.get_level_values("tipo"):
+            return None
+        return total.xs(tipo, level="tipo")
+
+    resultado = {}
+    for seccion in ("activos", "pasivos"):
+        filas = de_tipo(seccion)
+        nombres = [] if filas is None else list(filas.index)
+        resultado[f"{seccion}_valor"] = ColumnaDinero(nombres, None if filas is None else filas["valor"].to_numpy())
+        resultado[f"{seccion}_deuda"] = ColumnaDinero(
+            resultado[f"{seccion}_valor"].nombres, None if filas is None else filas["deuda"].to_numpy()
+        )
+    for seccion, categorias in (("ingresos", CATEGORIAS_INGRESOS), ("gastos", CATEGORIAS_GASTOS)):
+        filas = de_tipo(seccion)
+        valores = None if filas is None else filas["valor"].reindex(categorias, fill_value=0).to_numpy()
+        resultado[seccion] = ColumnaDinero(categorias, valores)
+    return resultado
+
+
+def vacio():
+    """Resultado sin partidas, para cuando no se ha importado nada."""
+    return {**_secciones(None), "filas": 0, "errores": []}
@@ -0,0 +1,234 @@
+"""Piezas de interfaz que comparten todas las variantes de la app.
+
+Cada `APPCALAJUSTES_*.py` y `Calculadorav*.py` es una capa de textos y
+disposición sobre este módulo: la configuración de la IA, el registro en
+la base, las consultas al modelo y las descargas del reporte viven aquí, y
+con ellas los recursos que conviene calentar una sola vez por proceso (el
+esquema de la base, el cliente de OpenAI en `ia`, la caché de reportes en
+`reportes`). Así un proceso que sirve varias variantes (ver `variantes.py`)
+no repite ese trabajo por cada una.
+"""
+import contextlib
+import os
+import threading
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from calculadora import base_datos, ia, reportes, sesiones
+from calculadora.analisis import calcular_situacion_financiera
+from calculadora.moneda import format_currency
+
+# Rutas de base de datos ya creadas o migradas en este proceso
+_bases_listas = set()
+_bloqueo_bases = threading.Lock()
+
+
+def configurar_ia():
+    """Marca en la sesión si hay clave de OpenAI; el cliente se crea al primer uso (ver `ia`)."""
+    try:
+        configurada = 'OPENAI_API_KEY' in st.secrets
+    except Exception:
+        # Sin secrets.toml Streamlit lanza al leerlo: la app sigue sin IA
+        configurada = False
+    if not configurada:
+        st.warning("Funcionalidad de IA limitada - No se configuró OPENAI_API_KEY")
+    st.session_state['openai_configured'] = configurada
+    return configurada
+
+
+def completar_ia(sistema, prompt):
+    """Respuesta del modelo con el cliente compartido del proceso. Los errores se propagan."""
+    return ia.completar(st.secrets["OPENAI_API_KEY"], sistema, prompt)
+
+
+def consultar_ia(sistema, prompt, spinner=None, error="Error al generar el plan",
+                 respaldo="No se pudo generar el plan en este momento."):
+    """Como `completar_ia`, pero si falla muestra `error` y devuelve `respaldo`."""
+    try:
+        with st.spinner(spinner) if spinner else contextlib.nullcontext():
+            return completar_ia(sistema, prompt)
+    except Exception as e:
+        st.error(f"{error}: {str(e)}")
+        return respaldo
+
+
+def generar_plan_trabajo(ingresos, gastos, activos, pasivos):
+    if not st.session_state.get('openai_configured', False):
+        return "Servicio de IA no disponible. Configura tu clave de OpenAI API para habilitar esta función."
+
+    prompt = f"""
+    Como experto en bienes raíces y finanzas personales, analiza esta situación:
+    - Ingresos: {format_currency(ingresos)}/mes
+    - Gastos: {format_currency(gastos)}/mes
+    - Activos: {format_currency(activos)}
+    - Pasivos: {format_currency(pasivos)}
+
+    Crea un plan detallado para inversión en bienes raíces que incluya:
+    1. Diagnóstico de la situación actual
+    2. Estrategias para mejorar flujo de caja
+    3. Plan de reducción de deudas
+    4. Recomendaciones de inversión personalizadas
+    5. Metas a corto, mediano y largo plazo
+    6. Ejercicios prácticos
+    7. Recomendaciones de cursos
+
+    Usa lenguaje claro y motivador, con ejemplos concretos.
+    Respuesta en español.
+    """
+
+    return consultar_ia(
+        "Eres un asesor experto en inversión en bienes raíces. Responde en español con enfoque práctico.",
+        prompt,
+        spinner='Generando tu plan personalizado...'
+    )
+
+
+# Funciones de base de datos
+def crear_base_datos():
+    """Crea o migra el esquema una vez por proceso y por archivo, no en cada rerun."""
+    ruta = base_datos.DB_PATH
+    with _bloqueo_bases:
+        if ruta in _bases_listas and os.path.exists(ruta):
+            return
+        base_datos.crear_base_datos(ruta)
+        _bases_listas.add(ruta)
+
+
+def registrar_usuario(nombre, edad, email, telefono):
+    if edad < 18:
+        st.warning("Debes ser mayor de 18 años para usar este programa.")
+        return None
+    if not base_datos.email_valido(email):
+        st.warning("Ingresa un correo electrónico válido.")
+        return None
+    # Un mismo correo siempre devuelve el mismo id (no crea filas duplicadas)
+    return base_datos.guardar_usuario(nombre, edad, email, telefono)
+
+
+# Funciones de análisis financiero
+def analizar_situacion_financiera(ingresos, gastos, activos, pasivos, comparacion=None):
+    """Métricas, perfil y recomendaciones en pantalla; devuelve lo que calcula `analisis`.
+
+    `comparacion(flujo_caja, patrimonio_neto)` se llama después de las
+    métricas, para las variantes que agregan algo ahí (p. ej. percentiles).
+    """
+    situacion = calcular_situacion_financiera(ingresos, gastos, activos, pasivos)
+    flujo_caja_mensual = situacion["flujo_caja"]
+    patrimonio_neto = situacion["patrimonio"]
+    perfil = situacion["perfil_inversion"]["nivel"]
+    descripcion = situacion["perfil_inversion"]["descripcion"]
+    recomendaciones = situacion["recomendaciones"]
+    
+    # Mostrar métricas
+    st.subheader("📊 Análisis Resumen de tu Situación Financiera")
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.metric("Ingresos Mensuales", format_currency(ingresos))
+        st.metric("Gastos Mensuales", format_currency(gastos))
+        st.metric("Flujo de Caja Mensual", format_currency(flujo_caja_mensual), 
+                 delta="Positivo" if flujo_caja_mensual > 0 else "Negativo",
+                 delta_color="normal" if flujo_caja_mensual > 0 else "inverse")
+    
+    with col2:
+        st.metric("Activos Totales", format_currency(activos))
+        st.metric("Pasivos Totales", format_currency(pasivos))
+        st.metric("Patrimonio Neto", format_currency(patrimonio_neto), 
+                 delta="Positivo" if patrimonio_neto > 0 else "Negativo",
+                 delta_color="normal" if patrimonio_neto > 0 else "inverse")
+    
+    if comparacion:
+        comparacion(flujo_caja_mensual, patrimonio_neto)
+    
+    # Mostrar perfil y recomendaciones
+    st.subheader("🏡 Perfil de Inversión en Bienes Raíces")
+    st.markdown(f"**Nivel:** {perfil}")
+    st.markdown(descripcion)
+    
+    st.markdown(recomendaciones)
+    
+    # Análisis específico
+    st.subheader("🔍 Análisis Específico para Bienes Raíces")
+    if flujo_caja_mensual > 0:
+        st.success(f"Flujo de caja positivo de {format_currency(flujo_caja_mensual)}/mes. Podrías destinar parte de este excedente a inversión en propiedades.")
+    else:
+        st.error(f"Flujo de caja negativo de {format_currency(abs(flujo_caja_mensual))}/mes. Necesitas equilibrar tus finanzas antes de considerar inversiones.")
+    
+    if patrimonio_neto > 50000:
+        st.success("Patrimonio neto sólido. Podrías usar parte como garantía para financiamiento de propiedades.")
+    elif patrimonio_neto > 0:
+        st.warning("Patrimonio neto positivo pero modesto. Considera estrategias de bajo riesgo como alquiler de habitaciones.")
+    else:
+        st.error("Patrimonio neto negativo. Enfócate en reducir deudas antes de invertir.")
+    
+    return situacion
+
+
+# Funciones utilitarias
+def emoji_help_tooltip(text, emoji="🧠"):
+    st.markdown(f"""
+    <span class="help-icon">
+        {emoji}
+        <span class="help-text">{text}</span>
+    </span>
+    """, unsafe_allow_html=True)
+
+
+# Descargas del reporte
+def _al_descargar(generar, reporte_data):
+    """`data` diferido de un botón de descarga.
+
+    Streamlit lo llama al hacer clic, fuera de cualquier run, así que
+    `sesiones.comenzar_run` no alcanza a devolver a memoria los campos que
+    pasó a disco si la sesión estuvo inactiva; se hace aquí antes de generar.
+    """
+    ctx = get_script_run_ctx()
+    sesion_id = ctx.session_id if ctx is not None else None
+
+    def data():
+        if sesion_id is not None:
+            sesiones.rehidratar(sesion_id)
+        return generar(reporte_data)
+
+    return data
+
+
+def boton_pdf(reporte_data, etiqueta="📄 Descargar Reporte Completo en PDF",
+              nombre_archivo="reporte_bienes_raices.pdf", encabezado=None):
+    # El PDF se genera solo al hacer clic y se envía como archivo binario,
+    # sin quedar guardado en la página ni en la sesión
+    st.download_button(
+        etiqueta,
+        data=_al_descargar(lambda datos: reportes.generar_pdf_cacheado(datos, encabezado), reporte_data),
+        file_name=nombre_archivo,
+        mime="application/pdf",
+        on_click="ignore"
+    )
+
+
+def botones_descarga(reporte_data):
+    st.download_button(
+        "📱 Descargar Reporte para Celular (HTML)",
+        data=_al_descargar(reportes.generar_html_cacheado, reporte_data),
+        file_name="reporte_bienes_raices.html",
+        mime="text/html",
+        on_click="ignore"
+    )
+    boton_pdf(reporte_data)
+
+
+def enlace_reporte(reporte_id):
+    base = (st.context.url or "").split("?")[0]
+    return f"{base}?reporte={reporte_id}"
+
+
+def mostrar_reporte_compartido(reporte_id):
+    # Solo lee la foto guardada: no vuelve a llamar a la IA ni a recalcular
+    reporte_data = base_datos.cargar_reporte(reporte_id)
+    if reporte_data is None:
+        st.error("El enlace no es válido o el reporte ya no existe.")
+        return
+    st.subheader(f"📄 Reporte de {reporte_data['usuario'].get('nombre', '')}")
+    st.iframe(reportes.generar_html_cacheado(reporte_data).decode("utf-8"), height=900)
+    botones_descarga(reporte_data)
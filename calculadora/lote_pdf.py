@@ -0,0 +1,138 @@
+"""Generación en lote de los reportes PDF de un grupo del taller.
+
+Uso:
+
+    python -m calculadora.lote_pdf --desde 2026-10-19 --salida reportes.zip
+    python -m calculadora.lote_pdf --ids 12 15 18 --salida reportes/ --procesos 4
+
+Toma la última foto de finanzas de cada usuario, arma el mismo reporte que
+descarga la app y reparte el renderizado en un pool de procesos. Cada
+proceso precarga fuentes y diseño una sola vez. Hay a lo sumo
+`EN_VUELO_POR_PROCESO` reportes en curso por proceso, y los PDF se
+escriben a una carpeta o a un ZIP en el orden en que terminan: en memoria
+nunca hay más que esa ventana.
+"""
+import argparse
+import itertools
+import os
+import re
+import time
+import unicodedata
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from calculadora import base_datos, reporte_pdf
+from calculadora.analisis import calcular_situacion_financiera
+
+# Las fotos anteriores a los montos en centavos vienen de sumas de floats
+# (1234.5600000001); SQLite las lleva al centavo al leerlas. El reporte
+# trabaja en pesos (float), así que los montos siguen siendo floats.
+# Reportes enviados al pool y aún sin escribir, por proceso
+EN_VUELO_POR_PROCESO = 2
+
+CONSULTA_BASE = '''
+    SELECT u.id, u.nombre, u.edad, u.email, u.telefono,
+           COALESCE(ROUND(f.ingresos_mensuales, 2), 0.0), COALESCE(ROUND(f.gastos_mensuales, 2), 0.0),
+           COALESCE(ROUND(f.activos_totales, 2), 0.0), COALESCE(ROUND(f.pasivos_totales, 2), 0.0)
+    FROM usuarios u
+    JOIN finanzas f ON f.id = (SELECT MAX(id) FROM finanzas WHERE usuario_id = u.id)
+'''
+
+
+def cargar_asistentes(ids=None, desde=None, hasta=None, db_path=None):
+    condiciones = []
+    parametros = []
+    if ids:
+        condiciones.append(f"u.id IN ({', '.join('?' * len(ids))})")
+        parametros.extend(ids)
+    if desde:
+        condiciones.append("f.creado_en >= ?")
+        parametros.append(desde)
+    if hasta:
+        condiciones.append("f.creado_en < date(?, '+1 day')")
+        parametros.append(hasta)
+    where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+
+    conn = base_datos.conectar(db_path)
+    filas = conn.execute(f"{CONSULTA_BASE} {where} ORDER BY u.id", parametros).fetchall()
+    conn.close()
+    return filas
+
+
+def reporte_data_desde_fila(fila):
+    usuario_id, nombre, edad, email, telefono, ingresos, gastos, activos, pasivos = fila
+    situacion = calcular_situacion_financiera(ingresos, gastos, activos, pasivos)
+    return {
+        'usuario': {'nombre': nombre, 'edad': edad, 'email': email, 'telefono': telefono},
+        'finanzas': {'ingresos': ingresos, 'gastos': gastos, 'activos': activos, 'pasivos': pasivos},
+        'analisis': {
+            'resumen': situacion['resumen'],
+            'perfil_inversion': situacion['perfil_inversion']
+        }
+    }
+
+
+def _renderizar(fila):
+    reporte_data = reporte_data_desde_fila(fila)
+    pdf = reporte_pdf.construir_pdf(
+        reporte_data['usuario'], reporte_data['finanzas'], reporte_data['analisis']
+    )
+    return fila[0], fila[1], bytes(pdf.output()), pdf.page_no()
+
+
+def nombre_archivo(usuario_id, nombre):
+    sin_tildes = unicodedata.normalize("NFKD", nombre or "").encode("ascii", "ignore").decode()
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", sin_tildes).strip("_").lower()
+    return f"reporte_{usuario_id:06d}_{slug or 'usuario'}.pdf"
+
+
+def generar_lote(filas, salida, procesos=None):
+    """Renderiza los reportes en paralelo. Devuelve (reportes, páginas, segundos)."""
+    en_zip = salida.lower().endswith(".zip")
+    if en_zip:
+        destino = zipfile.ZipFile(salida, "w", compression=zipfile.ZIP_STORED)
+    else:
+        os.makedirs(salida, exist_ok=True)
+
+    inicio = time.perf_counter()
+    reportes = paginas = 0
+    ventana = (procesos or os.cpu_count() or 1) * EN_VUELO_POR_PROCESO
+    pendientes = iter(filas)
+    try:
+        with ProcessPoolExecutor(max_workers=procesos, initializer=reporte_pdf.precargar) as pool:
+            en_vuelo = {pool.submit(_renderizar, fila) for fila in itertools.islice(pendientes, ventana)}
+            while en_vuelo:
+                listos, en_vuelo = wait(en_vuelo, return_when=FIRST_COMPLETED)
+                for futuro in listos:
+                    usuario_id, nombre, pdf_bytes, n_paginas = futuro.result()
+                    archivo = nombre_archivo(usuario_id, nombre)
+                    if en_zip:
+                        destino.writestr(archivo, pdf_bytes)
+                    else:
+                        with open(os.path.join(salida, archivo), "wb") as f:
+                            f.write(pdf_bytes)
+                    reportes += 1
+                    paginas += n_paginas
+                en_vuelo |= {pool.submit(_renderizar, fila) for fila in itertools.islice(pendientes, len(listos))}
+    finally:
+        if en_zip:
+            destino.close()
+    return reportes, paginas, time.perf_counter() - inicio
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera los reportes PDF de un grupo de asistentes")
+    parser.add_argument("--ids", type=int, nargs="+", help="Ids de usuario a incluir")
+    parser.add_argument("--desde", help="Fecha inicial del análisis (AAAA-MM-DD)")
+    parser.add_argument("--hasta", help="Fecha final del análisis, inclusive (AAAA-MM-DD)")
+    parser.add_argument("--salida", default="reportes", help="Carpeta o archivo .zip de salida")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos del pool (por defecto, uno por CPU)")
+    parser.add_argument("--db", default=base_datos.DB_PATH, help="Ruta del archivo SQLite")
+    args = parser.parse_args()
+
+    filas = cargar_asistentes(args.ids, args.desde, args.hasta, args.db)
+    if not filas:
+        parser.exit(1, "No hay asistentes con análisis guardado para esos filtros.\n")
+    reportes, paginas, segundos = generar_lote(filas, args.salida, args.procesos)
+    print(f"{reportes} reportes, {paginas} páginas en {segundos:.2f} s "
+          f"({paginas / segundos:.1f} páginas/s) -> {args.salida}")
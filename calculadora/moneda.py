@@ -0,0 +1,277 @@
+"""Formato y lectura de montos en pesos/dólares ($1,234.56).
+
+`parse_currency` entiende los formatos que escriben los asistentes:
+
+    parse_currency("$1,234.56")                 ->  1234.56
+    parse_currency("1.234.567,50")              ->  1234567.5   (es-CO)
+    parse_currency("$(3,000.00)")               -> -3000.0      (negativo contable)
+    parse_currency("-$500.25")                  -> -500.25
+    parse_currency("1.500", locale="en-US")     ->  1.5
+
+Con `locale="auto"` (lo predeterminado) el separador decimal se deduce del
+texto: si aparecen punto y coma, el último es el decimal; si uno solo se
+repite o agrupa la parte entera de a exactamente tres dígitos, es de miles.
+Así "$40,000" y "1.500" son miles, y "12,5" y "$0.125" son decimales. Con
+"en-US" o "es-CO" se aplican las reglas del locale sin adivinar; en "es-CO"
+un punto que no agrupa de a tres es decimal, como en los números que Excel
+entrega como texto ("1500.5").
+
+Solo un "-" al comienzo o los paréntesis hacen negativo un monto. Lo que no
+encaja en el formato ("12.5.6", "10-20", "1e5") no es un monto y se lee como
+`invalido`:
+
+    parse_currency("10-20")                     ->  0.0
+    parse_currency("10-20", invalido=None)      ->  None
+
+`parse_currency_serie` hace lo mismo con una columna entera de pandas usando
+Arrow, para importar archivos grandes.
+
+`format_currency_serie` formatea una columna entera para tablas y PDFs, con
+agrupación según el locale y negativos contables como en la tabla de ejemplo:
+
+    format_currency_serie([1234.5, -3000, 0])                  -> ["$1,234.50", "$(3,000.00)", "$0.00"]
+    format_currency_serie([1234567.5], locale="es-CO")         -> ["$1.234.567,50"]
+
+Los valores faltantes (NaN) quedan como texto vacío, igual que las celdas
+vacías de la tabla de ejemplo.
+"""
+import functools
+import itertools
+import math
+import re
+import sys
+import threading
+
+LOCALES = {
+    # locale: (separador de miles, separador decimal)
+    "en-US": (",", "."),
+    "es-CO": (".", ","),
+}
+LOCALE_POR_DEFECTO = "auto"
+
+# Símbolo, espacios y códigos de moneda ("COP 2.500.000"): no cambian el monto
+_ADORNOS = r"[\sA-Za-z$]"
+# Letras entre cifras ("1e5", "2.5E+3"): no es un código de moneda ni un monto
+_LETRAS_INTERNAS = r"\d\s*[A-Za-z]+\s*[-+]?\d"
+
+
+def _patron_numero(miles, decimal):
+    miles, decimal = re.escape(miles), re.escape(decimal)
+    # Parte entera sin separadores o agrupada de a tres ("1,234,567"), y decimales opcionales
+    return rf"^(?:(?:\d+|[1-9]\d{{0,2}}(?:{miles}\d{{3}})+)(?:{decimal}\d+)?|{decimal}\d+)$"
+
+
+# Monto sin signo ni adornos, según cada locale (también sirve en Arrow)
+_PATRONES = {locale: _patron_numero(miles, decimal) for locale, (miles, decimal) in LOCALES.items()}
+_NUMEROS = {locale: re.compile(patron) for locale, patron in _PATRONES.items()}
+# Número "de máquina" con punto decimal, válido también en es-CO ("1500.5")
+_PATRON_MAQUINA = r"^\d+\.\d+$"
+_MAQUINA = re.compile(_PATRON_MAQUINA)
+# Un separador que agrupa de a tres la parte entera ("1.500", "$40,000)")
+_AGRUPADO = {
+    separador: re.compile(rf"(?<![\d.,])[1-9]\d{{0,2}}(?:{re.escape(separador)}\d{{3}})+(?![\d.,])")
+    for separador in (".", ",")
+}
+
+
+# De la agrupación en-US ("1,234.50") a la de cada locale
+_TRADUCCIONES = {
+    locale: str.maketrans({",": miles, ".": decimal}) for locale, (miles, decimal) in LOCALES.items()
+}
+
+
+def format_currency(value):
+    return f"${value:,.2f}" if value else "$0.00"
+
+
+def _formatear_centavos(centavos, locale, contable):
+    """Textos de un arreglo de centavos enteros, en una sola pasada por valor."""
+    import numpy as np
+
+    # Exacto al centavo mientras el monto no pase de billones de pesos
+    cuerpos = [f"{pesos:,.2f}" for pesos in (np.abs(centavos) / 100).tolist()]
+    if locale != "en-US":
+        traduccion = _TRADUCCIONES[locale]
+        cuerpos = [cuerpo.translate(traduccion) for cuerpo in cuerpos]
+    negativo = "$({})" if contable else "-${}"
+    return [
+        negativo.format(cuerpo) if es_negativo else "$" + cuerpo
+        for cuerpo, es_negativo in zip(cuerpos, (centavos < 0).tolist())
+    ]
+
+
+class MemoMontos:
+    """Textos ya formateados {(centavos, locale, contable): texto} para reutilizar entre llamadas.
+
+    Lo comparten los hilos de todas las sesiones (p. ej. los PDF de un
+    proceso), así que cada acceso va con candado, y está acotado a `maximo`
+    entradas: al llenarse se vacía y vuelve a empezar.
+    """
+
+    def __init__(self, maximo=10_000):
+        self.maximo = maximo
+        self._textos = {}
+        self._bloqueo = threading.Lock()
+
+    def __len__(self):
+        return len(self._textos)
+
+    def textos(self, centavos, locale, contable):
+        """Textos de un arreglo de centavos; formatea solo los que no estaban."""
+        claves = [(valor, locale, contable) for valor in centavos.tolist()]
+        with self._bloqueo:
+            textos = [self._textos.get(clave) for clave in claves]
+        faltan = [i for i, texto in enumerate(textos) if texto is None]
+        if faltan:
+            nuevos = _formatear_centavos(centavos[faltan], locale, contable)
+            for i, texto in zip(faltan, nuevos):
+                textos[i] = texto
+            with self._bloqueo:
+                if len(self._textos) + len(faltan) > self.maximo:
+                    self._textos.clear()
+                self._textos.update(zip((claves[i] for i in faltan), nuevos))
+        return textos
+
+
+def format_currency_serie(valores, locale="en-US", contable=True, memo=None):
+    """Formatea muchos montos a la vez (lista, arreglo, `pandas.Series` o `ColumnaDinero`).
+
+    Cada monto distinto se formatea una sola vez, así columnas con muchos
+    "$0.00" o valores repetidos cuestan lo que sus valores únicos. `memo`
+    es una `MemoMontos` opcional que se puede reutilizar entre llamadas,
+    por ejemplo en un lote de PDFs. Devuelve una lista de textos, o una
+    serie con el mismo índice si `valores` es una serie; los montos
+    faltantes o no finitos quedan como "".
+    """
+    import numpy as np
+
+    # Si llegó una serie, pandas ya está importado
+    pd = sys.modules.get("pandas")
+    es_serie = pd is not None and isinstance(valores, pd.Series)
+    faltantes = None
+    centavos = getattr(valores, "centavos", None)
+    if centavos is None:
+        pesos = np.asarray(valores, dtype=np.float64)
+        # NaN, infinitos y montos que no caben en centavos int64 quedan vacíos
+        faltantes = ~(np.abs(pesos) * 100 < 2.0 ** 63)
+        centavos = np.rint(np.where(faltantes, 0, pesos) * 100).astype(np.int64)
+    if len(centavos) == 0:
+        return pd.Series([], index=valores.index, dtype=object) if es_serie else []
+    unicos, posiciones = np.unique(centavos, return_inverse=True)
+    if memo is None:
+        textos = _formatear_centavos(unicos, locale, contable)
+    else:
+        textos = memo.textos(unicos, locale, contable)
+    resultado = np.array(textos, dtype=object)[posiciones]
+    if faltantes is not None and faltantes.any():
+        resultado[faltantes] = ""
+    resultado = resultado.tolist()
+    if es_serie:
+        return pd.Series(resultado, index=valores.index, dtype=object)
+    return resultado
+
+
+def _decimal_deducido(texto):
+    punto = texto.rfind(".")
+    coma = texto.rfind(",")
+    if punto >= 0 and coma >= 0:
+        return "." if punto > coma else ","
+    if punto < 0 and coma < 0:
+        return "."
+    separador = "." if punto >= 0 else ","
+    otro = "," if separador == "." else "."
+    if texto.count(separador) > 1 or _AGRUPADO[separador].search(texto):
+        return otro
+    return separador
+
+
+def parse_currency(currency_str, locale=LOCALE_POR_DEFECTO, invalido=0.0):
+    if not currency_str:
+        return 0.0
+    if isinstance(currency_str, (int, float)):
+        return float(currency_str)
+    valor = _parse_texto(currency_str, locale)
+    return invalido if valor is None else valor
+
+
+# Cada rerun vuelve a leer los mismos textos de los widgets: se recuerdan
+@functools.lru_cache(maxsize=4096)
+def _parse_texto(currency_str, locale):
+    """Monto de un texto, o None si no es un monto."""
+    # Camino rápido: solo dígitos, como "3500" o lo que llega de un archivo
+    if currency_str.isascii() and currency_str.isdigit():
+        return float(currency_str)
+
+    if locale == "auto":
+        locale = "en-US" if _decimal_deducido(currency_str) == "." else "es-CO"
+    miles, decimal = LOCALES[locale]
+    if re.search(_LETRAS_INTERNAS, currency_str):
+        return None
+    texto = re.sub(_ADORNOS, "", currency_str)
+    negativo = texto.startswith("-") or (texto.startswith("(") and texto.endswith(")"))
+    cuerpo = texto[1:] if texto.startswith("-") else texto[1:-1] if negativo else texto
+    if _NUMEROS[locale].match(cuerpo):
+        valor = float(cuerpo.replace(miles, "").replace(decimal, "."))
+    elif locale == "es-CO" and _MAQUINA.match(cuerpo):
+        valor = float(cuerpo)
+    else:
+        return None
+    return -valor if negativo else valor
+
+
+def detectar_locale(textos, muestra=1000):
+    """Locale más probable de una colección de montos, mirando una muestra."""
+    votos = {"en-US": 0, "es-CO": 0}
+    for texto in itertools.islice(textos, muestra):
+        if isinstance(texto, str) and ("." in texto or "," in texto):
+            votos["en-US" if _decimal_deducido(texto) == "." else "es-CO"] += 1
+    return "es-CO" if votos["es-CO"] > votos["en-US"] else "en-US"
+
+
+def parse_currency_serie(serie, locale=LOCALE_POR_DEFECTO, invalido=0.0):
+    """Versión vectorizada de `parse_currency` para una `pandas.Series` de textos.
+
+    Con "auto" se deduce un solo locale para toda la columna. Los valores
+    vacíos o que no son montos quedan como `invalido` (`float("nan")` para
+    poder detectarlos). Devuelve una serie float64 con el mismo índice.
+    """
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    if locale == "auto":
+        locale = detectar_locale(serie)
+    miles, decimal = LOCALES[locale]
+
+    if not pd.api.types.is_string_dtype(serie) or serie.dtype == object:
+        # Números sueltos (p. ej. leídos de Excel) y nulos pasan a texto de Arrow
+        serie = serie.astype("string[pyarrow]")
+    textos = pa.array(serie, from_pandas=True)
+
+    # Reemplazos literales: mucho más rápidos que una expresión regular por valor
+    limpios = textos
+    for caracter in ("$", " "):
+        limpios = pc.replace_substring(limpios, caracter, "")
+    # La expresión regular solo si quedan letras o espacios raros ("COP 2.500.000")
+    if pc.any(pc.match_substring_regex(limpios, _ADORNOS)).as_py():
+        limpios = pc.replace_substring_regex(limpios, _ADORNOS, "")
+    menos = pc.starts_with(limpios, "-")
+    parentesis = pc.and_(pc.starts_with(limpios, "("), pc.ends_with(limpios, ")"))
+    negativo = pc.or_(menos, parentesis)
+    cuerpo = pc.if_else(menos, pc.utf8_slice_codeunits(limpios, 1), limpios)
+    cuerpo = pc.if_else(parentesis, pc.utf8_slice_codeunits(limpios, 1, -1), cuerpo)
+
+    valido = pc.match_substring_regex(cuerpo, _PATRONES[locale])
+    numeros = pc.replace_substring(cuerpo, miles, "")
+    if decimal == ",":
+        numeros = pc.replace_substring(numeros, ",", ".")
+    if locale == "es-CO":
+        maquina = pc.and_(pc.invert(valido), pc.match_substring_regex(cuerpo, _PATRON_MAQUINA))
+        numeros = pc.if_else(maquina, cuerpo, numeros)
+        valido = pc.or_(valido, maquina)
+    valido = pc.and_(valido, pc.invert(pc.match_substring_regex(textos, _LETRAS_INTERNAS)))
+    numeros = pc.if_else(valido, numeros, pa.scalar(None, numeros.type))
+    valores = pc.cast(numeros, pa.float64())
+    valores = pc.if_else(negativo, pc.negate(valores), valores)
+    resultado = pd.Series(valores.to_numpy(zero_copy_only=False), index=serie.index, dtype="float64")
+    return resultado if math.isnan(invalido) else resultado.fillna(invalido)
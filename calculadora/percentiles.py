@@ -0,0 +1,278 @@
+"""Percentiles de flujo de caja y patrimonio neto frente a otros participantes.
+
+Cada métrica y cohorte se resume en un histograma logarítmico mergeable
+(estilo DDSketch): el valor se ubica en una cubeta cuyo ancho es un ALFA
+relativo del valor, así que el percentil tiene un error relativo acotado y
+la memoria no crece con el número de participantes. Los conteos por cubeta
+se guardan en SQLite y se actualizan con un UPSERT por cada foto de
+finanzas; cada proceso los carga una sola vez.
+
+Cada participante cuenta una sola vez, con su último análisis: la tabla
+`percentiles_aportes` guarda lo que aportó cada usuario, y al volver a
+analizar se resta ese aporte de sus cubetas antes de sumar el nuevo.
+"""
+import math
+import threading
+from collections import Counter
+
+ALFA = 0.01
+GAMMA = (1 + ALFA) / (1 - ALFA)
+LOG_GAMMA = math.log(GAMMA)
+
+METRICAS = ("flujo_caja", "patrimonio_neto")
+COHORTE_TODOS = "todos"
+MINIMO_MUESTRA = 10
+
+RANGOS_EDAD = ((18, 29), (30, 39), (40, 49), (50, 59))
+
+_bosquejos = None
+_bloqueo = threading.Lock()
+
+
+def cohorte_edad(edad):
+    for desde, hasta in RANGOS_EDAD:
+        if edad <= hasta:
+            return f"{desde}-{hasta}"
+    return "60+"
+
+
+def _cohortes(edad):
+    if edad is None:
+        return [COHORTE_TODOS]
+    return [COHORTE_TODOS, cohorte_edad(edad)]
+
+
+def clave(valor):
+    """Cubeta del valor: 0 para |valor| < 1, positiva o negativa según el signo."""
+    magnitud = abs(valor)
+    if magnitud < 1:
+        return 0
+    indice = math.ceil(math.log(magnitud) / LOG_GAMMA) + 1
+    return indice if valor > 0 else -indice
+
+
+class BosquejoCuantiles:
+    def __init__(self, conteos=None):
+        self.conteos = Counter(conteos or {})
+        self.total = sum(self.conteos.values())
+        self._acumulado = None
+
+    def agregar(self, valor, veces=1):
+        self.conteos[clave(valor)] += veces
+        self.total += veces
+        self._acumulado = None
+
+    def quitar(self, valor, veces=1):
+        k = clave(valor)
+        restantes = self.conteos[k] - veces
+        if restantes > 0:
+            self.conteos[k] = restantes
+        else:
+            del self.conteos[k]
+        self.total -= veces
+        self._acumulado = None
+
+    def combinar(self, otro):
+        self.conteos.update(otro.conteos)
+        self.total += otro.total
+        self._acumulado = None
+
+    def _preparar(self):
+        # Conteo acumulado denso entre la menor y la mayor cubeta: cada
+        # consulta posterior es un acceso por índice
+        self._minimo = min(self.conteos)
+        maximo = max(self.conteos)
+        acumulado = []
+        suma = 0
+        for k in range(self._minimo, maximo + 1):
+            acumulado.append(suma)
+            suma += self.conteos.get(k, 0)
+        self._acumulado = acumulado
+
+    def percentil(self, valor):
+        """Porcentaje (0-100) de valores registrados por debajo de `valor`."""
+        if not self.total:
+            return None
+        if self._acumulado is None:
+            self._preparar()
+        k = clave(valor)
+        posicion = k - self._minimo
+        if posicion < 0:
+            return 0.0
+        if posicion >= len(self._acumulado):
+            return 100.0
+        # Los valores de la misma cubeta cuentan como la mitad por debajo
+        debajo = self._acumulado[posicion] + 0.5 * self.conteos.get(k, 0)
+        return 100.0 * debajo / self.total
+
+
+def crear_tabla(cursor):
+    # Sin tabla de aportes la base es nueva o contaba cada análisis: se reconstruye
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'percentiles_aportes'")
+    nueva = cursor.fetchone() is None
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS percentiles_cubetas (
+            metrica TEXT,
+            cohorte TEXT,
+            clave INTEGER,
+            total INTEGER NOT NULL,
+            PRIMARY KEY (metrica, cohorte, clave)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS percentiles_aportes (
+            usuario_id INTEGER PRIMARY KEY,
+            edad INTEGER,
+            flujo_caja REAL,
+            patrimonio_neto REAL
+        )
+    ''')
+    if nueva:
+        # Única lectura completa de `finanzas`: la última foto de cada usuario
+        cursor.execute("DELETE FROM percentiles_cubetas")
+        cursor.execute('''
+            INSERT INTO percentiles_aportes (usuario_id, edad, flujo_caja, patrimonio_neto)
+            SELECT u.id, u.edad, f.ingresos_mensuales - f.gastos_mensuales,
+                   f.activos_totales - f.pasivos_totales
+            FROM finanzas f
+            JOIN (
+                SELECT max(id) AS id FROM finanzas
+                WHERE ingresos_mensuales IS NOT NULL
+                GROUP BY usuario_id
+            ) ultima ON ultima.id = f.id
+            JOIN usuarios u ON u.id = f.usuario_id
+        ''')
+        cursor.execute("SELECT edad, flujo_caja, patrimonio_neto FROM percentiles_aportes")
+        conteos = Counter()
+        for edad, flujo_caja, patrimonio_neto in cursor.fetchall():
+            for fila in _filas(edad, flujo_caja, patrimonio_neto):
+                conteos[fila] += 1
+        cursor.executemany(
+            "INSERT INTO percentiles_cubetas (metrica, cohorte, clave, total) VALUES (?, ?, ?, ?)",
+            [(*fila, total) for fila, total in conteos.items()]
+        )
+
+
+def _filas(edad, flujo_caja, patrimonio_neto):
+    for metrica, valor in zip(METRICAS, (flujo_caja, patrimonio_neto)):
+        for cohorte in _cohortes(edad):
+            yield (metrica, cohorte, clave(valor))
+
+
+def _restar(cursor, aporte):
+    filas = list(_filas(*aporte))
+    cursor.executemany('''
+        UPDATE percentiles_cubetas SET total = total - 1
+        WHERE metrica = ? AND cohorte = ? AND clave = ?
+    ''', filas)
+    cursor.executemany('''
+        DELETE FROM percentiles_cubetas
+        WHERE metrica = ? AND cohorte = ? AND clave = ? AND total <= 0
+    ''', filas)
+
+
+def registrar(cursor, usuario_id, edad, flujo_caja, patrimonio_neto):
+    """Cuenta el análisis de un usuario en lugar del anterior suyo.
+
+    Devuelve el aporte anterior `(edad, flujo_caja, patrimonio_neto)`, o
+    None si es su primer análisis, para `agregar_en_memoria`.
+    """
+    cursor.execute(
+        "SELECT edad, flujo_caja, patrimonio_neto FROM percentiles_aportes WHERE usuario_id = ?",
+        (usuario_id,)
+    )
+    anterior = cursor.fetchone()
+    if anterior is not None:
+        _restar(cursor, anterior)
+    cursor.executemany('''
+        INSERT INTO percentiles_cubetas (metrica, cohorte, clave, total) VALUES (?, ?, ?, 1)
+        ON CONFLICT (metrica, cohorte, clave) DO UPDATE SET total = total + 1
+    ''', list(_filas(edad, flujo_caja, patrimonio_neto)))
+    cursor.execute('''
+        INSERT INTO percentiles_aportes (usuario_id, edad, flujo_caja, patrimonio_neto) VALUES (?, ?, ?, ?)
+        ON CONFLICT (usuario_id) DO UPDATE SET
+            edad = excluded.edad,
+            flujo_caja = excluded.flujo_caja,
+            patrimonio_neto = excluded.patrimonio_neto
+    ''', (usuario_id, edad, flujo_caja, patrimonio_neto))
+    return anterior
+
+
+def quitar(cursor, usuario_id):
+    """Deja de contar al usuario: resta su aporte de las cubetas y lo borra.
+
+    Devuelve el aporte quitado, o None si el usuario no tenía ninguno.
+    """
+    cursor.execute(
+        "SELECT edad, flujo_caja, patrimonio_neto FROM percentiles_aportes WHERE usuario_id = ?",
+        (usuario_id,)
+    )
+    aporte = cursor.fetchone()
+    if aporte is not None:
+        _restar(cursor, aporte)
+        cursor.execute("DELETE FROM percentiles_aportes WHERE usuario_id = ?", (usuario_id,))
+    return aporte
+
+
+def olvidar_en_memoria():
+    """Descarta los bosquejos cargados; la próxima consulta los lee de nuevo."""
+    global _bosquejos
+    with _bloqueo:
+        _bosquejos = None
+
+
+def agregar_en_memoria(edad, flujo_caja, patrimonio_neto, anterior=None):
+    """Refleja en los bosquejos ya cargados una foto que este proceso acaba de guardar.
+
+    `anterior` es lo que devolvió `registrar`: ese aporte se quita primero.
+    """
+    with _bloqueo:
+        if _bosquejos is None:
+            return
+        if anterior is not None:
+            edad_anterior, *valores_anteriores = anterior
+            for metrica, valor in zip(METRICAS, valores_anteriores):
+                for cohorte in _cohortes(edad_anterior):
+                    bosquejo = _bosquejos.get((metrica, cohorte))
+                    if bosquejo is not None and bosquejo.conteos.get(clave(valor)):
+                        bosquejo.quitar(valor)
+        for metrica, valor in zip(METRICAS, (flujo_caja, patrimonio_neto)):
+            for cohorte in _cohortes(edad):
+                _bosquejos.setdefault((metrica, cohorte), BosquejoCuantiles()).agregar(valor)
+
+
+def cargar(conn):
+    conteos = {}
+    for metrica, cohorte, k, total in conn.execute(
+        "SELECT metrica, cohorte, clave, total FROM percentiles_cubetas"
+    ):
+        conteos.setdefault((metrica, cohorte), {})[k] = total
+    return {llave: BosquejoCuantiles(c) for llave, c in conteos.items()}
+
+
+def obtener_bosquejos(conectar):
+    global _bosquejos
+    with _bloqueo:
+        if _bosquejos is None:
+            conn = conectar()
+            _bosquejos = cargar(conn)
+            conn.close()
+        return _bosquejos
+
+
+def percentiles_usuario(conectar, edad, flujo_caja, patrimonio_neto):
+    """Percentil de cada métrica frente a todos y frente a su rango de edad.
+
+    Devuelve {metrica: {cohorte: percentil}}; una cohorte con menos de
+    MINIMO_MUESTRA participantes se omite.
+    """
+    bosquejos = obtener_bosquejos(conectar)
+    resultado = {}
+    with _bloqueo:
+        for metrica, valor in zip(METRICAS, (flujo_caja, patrimonio_neto)):
+            resultado[metrica] = {}
+            for cohorte in _cohortes(edad):
+                bosquejo = bosquejos.get((metrica, cohorte))
+                if bosquejo is not None and bosquejo.total >= MINIMO_MUESTRA:
+                    resultado[metrica][cohorte] = bosquejo.percentil(valor)
+    return resultado
@@ -0,0 +1,137 @@
+"""Repite sesiones grabadas contra una o varias versiones de la app.
+
+Uso:
+
+    python -m calculadora.repeticion grabaciones/*.jsonl --app APPCALAJUSTES_V7772.py --app APPCALAJUSTES_V7780.py
+    python -m calculadora.repeticion grabaciones/ --app APPCALAJUSTES_V7780.py --salida repeticion.json
+
+Cada grabación (ver `calculadora.grabacion`) se ejecuta sin navegador con
+`AppTest`: carga de la página y luego un rerun por paso, aplicando los
+cambios de widgets grabados. Se mide cada rerun, así dos versiones se
+comparan con el tráfico real del taller y no con un guion sintético. Los
+widgets que una versión no tiene se informan como omitidos.
+
+Todo corre en una carpeta temporal (base de datos, caché y `usuarios.db`
+de las versiones antiguas) con la IA respondiendo desde `calculadora.stub_ia`.
+"""
+import argparse
+import glob
+import json
+import os
+import statistics
+import time
+
+from calculadora import carga
+
+
+def cargar_grabacion(ruta):
+    """Pasos de una grabación: [(paso, [cambio, ...]), ...] en orden."""
+    pasos = {}
+    with open(ruta, encoding="utf-8") as archivo:
+        for linea in archivo:
+            if linea.strip():
+                cambio = json.loads(linea)
+                pasos.setdefault(cambio["paso"], []).append(cambio)
+    return sorted(pasos.items())
+
+
+def _buscar(prueba, cambio):
+    elementos = getattr(prueba, cambio["tipo"])
+    if "clave" in cambio:
+        try:
+            return elementos(key=cambio["clave"])
+        except KeyError:
+            return None
+    iguales = [elemento for elemento in elementos if elemento.label == cambio["etiqueta"]]
+    return iguales[cambio["orden"]] if cambio["orden"] < len(iguales) else None
+
+
+def _aplicar(elemento, cambio):
+    if cambio["tipo"] == "button":
+        elemento.click()
+    elif cambio["tipo"] in ("text_input", "text_area"):
+        elemento.input(cambio["valor"])
+    else:
+        elemento.set_value(cambio["valor"])
+
+
+def repetir(app, pasos):
+    """Ejecuta una grabación. Devuelve (tiempos por paso, cambios omitidos)."""
+    from streamlit.testing.v1 import AppTest
+
+    prueba = AppTest.from_file(app, default_timeout=120)
+    inicio = time.perf_counter()
+    prueba.run()
+    tiempos = [("carga", time.perf_counter() - inicio)]
+    omitidos = []
+    for numero, cambios in pasos:
+        for cambio in cambios:
+            elemento = _buscar(prueba, cambio)
+            if elemento is None:
+                omitidos.append({"paso": numero, **cambio})
+                continue
+            _aplicar(elemento, cambio)
+        inicio = time.perf_counter()
+        prueba.run()
+        tiempos.append((f"paso {numero}", time.perf_counter() - inicio))
+        if prueba.exception:
+            raise RuntimeError(f"{os.path.basename(app)}, paso {numero}: {prueba.exception[0].message}")
+    return tiempos, omitidos
+
+
+def _rutas(entradas):
+    rutas = []
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            rutas.extend(sorted(glob.glob(os.path.join(entrada, "*.jsonl"))))
+        else:
+            rutas.append(entrada)
+    return rutas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Repite sesiones grabadas y mide cada paso")
+    parser.add_argument("grabaciones", nargs="+", help="Archivos .jsonl o carpetas de grabaciones")
+    parser.add_argument("--app", action="append", required=True, help="Versión de la app (se puede repetir)")
+    parser.add_argument("--latencia-ia", type=float, default=0.0, help="Segundos de respuesta del stub de IA")
+    parser.add_argument("--salida", help="Archivo JSON con los tiempos de cada paso")
+    args = parser.parse_args()
+
+    # Rutas absolutas antes del chdir: las relativas son de la carpeta actual
+    rutas = [os.path.abspath(ruta) for ruta in _rutas(args.grabaciones)]
+    apps = [os.path.abspath(app) for app in args.app]
+    salida = os.path.abspath(args.salida) if args.salida else None
+    servidor = carga.preparar_entorno(args.latencia_ia)
+    # Las versiones antiguas abren `usuarios.db` en la carpeta actual
+    os.chdir(os.path.dirname(carga.base_datos.DB_PATH))
+
+    resultado = {}
+    for app in apps:
+        nombre = os.path.basename(app)
+        resultado[nombre] = {}
+        for ruta in rutas:
+            tiempos, omitidos = repetir(app, cargar_grabacion(ruta))
+            resultado[nombre][os.path.basename(ruta)] = {"pasos": tiempos, "omitidos": omitidos}
+    servidor.shutdown()
+
+    for ruta in rutas:
+        grabacion = os.path.basename(ruta)
+        print(f"\n{grabacion}")
+        columnas = [resultado[os.path.basename(app)][grabacion] for app in apps]
+        print(f"{'paso':12}" + "".join(f"{os.path.basename(app):>26}" for app in apps))
+        for i, (paso, _) in enumerate(columnas[0]["pasos"]):
+            fila = "".join(
+                f"{columna['pasos'][i][1] * 1000:23.1f} ms" if i < len(columna["pasos"]) else f"{'-':>26}"
+                for columna in columnas
+            )
+            print(f"{paso:12}{fila}")
+        totales = "".join(f"{sum(s for _, s in columna['pasos']) * 1000:23.1f} ms" for columna in columnas)
+        medianas = "".join(f"{statistics.median(s for _, s in columna['pasos']) * 1000:23.1f} ms" for columna in columnas)
+        print(f"{'total':12}{totales}\n{'mediana':12}{medianas}")
+        for app, columna in zip(apps, columnas):
+            if columna["omitidos"]:
+                print(f"{os.path.basename(app)}: {len(columna['omitidos'])} cambios sin widget equivalente")
+
+    if salida:
+        with open(salida, "w", encoding="utf-8") as archivo:
+            json.dump(resultado, archivo, indent=2, ensure_ascii=False)
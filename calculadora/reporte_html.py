@@ -0,0 +1,142 @@
+"""Reporte HTML liviano: la alternativa rápida al PDF para leer en el celular.
+
+Se arma con el mismo `reporte_data` que el PDF, pero sin fuentes, imágenes
+ni compresión: una plantilla compilada al importar el módulo más unas pocas
+secciones de texto escapado. El resultado es una página autocontenida
+(estilos incluidos) que se ve bien en pantallas pequeñas y trae reglas
+`@media print` para imprimirla o guardarla como PDF desde el navegador.
+"""
+import html
+import textwrap
+from string import Template
+
+from calculadora.moneda import format_currency_serie
+
+# Cambiar al modificar la plantilla para invalidar los reportes en caché
+VERSION_HTML = "2"
+
+ESTILOS = (
+    ":root{--azul:#1E3A8A;--gris:#6B7280;--verde:#10B981;--rojo:#EF4444}"
+    "*{box-sizing:border-box}"
+    "body{margin:0;background:#F9FAFB;color:#111827;font:16px/1.5 system-ui,-apple-system,'Segoe UI',Roboto,Arial,sans-serif}"
+    "main{max-width:760px;margin:auto;padding:16px}"
+    "h1{color:var(--azul);font-size:1.4em;margin:.2em 0}"
+    "h2{color:var(--azul);font-size:1.1em;border-bottom:2px solid var(--azul);padding-bottom:4px;margin-top:1.6em}"
+    ".sub{color:var(--gris);margin:0}"
+    ".tarjetas{display:grid;grid-template-columns:repeat(auto-fit,minmax(160px,1fr));gap:8px}"
+    ".tarjeta{background:#fff;border-radius:8px;padding:10px;box-shadow:0 1px 3px rgba(0,0,0,.1)}"
+    ".tarjeta small{color:var(--gris);display:block}"
+    ".tarjeta b{font-size:1.1em}"
+    ".pos{color:var(--verde)}.neg{color:var(--rojo)}"
+    ".texto{white-space:pre-line}"
+    "table{width:100%;border-collapse:collapse}"
+    "td{padding:4px 0;border-bottom:1px solid #E5E7EB}"
+    "td.valor{text-align:right;white-space:nowrap}"
+    ".barra{height:6px;border-radius:3px;background:var(--verde)}.barra.neg{background:var(--rojo)}"
+    ".imprimir{margin-top:24px;padding:10px 16px;border:0;border-radius:6px;background:var(--azul);color:#fff;font-size:1em}"
+    "@media print{body{background:#fff;font-size:11pt}main{max-width:none;padding:0}"
+    ".tarjeta{box-shadow:none;border:1px solid #D1D5DB}.imprimir{display:none}"
+    "h2{break-after:avoid}section{break-inside:avoid}@page{margin:15mm}}"
+)
+
+PLANTILLA = Template(
+    '<!DOCTYPE html><html lang="es"><head><meta charset="utf-8">'
+    '<meta name="viewport" content="width=device-width,initial-scale=1">'
+    '<title>Informe Financiero - $nombre</title><style>$estilos</style></head><body><main>'
+    '<h1>Informe Financiero - Taller de Bienes Raíces</h1>'
+    '<p class="sub">Análisis de Inversión en Bienes Raíces</p>'
+    '$secciones'
+    '<button class="imprimir" onclick="window.print()">Imprimir o guardar como PDF</button>'
+    '</main></body></html>'
+)
+
+
+def _texto(valor):
+    return html.escape(textwrap.dedent(str(valor)).strip())
+
+
+def _seccion(titulo, contenido):
+    return f'<section><h2>{html.escape(titulo)}</h2>{contenido}</section>'
+
+
+def _tarjeta(etiqueta, valor, signo=0):
+    clase = ' class="pos"' if signo > 0 else ' class="neg"' if signo < 0 else ""
+    return f'<div class="tarjeta"><small>{etiqueta}</small><b{clase}>{html.escape(valor)}</b></div>'
+
+
+def _datos_personales(usuario):
+    filas = "".join(
+        f'<tr><td>{etiqueta}</td><td class="valor">{html.escape(str(usuario.get(campo) or ""))}</td></tr>'
+        for etiqueta, campo in (("Nombre", "nombre"), ("Edad", "edad"), ("Email", "email"))
+    )
+    return _seccion("Datos Personales", f"<table>{filas}</table>")
+
+
+def _situacion(finanzas):
+    ingresos = finanzas.get('ingresos', 0)
+    gastos = finanzas.get('gastos', 0)
+    activos = finanzas.get('activos', 0)
+    pasivos = finanzas.get('pasivos', 0)
+    flujo_caja = ingresos - gastos
+    patrimonio = activos - pasivos
+    montos = format_currency_serie([ingresos, gastos, flujo_caja, activos, pasivos, patrimonio])
+    tarjetas = "".join((
+        _tarjeta("Ingresos mensuales", montos[0]),
+        _tarjeta("Gastos mensuales", montos[1]),
+        _tarjeta("Flujo de caja", montos[2], flujo_caja),
+        _tarjeta("Activos totales", montos[3]),
+        _tarjeta("Pasivos totales", montos[4]),
+        _tarjeta("Patrimonio neto", montos[5], patrimonio),
+    ))
+    return _seccion("Situación Financiera", f'<div class="tarjetas">{tarjetas}</div>')
+
+
+def _balance(detalle):
+    # Barras en CSS proporcionales al mayor concepto; sin imágenes
+    detalle = {nombre: valor for nombre, valor in detalle.items() if valor}
+    if not detalle:
+        return ""
+    mayor = max(abs(valor) for valor in detalle.values())
+    montos = format_currency_serie(list(detalle.values()))
+    filas = "".join(
+        f'<tr><td>{html.escape(nombre)}<div class="barra{" neg" if valor < 0 else ""}" '
+        f'style="width:{100 * abs(valor) / mayor:.0f}%"></div></td>'
+        f'<td class="valor">{html.escape(monto)}</td></tr>'
+        for (nombre, valor), monto in zip(detalle.items(), montos)
+    )
+    return _seccion("Activos y Pasivos", f"<table>{filas}</table>")
+
+
+def construir_secciones(reporte_data):
+    usuario = reporte_data.get('usuario', {})
+    finanzas = reporte_data.get('finanzas', {})
+    analisis = reporte_data.get('analisis', {})
+    partes = [_datos_personales(usuario), _situacion(finanzas), _balance(finanzas.get('detalle_balance', {}))]
+    if 'perfil_inversion' in analisis:
+        perfil = analisis['perfil_inversion']
+        partes.append(_seccion(
+            f"Perfil de Inversión: {perfil['nivel']}",
+            f'<p class="texto">{_texto(perfil["descripcion"])}</p>'
+        ))
+    if analisis.get('resumen'):
+        partes.append(_seccion("Análisis y Recomendaciones", f'<p class="texto">{_texto(analisis["resumen"])}</p>'))
+    for clave, titulo in (
+        ('plan_trabajo', "Plan de Trabajo Personalizado"),
+        ('analisis_ia', "Estrategia de Inversión"),
+    ):
+        if analisis.get(clave):
+            partes.append(_seccion(titulo, f'<p class="texto">{_texto(analisis[clave])}</p>'))
+    if analisis.get('proyeccion_retiro'):
+        partes.append(_seccion(
+            "Plan de Retiro", f'<p class="texto">{_texto(analisis["proyeccion_retiro"]["analisis"])}</p>'
+        ))
+    return "".join(partes)
+
+
+def generar_html(reporte_data):
+    """Página HTML completa del reporte, como texto."""
+    return PLANTILLA.substitute(
+        nombre=html.escape(str(reporte_data.get('usuario', {}).get('nombre') or "")),
+        estilos=ESTILOS,
+        secciones=construir_secciones(reporte_data),
+    )
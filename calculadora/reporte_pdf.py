@@ -0,0 +1,294 @@
+"""Reporte PDF del análisis financiero.
+
+El texto usa DejaVu Sans (TTF Unicode que trae matplotlib) en lugar de la
+Arial core de fpdf, que solo cubre latin-1. Para que incrustarla sea barato:
+
+- la TTF se recorta una vez a los bloques Unicode que puede usar un reporte
+  (latín, puntuación, monedas, flechas, símbolos) y se guarda en disco;
+- cada proceso analiza esa fuente una sola vez (métricas, cmap, anchos) y
+  cada documento recibe una copia con su propio mapa de glifos usados;
+- al escribir, fpdf recorta la fuente a esos glifos. El recorte parte de
+  una fuente con exactamente ese juego de glifos, compilada una vez por
+  juego y guardada en caché: los reportes de un mismo grupo repiten casi
+  siempre los mismos caracteres y no recorren la TTF completa cada vez.
+
+Las TTF recortadas van en `fuentes/`, junto a la carpeta de la caché de
+reportes y no dentro: esa caché borra por antigüedad y tamaño lo que
+encuentra en su carpeta.
+
+Los caracteres que ninguna fuente cubre (los emojis del resumen, salvo que
+`CALCULADORA_FUENTE_EMOJI` apunte a una fuente que los tenga) se omiten del
+PDF; cada carácter omitido se registra una vez por proceso en el log.
+"""
+import copy
+import logging
+import os
+import threading
+from io import BytesIO
+
+import matplotlib
+from fontTools import subset, ttLib
+from fpdf import FPDF
+from fpdf.fonts import SubsetMap
+
+from calculadora.cache import CacheContenido, huella
+from calculadora.graficos import grafico_activos_pasivos, grafico_flujo_caja, grafico_proyeccion_retiro
+from calculadora.moneda import MemoMontos, format_currency_serie
+from calculadora.reportes import directorio_cache
+
+FUENTE = "DejaVu"
+DIRECTORIO_FUENTES = os.environ.get(
+    'CALCULADORA_FUENTES_DIR', os.path.join(matplotlib.get_data_path(), "fonts", "ttf")
+)
+ARCHIVOS_FUENTE = {"": "DejaVuSans.ttf", "B": "DejaVuSans-Bold.ttf"}
+
+# Fuente opcional para emojis; si no existe, los caracteres sin glifo se omiten
+FUENTE_EMOJI = os.environ.get('CALCULADORA_FUENTE_EMOJI', "")
+
+RANGOS_UNICODE = (
+    (0x0020, 0x024F),  # Latín básico, Latin-1 y extendidos A y B
+    (0x2000, 0x206F),  # Puntuación general
+    (0x20A0, 0x20CF),  # Símbolos de moneda
+    (0x2100, 0x22FF),  # Letras, flechas y operadores matemáticos
+    (0x25A0, 0x27BF),  # Figuras geométricas, símbolos y dingbats
+)
+
+# Título y subtítulo del reporte; cada variante de la app puede pasar el suyo
+ENCABEZADO = ("Informe Financiero - Taller de Bienes Raíces", "Análisis de Inversión en Bienes Raíces")
+
+# Secciones de texto opcionales, en el orden en que aparecen después del plan de trabajo
+SECCIONES_TEXTO = (
+    ('recomendaciones_cursos', "Recomendaciones de Educación Financiera:"),
+    ('perfil_inversionista', "Perfil de Inversionista:"),
+    ('cursos_recomendados', "Cursos Recomendados:"),
+)
+
+_log = logging.getLogger(__name__)
+
+_fuentes = {}
+_recortadas = set()
+_caracteres = None
+_omitidos = set()
+_bloqueo_fuentes = threading.Lock()
+_reducidas = CacheContenido(max_bytes_memoria=8 * 1024 * 1024)
+# Textos de montos ya formateados, compartidos por los PDF de un mismo proceso (p. ej. un lote)
+_montos = MemoMontos(maximo=10_000)
+
+
+def directorio_recortes():
+    """Carpeta de las TTF recortadas: `fuentes/` al lado de la caché de reportes."""
+    return os.path.join(os.path.dirname(os.path.abspath(directorio_cache())), "fuentes")
+
+
+def _ruta_recortada(ruta):
+    """Copia de la TTF con solo RANGOS_UNICODE; se genera una vez por máquina."""
+    nombre = os.path.splitext(os.path.basename(ruta))[0]
+    version = huella(ruta, os.path.getmtime(ruta), RANGOS_UNICODE)[:12]
+    directorio = directorio_recortes()
+    destino = os.path.join(directorio, f"fuente-{nombre}-{version}.ttf")
+    if not os.path.exists(destino):
+        os.makedirs(directorio, exist_ok=True)
+        opciones = subset.Options(glyph_names=True, name_IDs=["*"], notdef_outline=True)
+        opciones.drop_tables += ["FFTM"]
+        recorte = subset.Subsetter(opciones)
+        recorte.populate(unicodes=[c for desde, hasta in RANGOS_UNICODE for c in range(desde, hasta + 1)])
+        fuente = ttLib.TTFont(ruta)
+        recorte.subset(fuente)
+        temporal = f"{destino}.{os.getpid()}.tmp"
+        fuente.save(temporal)
+        os.replace(temporal, destino)
+    _recortadas.add(destino)
+    return destino
+
+
+def _fuente_base(familia, estilo, ruta):
+    # Fuente ya analizada; nunca se usa para escribir un documento
+    llave = f"{familia.lower()}{estilo}"
+    with _bloqueo_fuentes:
+        if llave not in _fuentes:
+            plantilla = FPDF()
+            plantilla.add_font(familia, estilo, ruta)
+            _fuentes[llave] = plantilla.fonts[llave]
+        return _fuentes[llave]
+
+
+def _fuentes_documento():
+    fuentes = [
+        (FUENTE, estilo, _ruta_recortada(os.path.join(DIRECTORIO_FUENTES, archivo)))
+        for estilo, archivo in ARCHIVOS_FUENTE.items()
+    ]
+    if FUENTE_EMOJI and os.path.exists(FUENTE_EMOJI):
+        fuentes.append(("Emoji", "", FUENTE_EMOJI))
+    return fuentes
+
+
+def _agregar_fuente(pdf, familia, estilo, ruta):
+    # Métricas, cmap y anchos se comparten con la fuente base (solo lectura).
+    # Al escribir, fpdf recorta `ttfont` en sitio, así que cada documento
+    # abre el suyo en `ReportePDF.output` y lleva su propio mapa de glifos.
+    fuente = copy.copy(_fuente_base(familia, estilo, ruta))
+    fuente.ttfont = None
+    fuente.subset = SubsetMap(fuente)
+    fuente.missing_glyphs = []
+    fuente.biggest_size_pt = 0
+    fuente.i = len(pdf.fonts) + 1
+    pdf.fonts[f"{familia.lower()}{estilo}"] = fuente
+
+
+def _compilar_reducida(ruta, glifos):
+    opciones = subset.Options(glyph_names=True, notdef_outline=True, recommended_glyphs=True)
+    opciones.drop_tables += ["FFTM", "GDEF", "GPOS", "GSUB"]
+    recorte = subset.Subsetter(opciones)
+    recorte.populate(glyphs=sorted(glifos))
+    fuente = ttLib.TTFont(ruta, recalcTimestamp=False)
+    recorte.subset(fuente)
+    salida = BytesIO()
+    fuente.save(salida)
+    return salida.getvalue()
+
+
+def _abrir_fuente(fuente):
+    ruta = str(fuente.ttffile)
+    if ruta not in _recortadas:
+        return ttLib.TTFont(ruta, recalcTimestamp=False, fontNumber=0, lazy=True)
+    usados = sorted(set(fuente.subset.get_all_glyph_names()))
+    clave = huella(ruta, usados)
+    datos = _reducidas.obtener_o_generar(clave, lambda: _compilar_reducida(ruta, usados))
+    return ttLib.TTFont(BytesIO(datos), recalcTimestamp=False, lazy=True)
+
+
+def _caracteres_disponibles():
+    global _caracteres
+    if _caracteres is None:
+        caracteres = set()
+        for familia, estilo, ruta in _fuentes_documento():
+            caracteres |= set(_fuente_base(familia, estilo, ruta).cmap)
+        _caracteres = frozenset(caracteres)
+    return _caracteres
+
+
+class ReportePDF(FPDF):
+    def __init__(self):
+        super().__init__()
+        fuentes = _fuentes_documento()
+        for familia, estilo, ruta in fuentes:
+            _agregar_fuente(self, familia, estilo, ruta)
+        respaldo = [familia for familia, _, _ in fuentes if familia != FUENTE]
+        if respaldo:
+            self.set_fallback_fonts(respaldo)
+
+    def normalize_text(self, text):
+        # Omite lo que ninguna fuente puede dibujar (p. ej. emojis del resumen)
+        disponibles = _caracteres_disponibles()
+        texto = "".join(c for c in text if ord(c) in disponibles or c in "\n\r\t")
+        if len(texto) != len(text):
+            nuevos = {c for c in text if ord(c) not in disponibles and c not in "\n\r\t"} - _omitidos
+            if nuevos:
+                _omitidos.update(nuevos)
+                _log.warning("Caracteres sin glifo omitidos del PDF: %s", " ".join(sorted(nuevos)))
+        return super().normalize_text(texto)
+
+    def output(self, *args, **kwargs):
+        for fuente in self.fonts.values():
+            if getattr(fuente, "ttfont", False) is None:
+                fuente.ttfont = _abrir_fuente(fuente)
+        return super().output(*args, **kwargs)
+
+
+def construir_pdf(usuario_data, finanzas_data, analisis_data, encabezado=ENCABEZADO):
+    titulo, subtitulo = encabezado
+    pdf = ReportePDF()
+    pdf.add_page()
+    pdf.set_font(FUENTE, size=12)
+    
+    # Encabezado
+    pdf.set_font(FUENTE, 'B', 16)
+    pdf.cell(200, 10, txt=titulo, ln=1, align='C')
+    pdf.set_font(FUENTE, 'B', 14)
+    pdf.cell(200, 10, txt=subtitulo, ln=1, align='C')
+    pdf.ln(10)
+    
+    # Datos personales
+    pdf.set_font(FUENTE, 'B', 12)
+    pdf.cell(200, 10, txt="Datos Personales:", ln=1)
+    pdf.set_font(FUENTE, size=12)
+    pdf.cell(200, 10, txt=f"Nombre: {usuario_data.get('nombre', '')}", ln=1)
+    pdf.cell(200, 10, txt=f"Edad: {usuario_data.get('edad', '')}", ln=1)
+    pdf.cell(200, 10, txt=f"Email: {usuario_data.get('email', '')}", ln=1)
+    pdf.ln(5)
+    
+    # Datos financieros
+    pdf.set_font(FUENTE, 'B', 12)
+    pdf.cell(200, 10, txt="Situación Financiera:", ln=1)
+    pdf.set_font(FUENTE, size=12)
+    montos = format_currency_serie(
+        [finanzas_data.get(campo, 0) for campo in ('ingresos', 'gastos', 'activos', 'pasivos')],
+        memo=_montos
+    )
+    for etiqueta, monto in zip(("Ingresos Mensuales", "Gastos Mensuales", "Activos Totales", "Pasivos Totales"), montos):
+        pdf.cell(200, 10, txt=f"{etiqueta}: {monto}", ln=1)
+    pdf.ln(5)
+    
+    # Gráficos (PNG en memoria, en caché por sus datos)
+    graficos = [
+        grafico_activos_pasivos(finanzas_data.get('detalle_balance', {})),
+        grafico_flujo_caja(finanzas_data.get('ingresos', 0), finanzas_data.get('gastos', 0)),
+        grafico_proyeccion_retiro(analisis_data.get('proyeccion_retiro')),
+    ]
+    for png in graficos:
+        if png:
+            pdf.image(BytesIO(png), w=170)
+            pdf.ln(5)
+    
+    # Perfil de inversión
+    if 'perfil_inversion' in analisis_data:
+        pdf.set_font(FUENTE, 'B', 12)
+        pdf.cell(200, 10, txt=f"Perfil de Inversión en Bienes Raíces: {analisis_data['perfil_inversion']['nivel']}", ln=1)
+        pdf.set_font(FUENTE, size=12)
+        pdf.multi_cell(0, 10, txt=analisis_data['perfil_inversion']['descripcion'])
+        pdf.ln(5)
+    
+    # Análisis
+    pdf.set_font(FUENTE, 'B', 12)
+    pdf.cell(200, 10, txt="Análisis y Recomendaciones:", ln=1)
+    pdf.set_font(FUENTE, size=12)
+    pdf.multi_cell(0, 10, txt=analisis_data.get('resumen', ''))
+    pdf.ln(5)
+    
+    # Plan de trabajo
+    if 'plan_trabajo' in analisis_data:
+        pdf.set_font(FUENTE, 'B', 12)
+        pdf.cell(200, 10, txt="Plan de Trabajo Personalizado:", ln=1)
+        pdf.set_font(FUENTE, size=12)
+        pdf.multi_cell(0, 10, txt=analisis_data['plan_trabajo'])
+    
+    for clave, titulo_seccion in SECCIONES_TEXTO:
+        if analisis_data.get(clave):
+            pdf.ln(5)
+            pdf.set_font(FUENTE, 'B', 12)
+            pdf.cell(200, 10, txt=titulo_seccion, ln=1)
+            pdf.set_font(FUENTE, size=12)
+            pdf.multi_cell(0, 10, txt=analisis_data[clave])
+    
+    return pdf
+
+
+def generar_pdf(usuario_data, finanzas_data, analisis_data, encabezado=ENCABEZADO):
+    pdf = construir_pdf(usuario_data, finanzas_data, analisis_data, encabezado)
+    
+    # Generar el PDF en memoria
+    pdf_output = BytesIO()
+    pdf.output(pdf_output)
+    pdf_bytes = pdf_output.getvalue()
+    pdf_output.close()
+    
+    return pdf_bytes
+
+
+def precargar():
+    """Deja cargadas en el proceso las fuentes y el diseño del reporte.
+
+    Pensado como inicializador de los procesos de `calculadora.lote_pdf`.
+    """
+    _caracteres_disponibles()
+    generar_pdf({}, {'ingresos': 1, 'gastos': 1}, {})
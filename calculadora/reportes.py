@@ -0,0 +1,65 @@
+"""Reportes PDF y HTML en caché, compartidos por todas las variantes de la app.
+
+La caché es una sola por proceso y se persiste en disco: una sesión, otra
+variante servida por el mismo proceso o un enlace compartido que se vuelve
+a abrir reciben los bytes ya renderizados si los datos no cambiaron.
+
+Los reportes llevan datos personales, así que la carpeta por defecto es
+privada y está fuera del proyecto: `calculadora/reportes` dentro de la caché
+del usuario (`%LOCALAPPDATA%` en Windows, `$XDG_CACHE_HOME` o `~/.cache` en
+el resto), con permisos 0700.
+
+    CALCULADORA_CACHE_DIR   otra carpeta para la caché (también queda en 0700)
+    CALCULADORA_CACHE_TTL   segundos sin uso antes de borrar un reporte (7 días)
+"""
+import os
+import threading
+
+from calculadora.cache import CacheContenido, huella
+from calculadora.reporte_html import VERSION_HTML, generar_html
+
+# Cambiar al modificar el diseño del PDF para invalidar los reportes en caché
+VERSION_REPORTE = "5"
+
+# Segundos sin uso tras los cuales un reporte renderizado sale de la caché
+TTL_CACHE_REPORTES = int(os.environ.get('CALCULADORA_CACHE_TTL', 7 * 24 * 3600))
+
+_cache = None
+_bloqueo = threading.Lock()
+
+
+def directorio_cache():
+    """Carpeta de la caché de reportes: `CALCULADORA_CACHE_DIR` o la caché privada del usuario."""
+    if os.environ.get('CALCULADORA_CACHE_DIR'):
+        return os.environ['CALCULADORA_CACHE_DIR']
+    base = (os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_CACHE_HOME')
+            or os.path.join(os.path.expanduser("~"), ".cache"))
+    return os.path.join(base, "calculadora", "reportes")
+
+
+def cache_reportes():
+    global _cache
+    with _bloqueo:
+        if _cache is None:
+            _cache = CacheContenido(
+                directorio=directorio_cache(),
+                ttl_segundos=TTL_CACHE_REPORTES
+            )
+        return _cache
+
+
+def generar_pdf_cacheado(reporte_data, encabezado=None):
+    # fpdf y matplotlib se importan aquí, no al cargar la app (ver calculadora/arranque.py)
+    from calculadora.reporte_pdf import ENCABEZADO, generar_pdf
+
+    encabezado = tuple(encabezado or ENCABEZADO)
+    clave = huella(VERSION_REPORTE, encabezado, reporte_data['usuario'], reporte_data['finanzas'], reporte_data['analisis'])
+    return cache_reportes().obtener_o_generar(
+        clave,
+        lambda: generar_pdf(reporte_data['usuario'], reporte_data['finanzas'], reporte_data['analisis'], encabezado)
+    )
+
+
+def generar_html_cacheado(reporte_data):
+    clave = huella("html", VERSION_HTML, reporte_data['usuario'], reporte_data['finanzas'], reporte_data['analisis'])
+    return cache_reportes().obtener_o_generar(clave, lambda: generar_html(reporte_data).encode("utf-8"))
@@ -0,0 +1,245 @@
+"""Memoria por sesión y descarga a disco del estado pesado de sesiones inactivas.
+
+Cada run llama a `comenzar_run()`, que registra la sesión y su último uso.
+Un hilo de fondo revisa las sesiones cada `INTERVALO_REVISION` segundos:
+
+- Mide cuánta memoria ocupa el `session_state` de cada una (tamaño profundo
+  de los valores) y escribe una foto del proceso en
+  `<CALCULADORA_SESIONES_DIR>/proceso-<pid>.json`, que lee el panel de
+  administración (`admin_leads.py`).
+- A las sesiones sin uso durante `INACTIVIDAD_SEGUNDOS` les pasa a disco los
+  campos pesados y reconstruibles de `CAMPOS_PESADOS` (textos de la IA y
+  proyección de retiro). Vuelven a memoria al comienzo del siguiente run de
+  esa sesión, antes de que el script los lea, o con `rehidratar()` cuando
+  los lee código que corre fuera de un run (las descargas diferidas).
+
+Si un campo descargado ya no está en disco (la carpeta tiene un límite de
+tamaño), queda ausente y basta con volver a pulsar el botón que lo genera.
+"""
+import hashlib
+import json
+import os
+import pickle
+import sys
+import threading
+import time
+
+from calculadora.cache import CacheContenido
+
+DIRECTORIO = os.environ.get('CALCULADORA_SESIONES_DIR', 'sesiones')
+INACTIVIDAD_SEGUNDOS = int(os.environ.get('CALCULADORA_SESIONES_INACTIVIDAD', 15 * 60))
+INTERVALO_REVISION = 30
+
+# Rutas dentro de `st.session_state`; el último elemento es el campo a descargar
+CAMPOS_PESADOS = (
+    ("reporte_data", "analisis", "plan_trabajo"),
+    ("reporte_data", "analisis", "analisis_ia"),
+    ("reporte_data", "analisis", "proyeccion_retiro"),
+)
+
+_sesiones = {}
+_bloqueo = threading.Lock()
+_vigilante = None
+_almacen = None
+
+
+class _Sesion:
+    def __init__(self):
+        self.estado = None
+        self.ultimo_uso = time.time()
+        self.descargados = {}
+        self.bytes_descargados = 0
+        self.bloqueo = threading.Lock()
+
+
+def rss_bytes():
+    """Memoria residente actual del proceso."""
+    try:
+        with open("/proc/self/statm") as archivo:
+            return int(archivo.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # Sin /proc solo está el máximo del proceso (KB en Linux, bytes en macOS)
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def tamano_profundo(objeto, vistos=None):
+    """Bytes de un objeto y de todo lo que contiene (cada objeto se cuenta una vez)."""
+    vistos = set() if vistos is None else vistos
+    if id(objeto) in vistos:
+        return 0
+    vistos.add(id(objeto))
+    tamano = sys.getsizeof(objeto)
+    if isinstance(objeto, dict):
+        tamano += sum(tamano_profundo(k, vistos) + tamano_profundo(v, vistos) for k, v in list(objeto.items()))
+    elif isinstance(objeto, (list, tuple, set, frozenset)):
+        tamano += sum(tamano_profundo(elemento, vistos) for elemento in list(objeto))
+    elif hasattr(objeto, "__dict__"):
+        tamano += tamano_profundo(vars(objeto), vistos)
+    return tamano
+
+
+def _almacen_disco():
+    global _almacen
+    with _bloqueo:
+        if _almacen is None:
+            # Sin memoria propia: lo que se descarga es justo para sacarlo de la RAM
+            _almacen = CacheContenido(max_bytes_memoria=0, directorio=os.path.join(DIRECTORIO, "estado"))
+        return _almacen
+
+
+def _contenedor(estado, ruta):
+    try:
+        actual = estado[ruta[0]]
+    except KeyError:
+        return None
+    for llave in ruta[1:]:
+        actual = actual.get(llave) if isinstance(actual, dict) else None
+    return actual if isinstance(actual, dict) else None
+
+
+def _descargar(sesion):
+    for ruta in CAMPOS_PESADOS:
+        contenedor = _contenedor(sesion.estado, ruta[:-1])
+        if contenedor is None or ruta[-1] not in contenedor:
+            continue
+        valor = contenedor[ruta[-1]]
+        datos = pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL)
+        clave = hashlib.sha256(datos).hexdigest()
+        _almacen_disco().guardar(clave, datos)
+        sesion.descargados[ruta] = clave
+        sesion.bytes_descargados += len(datos)
+        del contenedor[ruta[-1]]
+
+
+def _rehidratar(sesion):
+    for ruta, clave in sesion.descargados.items():
+        contenedor = _contenedor(sesion.estado, ruta[:-1])
+        datos = _almacen_disco().obtener(clave)
+        if contenedor is not None and datos is not None and ruta[-1] not in contenedor:
+            contenedor[ruta[-1]] = pickle.loads(datos)
+    sesion.descargados = {}
+    sesion.bytes_descargados = 0
+
+
+def _medir(sesion_id, sesion, ahora):
+    try:
+        valores = sesion.estado.filtered_state
+        tamanos = {llave: tamano_profundo(valor) for llave, valor in valores.items()}
+    except RuntimeError:
+        # El script de esa sesión cambió un diccionario mientras se recorría
+        return None
+    mayores = sorted(tamanos.items(), key=lambda par: par[1], reverse=True)[:3]
+    # Conteo que lleva calculadora/estado.py: cada rerun de un fragmento es un rerun completo evitado
+    reruns = valores.get('_reruns') or {}
+    return {
+        "sesion": sesion_id[:8],
+        "inactiva_s": round(ahora - sesion.ultimo_uso),
+        "bytes": sum(tamanos.values()),
+        "bytes_en_disco": sesion.bytes_descargados,
+        "mayores": [{"clave": llave, "bytes": tamano} for llave, tamano in mayores],
+        "reruns_completos": reruns.get("completos", 0),
+        "reruns_evitados": sum(reruns.get("fragmentos", {}).values()),
+    }
+
+
+def _sesion_activa(sesion_id):
+    from streamlit.runtime import Runtime
+
+    return not Runtime.exists() or Runtime.instance().is_active_session(sesion_id)
+
+
+def revisar(ahora=None):
+    """Descarga las sesiones inactivas, olvida las cerradas y escribe la foto del proceso."""
+    ahora = time.time() if ahora is None else ahora
+    with _bloqueo:
+        sesiones = list(_sesiones.items())
+    filas = []
+    for sesion_id, sesion in sesiones:
+        if not _sesion_activa(sesion_id):
+            with _bloqueo:
+                _sesiones.pop(sesion_id, None)
+            continue
+        with sesion.bloqueo:
+            if sesion.estado is None:
+                continue
+            if ahora - sesion.ultimo_uso > INACTIVIDAD_SEGUNDOS:
+                _descargar(sesion)
+            fila = _medir(sesion_id, sesion, ahora)
+        if fila is not None:
+            filas.append(fila)
+
+    foto = {
+        "pid": os.getpid(),
+        "app": os.path.basename(sys.argv[0]),
+        "actualizado": ahora,
+        "rss_bytes": rss_bytes(),
+        "sesiones": sorted(filas, key=lambda fila: fila["bytes"], reverse=True),
+    }
+    os.makedirs(DIRECTORIO, exist_ok=True)
+    ruta = os.path.join(DIRECTORIO, f"proceso-{os.getpid()}.json")
+    with open(f"{ruta}.tmp", "w", encoding="utf-8") as archivo:
+        json.dump(foto, archivo, ensure_ascii=False)
+    os.replace(f"{ruta}.tmp", ruta)
+    return foto
+
+
+def _vigilar():
+    while True:
+        time.sleep(INTERVALO_REVISION)
+        try:
+            revisar()
+        except Exception as e:
+            print(f"Error al revisar sesiones: {e}", file=sys.stderr)
+
+
+def comenzar_run():
+    """Llamar al inicio de cada run del script, antes de leer `st.session_state`."""
+    global _vigilante
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return
+    with _bloqueo:
+        sesion = _sesiones.setdefault(ctx.session_id, _Sesion())
+        if _vigilante is None:
+            _vigilante = threading.Thread(target=_vigilar, name="calculadora-sesiones", daemon=True)
+            _vigilante.start()
+    with sesion.bloqueo:
+        sesion.estado = ctx.session_state
+        sesion.ultimo_uso = time.time()
+        if sesion.descargados:
+            _rehidratar(sesion)
+
+
+def rehidratar(sesion_id):
+    """Devuelve a memoria lo descargado de una sesión y la marca como en uso.
+
+    Para código que lee `st.session_state` fuera de un run, donde
+    `comenzar_run` no pasa: p. ej. los `data` diferidos de los botones de
+    descarga, que Streamlit llama al hacer clic.
+    """
+    with _bloqueo:
+        sesion = _sesiones.get(sesion_id)
+    if sesion is None:
+        return
+    with sesion.bloqueo:
+        sesion.ultimo_uso = time.time()
+        if sesion.descargados and sesion.estado is not None:
+            _rehidratar(sesion)
+
+
+def leer_fotos(max_antiguedad=5 * INTERVALO_REVISION):
+    """Fotos recientes de todos los procesos de la app, para el panel de administración."""
+    fotos = []
+    if not os.path.isdir(DIRECTORIO):
+        return fotos
+    for entrada in os.scandir(DIRECTORIO):
+        if not (entrada.name.startswith("proceso-") and entrada.name.endswith(".json")):
+            continue
+        if time.time() - entrada.stat().st_mtime > max_antiguedad:
+            continue
+        with open(entrada.path, encoding="utf-8") as archivo:
+            fotos.append(json.load(archivo))
+    return fotos
@@ -0,0 +1,74 @@
+"""Servidor local que imita la API de chat de OpenAI para pruebas de carga.
+
+Uso:
+
+    python -m calculadora.stub_ia --puerto 8765 --latencia 1.5
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 streamlit run APPCALAJUSTES_V7780.py
+
+Responde `POST /v1/chat/completions` con un plan de texto fijo tras
+`latencia` segundos, sin red ni costo. El cliente de OpenAI de la app lo usa
+automáticamente cuando `OPENAI_BASE_URL` apunta aquí.
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RESPUESTA = """Plan de trabajo (respuesta de prueba):
+1. Construye un fondo de emergencia de seis meses de gastos.
+2. Reduce las deudas de consumo antes de comprometer capital.
+3. Estudia el mercado de arriendos de tu ciudad durante 90 días.
+4. Evalúa una primera propiedad pequeña o una co-inversión.
+5. Revisa este plan cada trimestre."""
+
+
+class _Manejador(BaseHTTPRequestHandler):
+    latencia = 0.0
+
+    def do_POST(self):
+        longitud = int(self.headers.get("Content-Length", 0))
+        pedido = json.loads(self.rfile.read(longitud) or b"{}")
+        time.sleep(self.latencia)
+        cuerpo = json.dumps({
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": pedido.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": RESPUESTA},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *args):
+        pass
+
+
+def iniciar(latencia=0.0, puerto=0):
+    """Arranca el stub en un hilo de fondo. Devuelve (servidor, base_url)."""
+    manejador = type("Manejador", (_Manejador,), {"latencia": latencia})
+    servidor = ThreadingHTTPServer(("127.0.0.1", puerto), manejador)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_address[1]}/v1"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stub local de la API de OpenAI")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--latencia", type=float, default=0.0, help="Segundos de espera por respuesta")
+    args = parser.parse_args()
+
+    servidor, url = iniciar(args.latencia, args.puerto)
+    print(f"Stub de IA en {url} (Ctrl+C para detener)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        servidor.shutdown()
@@ -0,0 +1,99 @@
+"""Totales del balance y del flujo de caja que se actualizan fila por fila.
+
+Cada campo de monto de la app tiene un callback que llama a
+`GrafoTotales.fijar(columna, nombre, centavos)`. El grafo guarda el monto de
+cada fila y propaga solo la diferencia por sus dependencias:
+
+    fila -> total de columna -> derivados (netos, patrimonio, saldo mensual)
+
+    grafo = GrafoTotales()
+    grafo.fijar("activos_valor", "Inmueble 1", 25_000_000_00)
+    grafo.fijar("activos_deuda", "Inmueble 1", 10_000_000_00)
+    grafo.pesos("patrimonio_neto")      # 15000000.0, sin volver a sumar nada
+
+Así un rerun no vuelve a leer ni sumar las filas: lee los totales ya
+calculados. Las secciones que dependen de los totales (`SECCIONES`) quedan
+marcadas como "sucias" solo si alguno de sus nodos cambió de verdad; escribir
+el mismo monto otra vez no marca nada.
+"""
+from calculadora.dinero import a_pesos
+
+COLUMNAS = ("activos_valor", "activos_deuda", "pasivos_valor", "pasivos_deuda", "ingresos", "gastos")
+
+# nodo derivado: {nodo del que depende: coeficiente}
+DERIVADOS = {
+    "activos_neto": {"activos_valor": 1, "activos_deuda": -1},
+    "pasivos_neto": {"pasivos_deuda": 1, "pasivos_valor": -1},
+    "patrimonio_neto": {"activos_neto": 1, "pasivos_neto": 1},
+    "saldo_mensual": {"ingresos": 1, "gastos": -1},
+}
+
+# Secciones de la app que usan los totales: se marcan al cambiar sus nodos
+SECCIONES = {
+    "analisis": ("ingresos", "gastos", "activos_neto", "pasivos_neto"),
+}
+
+# Neto de una fila del balance: (columna que suma, columna que resta)
+NETOS = {
+    "activos": ("activos_valor", "activos_deuda"),
+    "pasivos": ("pasivos_deuda", "pasivos_valor"),
+}
+
+_DEPENDIENTES = {nodo: [] for nodo in (*COLUMNAS, *DERIVADOS)}
+for _derivado, _entradas in DERIVADOS.items():
+    for _entrada, _coeficiente in _entradas.items():
+        _DEPENDIENTES[_entrada].append((_derivado, _coeficiente))
+
+_SECCIONES_POR_NODO = {nodo: [] for nodo in _DEPENDIENTES}
+for _seccion, _nodos in SECCIONES.items():
+    for _nodo in _nodos:
+        _SECCIONES_POR_NODO[_nodo].append(_seccion)
+
+
+class GrafoTotales:
+    def __init__(self):
+        # (columna, nombre) -> centavos; las filas en cero no se guardan
+        self.filas = {}
+        self.totales = dict.fromkeys(_DEPENDIENTES, 0)
+        self.sucias = set()
+        self.actualizaciones = 0
+
+    def fijar(self, columna, nombre, centavos):
+        """Monto de una fila en centavos. Devuelve True si cambió algo."""
+        centavos = int(centavos)
+        diferencia = centavos - self.filas.get((columna, nombre), 0)
+        if centavos:
+            self.filas[(columna, nombre)] = centavos
+        else:
+            self.filas.pop((columna, nombre), None)
+        if not diferencia:
+            return False
+        self.actualizaciones += 1
+        self._propagar(columna, diferencia)
+        return True
+
+    def _propagar(self, nodo, diferencia):
+        self.totales[nodo] += diferencia
+        self.sucias.update(_SECCIONES_POR_NODO[nodo])
+        for dependiente, coeficiente in _DEPENDIENTES[nodo]:
+            self._propagar(dependiente, coeficiente * diferencia)
+
+    def fila(self, columna, nombre):
+        return self.filas.get((columna, nombre), 0)
+
+    def neto(self, seccion, nombre):
+        """Neto de una fila del balance ("activos" o "pasivos") en centavos."""
+        suma, resta = NETOS[seccion]
+        return self.fila(suma, nombre) - self.fila(resta, nombre)
+
+    def total(self, nodo):
+        return self.totales[nodo]
+
+    def pesos(self, nodo):
+        return a_pesos(self.totales[nodo])
+
+    def limpiar(self, seccion):
+        """Marca la sección como al día. Devuelve si estaba sucia."""
+        sucia = seccion in self.sucias
+        self.sucias.discard(seccion)
+        return sucia
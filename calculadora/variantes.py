@@ -0,0 +1,41 @@
+"""Registro de las variantes de la app que sirve `variantes.py`.
+
+Todas las variantes son capas de textos y disposición sobre el mismo núcleo
+(`interfaz`, `analisis`, `reportes`, `ia`), así que un solo proceso de
+Streamlit puede servirlas juntas: cada una queda en su propia ruta y todas
+comparten el esquema de la base ya creado, el cliente de OpenAI y la caché
+de reportes calientes.
+
+    streamlit run variantes.py        # http://localhost:8501/v7775, /v23, ...
+"""
+import os
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (ruta en la URL, script); la primera es la que se abre en "/"
+VARIANTES = (
+    ("v7780", "APPCALAJUSTES_V7780.py"),
+    ("v7779", "APPCALAJUSTES_V7779.py"),
+    ("v7778", "APPCALAJUSTES_V7778.py"),
+    ("v7777", "APPCALAJUSTES_V7777.py"),
+    ("v7775", "APPCALAJUSTES_V7775.py"),
+    ("v7774", "APPCALAJUSTES_V7774.py"),
+    ("v7773", "APPCALAJUSTES_V7773.py"),
+    ("v7772", "APPCALAJUSTES_V7772.py"),
+    ("v7771", "APPCALAJUSTES_V7771.py"),
+    ("v777", "APPCALAJUSTES_V777.py"),
+    ("v5", "APPCALAJUSTES_V5.py"),
+    ("v4", "APPCALAJUSTES_V4.py"),
+    ("v3", "APPCALAJUSTES_V3.py"),
+    ("v2", "APPCALAJUSTES_V2.py"),
+    ("v1", "APPCALAJUSTES_V1.py"),
+    ("v0", "APPCALAJUSTES_V0.py"),
+    ("original", "APPCALAJUSTES.py"),
+    ("v24", "Calculadorav24.py"),
+    ("v23", "Calculadorav23.py"),
+)
+
+
+def ruta_script(archivo):
+    """Ruta absoluta del script de una variante."""
+    return os.path.join(RAIZ, archivo)
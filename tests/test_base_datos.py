@@ -0,0 +1,77 @@
+"""Usuarios identificados por correo normalizado (`calculadora.base_datos`)."""
+import sqlite3
+
+import pytest
+
+from calculadora import base_datos
+
+
+@pytest.fixture
+def db(tmp_path):
+    ruta = str(tmp_path / "usuarios.db")
+    base_datos.crear_base_datos(ruta)
+    return ruta
+
+
+def test_mismo_correo_normalizado_es_el_mismo_usuario(db):
+    primero = base_datos.guardar_usuario("Ana", 30, " Ana@Correo.co ", "1", db_path=db)
+    segundo = base_datos.guardar_usuario("Ana María", 31, "ana@correo.co", "2", db_path=db)
+    assert primero == segundo
+    assert base_datos.buscar_usuario_por_email("ANA@correo.co", db_path=db)[1] == "Ana María"
+
+
+@pytest.mark.parametrize("email", ["", "   ", None, "sin-arroba", "a@b", "dos @correo.co"])
+def test_correo_vacio_o_invalido_no_se_guarda(db, email):
+    with pytest.raises(ValueError):
+        base_datos.guardar_usuario("Ana", 30, email, "1", db_path=db)
+
+
+def test_compactar_no_fusiona_usuarios_sin_correo(db):
+    conn = sqlite3.connect(db)
+    conn.execute("DROP INDEX idx_usuarios_email")
+    conn.executemany(
+        "INSERT INTO usuarios (nombre, edad, email, telefono) VALUES (?, ?, ?, ?)",
+        [("Ana", 30, "  ", "1"), ("Luis", 40, "", "2"), ("Eva", 50, "eva@correo.co", "3"),
+         ("Eva B", 51, "EVA@correo.co ", "4")]
+    )
+    conn.commit()
+
+    assert base_datos.compactar_usuarios(conn, vacuum=False) == 1
+    base_datos._crear_indice_email(conn.cursor())
+    filas = conn.execute("SELECT nombre, email FROM usuarios ORDER BY id").fetchall()
+    conn.close()
+    assert filas == [("Ana", None), ("Luis", None), ("Eva B", "eva@correo.co")]
+
+
+def test_compactar_reasigna_los_reportes_del_duplicado(db):
+    conn = sqlite3.connect(db)
+    conn.execute("DROP INDEX idx_usuarios_email")
+    conn.executemany(
+        "INSERT INTO usuarios (nombre, edad, email, telefono) VALUES (?, ?, ?, ?)",
+        [("Eva", 50, "eva@correo.co", "3"), ("Eva B", 51, "EVA@correo.co ", "4")]
+    )
+    conn.commit()
+    conservado, duplicado = [fila[0] for fila in conn.execute("SELECT id FROM usuarios ORDER BY id")]
+    reporte_id = base_datos.guardar_reporte(duplicado, {"nombre": "Eva B"}, "huella", db_path=db)
+
+    assert base_datos.compactar_usuarios(conn, vacuum=False) == 1
+    fila = conn.execute("SELECT usuario_id FROM reportes_compartidos WHERE id = ?", (reporte_id,)).fetchone()
+    conn.close()
+    assert fila == (conservado,)
+
+
+def test_compactar_no_cambia_la_version_de_los_demas(db):
+    conn = sqlite3.connect(db)
+    conn.execute("DROP INDEX idx_usuarios_email")
+    conn.executemany(
+        "INSERT INTO usuarios (nombre, edad, email, telefono) VALUES (?, ?, ?, ?)",
+        [("Ana", 30, "ana@correo.co", "1"), ("Luis", 40, "Luis@Correo.co", "2")]
+    )
+    conn.commit()
+    antes = dict(conn.execute("SELECT nombre, version FROM usuarios"))
+
+    assert base_datos.compactar_usuarios(conn, vacuum=False) == 0
+    despues = dict(conn.execute("SELECT nombre, version FROM usuarios"))
+    conn.close()
+    assert despues["Ana"] == antes["Ana"]
+    assert despues["Luis"] > antes["Luis"]
@@ -0,0 +1,14 @@
+"""Casos del benchmark que cargan la app (`calculadora.benchmark`)."""
+from calculadora import base_datos, benchmark
+
+
+def test_rerun_con_la_app_por_defecto_desde_otro_directorio(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(base_datos, "DB_PATH", str(tmp_path / "bench.db"))
+    monkeypatch.setenv('CALCULADORA_CACHE_DIR', str(tmp_path / "cache"))
+    base_datos.crear_base_datos()
+
+    resultado = benchmark.caso_rerun(benchmark.APP_POR_DEFECTO)
+    assert resultado["repeticiones"] == 5
+    assert resultado["primera_s"] > 0
+    assert not (tmp_path / "usuarios.db").exists()
@@ -0,0 +1,78 @@
+"""Caché de bytes en memoria y disco (`calculadora.cache`)."""
+import os
+import time
+
+from calculadora.cache import CacheContenido
+
+
+def test_disco_se_recorre_solo_al_crear(tmp_path, monkeypatch):
+    cache = CacheContenido(max_bytes_memoria=0, directorio=str(tmp_path), max_bytes_disco=250)
+    recorridos = []
+    scandir = os.scandir
+    monkeypatch.setattr(os, "scandir", lambda ruta: recorridos.append(ruta) or scandir(ruta))
+    for i in range(5):
+        cache.guardar(f"clave{i}", b"x" * 100)
+    assert recorridos == []
+    # Límite de 250 bytes: quedan las dos más recientes
+    assert sorted(os.listdir(tmp_path)) == ["clave3", "clave4"]
+    assert cache._bytes_disco == 200
+
+
+def test_expulsion_lru_en_disco(tmp_path):
+    cache = CacheContenido(max_bytes_memoria=0, directorio=str(tmp_path), max_bytes_disco=250)
+    cache.guardar("a", b"x" * 100)
+    cache.guardar("b", b"x" * 100)
+    assert cache.obtener("a") == b"x" * 100
+    cache.guardar("c", b"x" * 100)
+    assert sorted(os.listdir(tmp_path)) == ["a", "c"]
+
+
+def test_indice_al_reiniciar(tmp_path):
+    for i in range(3):
+        (tmp_path / f"vieja{i}").write_bytes(b"x" * 100)
+        os.utime(tmp_path / f"vieja{i}", (time.time() - 100 + i, time.time() - 100 + i))
+    (tmp_path / "interrumpida.123.tmp").write_bytes(b"x")
+    cache = CacheContenido(max_bytes_memoria=0, directorio=str(tmp_path), max_bytes_disco=250)
+    assert sorted(os.listdir(tmp_path)) == ["vieja1", "vieja2"]
+    assert cache.obtener("vieja1") == b"x" * 100
+
+
+def test_ttl_en_disco(tmp_path):
+    (tmp_path / "vencida").write_bytes(b"x")
+    os.utime(tmp_path / "vencida", (time.time() - 100, time.time() - 100))
+    cache = CacheContenido(max_bytes_memoria=0, directorio=str(tmp_path), ttl_segundos=10)
+    assert cache.obtener("vencida") is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_escrita_por_otro_proceso_se_lee(tmp_path):
+    cache = CacheContenido(max_bytes_memoria=0, directorio=str(tmp_path))
+    (tmp_path / "ajena").write_bytes(b"datos")
+    assert cache.obtener("ajena") == b"datos"
+    assert cache._bytes_disco == 5
+
+
+def test_carpeta_y_archivos_privados(tmp_path):
+    directorio = tmp_path / "reportes"
+    directorio.mkdir(mode=0o755)
+    cache = CacheContenido(directorio=str(directorio))
+    cache.guardar("a", b"datos")
+    assert directorio.stat().st_mode & 0o777 == 0o700
+    assert (directorio / "a").stat().st_mode & 0o777 == 0o600
+
+
+def test_memoria_cero_no_guarda_nada_en_memoria(tmp_path):
+    cache = CacheContenido(max_bytes_memoria=0, directorio=str(tmp_path))
+    cache.guardar("a", b"datos")
+    assert cache.obtener("a") == b"datos"
+    assert len(cache) == 0
+    assert cache._bytes_memoria == 0
+
+
+def test_memoria_expulsa_hasta_el_limite():
+    cache = CacheContenido(max_bytes_memoria=150)
+    cache.guardar("a", b"x" * 100)
+    cache.guardar("b", b"x" * 100)
+    assert cache.obtener("a") is None
+    cache.guardar("grande", b"x" * 200)
+    assert len(cache) == 0
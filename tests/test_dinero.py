@@ -0,0 +1,56 @@
+"""Montos en centavos enteros (`calculadora.dinero`)."""
+import numpy as np
+import pytest
+
+from calculadora.dinero import ColumnaDinero, a_centavos, a_pesos
+
+
+@pytest.mark.parametrize("pesos, centavos", [
+    (1234.56, 123456),
+    (0.1 + 0.2, 30),
+    (1.236, 124),
+    (1.234, 123),
+    (-0.006, -1),
+    (250_000_000.10, 25_000_000_010),
+])
+def test_a_centavos_redondea_al_centavo_mas_cercano(pesos, centavos):
+    assert a_centavos(pesos) == centavos
+
+
+def test_sumas_exactas_en_centavos():
+    columna = ColumnaDinero.desde_pesos(range(10), [0.1] * 10)
+    assert columna.total() == 100
+    assert columna.total_pesos() == 1.0
+    assert a_pesos(columna.total()) == 1.0
+
+
+def test_porcentaje_redondea_la_mitad_lejos_de_cero():
+    columna = ColumnaDinero(["a", "b", "c", "d"], [5, -5, 15, 1])
+    assert columna.porcentaje(10).centavos.tolist() == [1, -1, 2, 0]
+    assert columna.porcentaje(12.5).centavos.tolist() == [1, -1, 2, 0]
+
+
+def test_operaciones_entre_columnas():
+    valores = ColumnaDinero(["Casa", "Carro"], [25_000_000_000, 4_000_000_005])
+    deudas = ColumnaDinero(valores.nombres, [10_000_000_000, 0])
+    neto = valores - deudas
+    assert neto["Casa"] == 15_000_000_000
+    assert (-neto + valores).total() == deudas.total()
+    assert neto.como_dict() == {"Casa": 150_000_000.0, "Carro": 40_000_000.05}
+    with pytest.raises(ValueError):
+        valores + ColumnaDinero(["Casa"], [1])
+
+
+def test_desborde_de_int64_no_da_la_vuelta():
+    grande = ColumnaDinero(["a", "b"], [2**62, 2**62])
+    with pytest.raises(OverflowError):
+        grande + grande
+    with pytest.raises(OverflowError):
+        -grande - grande - grande
+    with pytest.raises(OverflowError):
+        grande.porcentaje(200)
+    with pytest.raises(OverflowError):
+        -ColumnaDinero(["a"], [np.iinfo(np.int64).min])
+    # El total no cabe en int64 pero se calcula exacto
+    assert grande.total() == 2**63
+    assert (grande - grande).total() == 0
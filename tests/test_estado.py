@@ -0,0 +1,84 @@
+"""Estado compartido entre fragmentos (`calculadora.estado`)."""
+from calculadora import sesiones
+from calculadora.cache import CacheContenido
+from calculadora.estado import EstadoApp
+from calculadora.totales import GrafoTotales
+
+
+def test_lo_que_escribe_un_fragmento_lo_lee_otro():
+    sesion = {}
+    registro = EstadoApp(sesion)
+    assert not registro.registrado
+    registro.usuario_id = 7
+    registro.usuario = {'nombre': "Ana", 'edad': 30}
+    registro.finanzas = {'ingresos': 5000}
+    registro.plan_inversion = ("Alto", "texto")
+    registro.importado = {'activos_valor': None}
+    registro.totales.fijar("ingresos", "Salario", 500_000)
+
+    # Otro fragmento, en otro run, arma su propia vista sobre la misma sesión
+    retiro = EstadoApp(sesion)
+    assert retiro.registrado and retiro.usuario_id == 7
+    assert retiro.usuario == {'nombre': "Ana", 'edad': 30}
+    assert retiro.finanzas == {'ingresos': 5000}
+    assert retiro.plan_inversion == ("Alto", "texto")
+    assert retiro.importado == {'activos_valor': None}
+    assert retiro.totales is registro.totales
+    assert retiro.reporte_data is sesion['reporte_data']
+    # Las claves de siempre, donde las buscan `sesiones` y `grabacion`
+    assert sesion['usuario_id'] == 7 and isinstance(sesion['totales'], GrafoTotales)
+
+
+def test_valores_se_crean_una_vez_en_cero():
+    sesion = {}
+    valores = EstadoApp(sesion).valores("activos", ["Casa", "Carro"])
+    assert valores == {"Casa": {"valor": 0.0, "deuda": 0.0}, "Carro": {"valor": 0.0, "deuda": 0.0}}
+    valores["Casa"]["valor"] = 100.0
+    assert EstadoApp(sesion).valores("activos", ["Otro"]) is valores
+    assert sesion['activos_values']["Casa"]["valor"] == 100.0
+    assert EstadoApp(sesion).valores("ingresos", ["Salario"]) == {"Salario": {"valor": 0.0}}
+
+
+def test_avisos_sobreviven_hasta_leerlos():
+    sesion = {}
+    EstadoApp(sesion).avisar("registro", "Información guardada correctamente")
+    estado = EstadoApp(sesion)
+    assert estado.tomar_aviso("registro") == "Información guardada correctamente"
+    assert estado.tomar_aviso("registro") is None
+
+
+def test_conteo_de_reruns_y_secciones_sucias():
+    estado = EstadoApp({})
+    estado.comenzar_run_completo()
+    estado.contar_fragmento("balance")
+    estado.contar_fragmento("balance")
+    assert estado._reruns() == {"completos": 1, "fragmentos": {"balance": 2}}
+    assert estado.secciones_nuevas_sucias() == set()
+    estado.totales.fijar("gastos", "Salud", 100)
+    assert estado.secciones_nuevas_sucias() == {"analisis"}
+    # El run completo que sigue ya la muestra: no se vuelve a publicar
+    estado.comenzar_run_completo()
+    assert estado.secciones_nuevas_sucias() == set()
+
+
+def test_campos_descargados_vuelven_a_la_vista(tmp_path, monkeypatch):
+    monkeypatch.setattr(sesiones, "_almacen", CacheContenido(max_bytes_memoria=0, directorio=str(tmp_path)))
+    sesion = {}
+    estado = EstadoApp(sesion)
+    estado.analisis['analisis_ia'] = "Estrategia"
+    estado.analisis['resumen'] = "Resumen"
+    inactiva = sesiones._Sesion()
+    inactiva.estado = sesion
+    sesiones._descargar(inactiva)
+    assert 'analisis_ia' not in EstadoApp(sesion).analisis
+    sesiones._rehidratar(inactiva)
+    assert EstadoApp(sesion).analisis == {'analisis_ia': "Estrategia", 'resumen': "Resumen"}
+
+
+def test_publicar_pide_un_rerun_de_la_app(monkeypatch):
+    from calculadora import estado as modulo
+
+    pedidos = []
+    monkeypatch.setattr(modulo.st, "rerun", lambda scope: pedidos.append(scope))
+    EstadoApp({}).publicar()
+    assert pedidos == ["app"]
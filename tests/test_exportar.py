@@ -0,0 +1,79 @@
+"""Exportación incremental a Parquet (`calculadora.exportar`)."""
+import sqlite3
+
+import pyarrow.dataset as ds
+import pytest
+
+from calculadora import base_datos, exportar
+
+
+@pytest.fixture
+def db(tmp_path):
+    ruta = str(tmp_path / "usuarios.db")
+    base_datos.crear_base_datos(ruta)
+    return ruta
+
+
+def _filas(destino, conjunto):
+    tabla = ds.dataset(str(destino / conjunto), format="parquet", partitioning="hive").to_table()
+    return sorted(zip(tabla.column("id").to_pylist(), tabla.column("nombre").to_pylist()))
+
+
+def test_usuario_cambiado_en_el_mismo_segundo_se_exporta(db, tmp_path):
+    destino = tmp_path / "exportacion"
+    ana = base_datos.guardar_usuario("Ana", 30, "ana@correo.co", "1", db_path=db)
+    luis = base_datos.guardar_usuario("Luis", 40, "luis@correo.co", "2", db_path=db)
+    exportar.exportar(str(destino), db)
+    # Mismo actualizado_en que la marca y un id menor: antes no se exportaba
+    conn = sqlite3.connect(db)
+    segundo = conn.execute("SELECT actualizado_en FROM usuarios WHERE id = ?", (luis,)).fetchone()[0]
+    conn.execute("UPDATE usuarios SET nombre = 'Ana María', actualizado_en = ? WHERE id = ?", (segundo, ana))
+    conn.commit()
+    conn.close()
+
+    assert exportar.exportar(str(destino), db)["usuarios"] == 1
+    assert (ana, "Ana María") in _filas(destino, "usuarios")
+
+
+def test_reintento_tras_fallo_no_duplica_filas(db, tmp_path, monkeypatch):
+    destino = tmp_path / "exportacion"
+    usuario_id = base_datos.guardar_usuario("Ana", 30, "ana@correo.co", "1", db_path=db)
+    base_datos.guardar_finanzas(usuario_id, 5000, 3000, 1000, 0, "Bajo", db_path=db)
+
+    escribir = exportar._escribir
+
+    def falla_en_usuarios(lotes, esquema, carpeta, corrida, contador):
+        if esquema is exportar.ESQUEMA_USUARIOS:
+            raise OSError("disco lleno")
+        escribir(lotes, esquema, carpeta, corrida, contador)
+
+    monkeypatch.setattr(exportar, "_escribir", falla_en_usuarios)
+    with pytest.raises(OSError):
+        exportar.exportar(str(destino), db)
+    monkeypatch.setattr(exportar, "_escribir", escribir)
+
+    assert exportar.exportar(str(destino), db) == {"analisis": 1, "usuarios": 1}
+    assert exportar.exportar(str(destino), db) == {"analisis": 0, "usuarios": 0}
+    assert len(_filas(destino, "analisis")) == 1
+    assert exportar.leer_marca_agua(str(destino)).get("pendiente") is None
+
+
+def test_corrida_confirmada_sin_publicar_se_completa(db, tmp_path, monkeypatch):
+    destino = tmp_path / "exportacion"
+    base_datos.guardar_usuario("Ana", 30, "ana@correo.co", "1", db_path=db)
+    publicar = exportar._publicar_pendiente
+    llamadas = []
+
+    def falla_la_primera_vez(destino_, marca):
+        llamadas.append(1)
+        if len(llamadas) == 2:
+            raise OSError("interrumpido")
+        publicar(destino_, marca)
+
+    monkeypatch.setattr(exportar, "_publicar_pendiente", falla_la_primera_vez)
+    with pytest.raises(OSError):
+        exportar.exportar(str(destino), db)
+    monkeypatch.setattr(exportar, "_publicar_pendiente", publicar)
+
+    assert exportar.exportar(str(destino), db)["usuarios"] == 0
+    assert _filas(destino, "usuarios") == [(1, "Ana")]
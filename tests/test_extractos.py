@@ -0,0 +1,112 @@
+"""Extractos bancarios clasificados en las categorías de gastos (`calculadora.extractos`)."""
+import io
+
+import pytest
+
+from calculadora import extractos
+from calculadora.importacion import ErrorImportacion
+
+
+def _archivo(texto):
+    return io.BytesIO(texto.encode("utf-8"))
+
+
+@pytest.mark.parametrize("texto, categoria", [
+    ("pago para ti", None),
+    ("barberia el corte", None),
+    ("unete club", None),
+    ("epson store", None),
+    ("ara tienda", "Alimentación"),
+    ("bar la", "Entretenimiento"),
+    ("une telecomunicaciones", "Servicios públicos"),
+    ("pago eps", "Salud"),
+    ("compra exito calle", "Alimentación"),
+])
+def test_palabras_cortas_solo_como_palabra_completa(texto, categoria):
+    assert extractos._automata().buscar(texto) == categoria
+
+
+def test_gana_la_palabra_clave_mas_larga():
+    automata = extractos.Automata({"mercado": "Alimentación", "pago arriendo": "Gasto de Inmueble 1"})
+    assert automata.buscar("pago arriendo mercado") == "Gasto de Inmueble 1"
+    assert automata.buscar("supermercado") is None
+
+
+CSV = (
+    "Fecha;Descripción;Valor\n"
+    "05/01/2025;COMPRA EXITO CALLE 80 #123;-200.000\n"
+    "12/01/2025;UBER TRIP 4471;-35.000,50\n"
+    "15/01/2025;ABONO NOMINA;5.000.000\n"
+    "03/02/2025;COMPRA EXITO CALLE 80 #987;-100.000\n"
+    "20/02/2025;PAGO PARA TI;-60.000\n"
+    "21/02/2025;NETFLX COM;-40.000\n"
+)
+
+
+def test_extracto_csv_promedia_por_mes():
+    resultado = extractos.clasificar_extracto(_archivo(CSV), "extracto.csv")
+    movimientos = resultado["movimientos"]
+    assert resultado["meses"] == 2
+    assert len(movimientos) == 5
+    assert movimientos["categoria"].tolist() == [
+        "Alimentación", "Transporte", "Alimentación", "Otros gastos", "Entretenimiento",
+    ]
+    assert movimientos["origen"].tolist()[:3] == ["palabra clave"] * 3
+    assert movimientos["origen"].iloc[4] == "modelo"
+    gastos = resultado["gastos"]
+    # (200.000 + 100.000) / 2 meses, en centavos
+    assert gastos["Alimentación"] == 15_000_000
+    assert gastos["Transporte"] == 1_750_025
+    assert gastos["Otros gastos"] == 3_000_000
+    assert gastos["Salud"] == 0
+
+
+def test_extracto_con_columna_de_debitos():
+    texto = "fecha,detalle,debitos,creditos\n2025-03-01,PAGO PSE ENEL,\"$150,000\",\n2025-03-02,ABONO,,\"$900\"\n"
+    resultado = extractos.clasificar_extracto(_archivo(texto), "extracto.csv")
+    assert resultado["movimientos"]["descripcion"].tolist() == ["PAGO PSE ENEL"]
+    assert resultado["gastos"]["Servicios públicos"] == 15_000_000
+
+
+def test_fechas_iso_se_leen_con_el_anio_primero():
+    texto = "fecha,descripcion,valor\n" + "".join(
+        f"2025-01-{dia:02d},COMPRA EXITO,-100000\n" for dia in range(1, 29)
+    )
+    resultado = extractos.clasificar_extracto(_archivo(texto), "extracto.csv")
+    assert resultado["meses"] == 1
+    assert resultado["movimientos"]["fecha"].dt.month.unique().tolist() == [1]
+    # 28 compras de 100.000 en un solo mes, en centavos
+    assert resultado["gastos"]["Alimentación"] == 280_000_000
+
+
+OFX = """OFXHEADER:100
+DATA:OFXSGML
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20250110120000<TRNAMT>-80000.00<NAME>DROGUERIA LA REBAJA<MEMO>COMPRA</STMTTRN>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20250111<TRNAMT>-45000.00<NAME>BAR LA 70
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20250115<TRNAMT>2500000.00<NAME>NOMINA
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20250120<TRNAMT>-300000.00<NAME>SEGUROS BOLIVAR<MEMO>POLIZA 123</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+
+def test_extracto_ofx():
+    resultado = extractos.clasificar_extracto(_archivo(OFX), "extracto.ofx")
+    movimientos = resultado["movimientos"]
+    assert resultado["meses"] == 1
+    assert movimientos["descripcion"].tolist() == [
+        "DROGUERIA LA REBAJA COMPRA", "BAR LA 70", "SEGUROS BOLIVAR POLIZA 123",
+    ]
+    assert movimientos["categoria"].tolist() == ["Salud", "Entretenimiento", "Seguros"]
+    assert movimientos["fecha"].dt.day.tolist() == [10, 11, 20]
+    assert resultado["gastos"].total() == 42_500_000
+
+
+def test_ofx_sin_movimientos():
+    with pytest.raises(ErrorImportacion, match="STMTTRN"):
+        extractos.clasificar_extracto(_archivo("OFXHEADER:100\n<OFX></OFX>"), "extracto.ofx")
+
+
+def test_csv_sin_columnas_necesarias():
+    with pytest.raises(ErrorImportacion, match="descripción"):
+        extractos.clasificar_extracto(_archivo("fecha,total\n2025-01-01,5\n"), "extracto.csv")
@@ -0,0 +1,23 @@
+"""Anonimización de los valores grabados (`calculadora.grabacion`)."""
+import pytest
+
+from calculadora.grabacion import anonimizar
+from calculadora.moneda import parse_currency
+
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("$1,234.56", 1200),
+    ("$(3,000.00)", -3000),
+    ("-$500.25", -500),
+    ("$ 1.234.567,89", 1_200_000),
+    ("COP 2.500.000", 2_500_000),
+])
+def test_montos_se_redondean_y_se_leen_igual(texto, esperado):
+    anonimo = anonimizar("text_input", texto)
+    assert anonimo.startswith("$")
+    assert parse_currency(anonimo, invalido=None) == esperado
+
+
+@pytest.mark.parametrize("texto", ["Casa 2", "Ana María", "1e5"])
+def test_texto_libre_no_es_monto(texto):
+    assert set(anonimizar("text_input", texto)) <= {"x", " "}
@@ -0,0 +1,120 @@
+"""Importación del balance y el presupuesto (`calculadora.importacion`)."""
+import io
+
+import pytest
+
+from calculadora import importacion
+
+
+def _csv(texto):
+    return io.BytesIO(texto.encode("utf-8"))
+
+
+def _xlsx(filas):
+    from openpyxl import Workbook
+
+    libro = Workbook()
+    for fila in filas:
+        libro.active.append(fila)
+    salida = io.BytesIO()
+    libro.save(salida)
+    salida.seek(0)
+    return salida
+
+
+def test_plantilla_en_centavos():
+    resultado = importacion.importar(_csv(importacion.PLANTILLA_CSV), "plantilla.csv")
+    assert resultado["errores"] == []
+    assert resultado["filas"] == 5
+    assert resultado["activos_valor"].como_dict() == {"Apartamento": 420_000_000, "Carro": 60_000_000}
+    assert resultado["activos_deuda"]["Apartamento"] == 18_000_000_000
+    assert resultado["pasivos_valor"].total() == 350_000_000
+    assert resultado["ingresos"]["Otros ingresos"] == 800_000_000
+    assert resultado["gastos"]["Alimentación"] == 120_000_000
+
+
+def test_conceptos_repetidos_suman_centavos_exactos():
+    texto = "tipo,concepto,valor\n" + "activo,Acciones,$0.10\n" * 3 + "activo,acciones ,$0.20\n"
+    resultado = importacion.importar(_csv(texto), "balance.csv")
+    assert resultado["activos_valor"].como_dict() == {"Acciones": 0.3, "acciones": 0.2}
+    assert resultado["activos_valor"].total() == 50
+
+
+def test_locale_es_co_con_punto_y_coma():
+    texto = "Tipo;Descripción;Monto;Deuda\nactivo;Casa;$ 250.000.000,50;1.000.000\ngasto;Salud;120.000\n"
+    resultado = importacion.importar(_csv(texto), "balance.csv")
+    assert resultado["errores"] == []
+    assert resultado["activos_valor"]["Casa"] == 25_000_000_050
+    assert resultado["activos_deuda"]["Casa"] == 100_000_000
+    assert resultado["gastos"]["Salud"] == 12_000_000
+
+
+def test_errores_por_linea():
+    texto = (
+        "tipo,concepto,valor,deuda\n"
+        "activo,Casa,$100,\n"
+        "inversion,Lote,$100,\n"
+        "activo,,$100,\n"
+        "pasivo,Tarjeta,abc,\n"
+        "activo,Carro,$100,12.5.6\n"
+    )
+    resultado = importacion.importar(_csv(texto), "balance.csv", locale="en-US")
+    assert resultado["errores"] == [
+        "Línea 3: tipo desconocido (usa activo, pasivo, ingreso o gasto)",
+        "Línea 4: falta el concepto",
+        "Línea 5: valor vacío o no es un monto",
+        "Línea 6: deuda no es un monto",
+    ]
+    assert resultado["activos_valor"].como_dict() == {"Casa": 100}
+
+
+def test_montos_fuera_de_rango_son_errores_por_linea():
+    texto = (
+        "tipo,concepto,valor,deuda\n"
+        "activo,Casa,$100,\n"
+        'activo,Lote,"$100000000000000000000",\n'
+        f"activo,Carro,$100,1{'0' * 400}\n"
+    )
+    resultado = importacion.importar(_csv(texto), "balance.csv", locale="en-US")
+    assert resultado["errores"] == ["Línea 3: valor fuera de rango", "Línea 4: deuda fuera de rango"]
+    assert resultado["activos_valor"].como_dict() == {"Casa": 100}
+
+
+def test_suma_que_no_cabe_en_centavos():
+    texto = "tipo,concepto,valor\n" + 'activo,Lote,"$90,000,000,000,000,000"\n' * 2
+    with pytest.raises(importacion.ErrorImportacion, match="suman"):
+        importacion.importar(_csv(texto), "balance.csv", locale="en-US")
+
+
+def test_faltan_columnas():
+    with pytest.raises(importacion.ErrorImportacion, match="Faltan columnas: valor"):
+        importacion.importar(_csv("tipo,concepto\nactivo,Casa\n"), "balance.csv")
+
+
+def test_excel_por_bloques(monkeypatch):
+    monkeypatch.setattr(importacion, "TAMANO_BLOQUE", 2)
+    archivo = _xlsx([
+        ("tipo", "concepto", "valor", "deuda"),
+        ("activo", "Casa", 250_000_000, 100_000_000.0),
+        ("pasivo", "Tarjeta", "$3,500,000.25", None),
+        ("gasto", "Transporte", 300_000),
+        ("activo", "Casa", "no es monto"),
+    ])
+    resultado = importacion.importar(archivo, "balance.xlsx")
+    assert resultado["filas"] == 4
+    assert resultado["errores"] == ["Línea 5: valor vacío o no es un monto"]
+    assert resultado["activos_deuda"]["Casa"] == 10_000_000_000
+    assert resultado["pasivos_valor"]["Tarjeta"] == 350_000_025
+    assert resultado["gastos"]["Transporte"] == 30_000_000
+
+
+@pytest.mark.parametrize("nombre", ["balance.csv", "balance.xlsx"])
+def test_limite_de_tamano(monkeypatch, nombre):
+    monkeypatch.setattr(importacion, "MAX_BYTES", 10)
+    with pytest.raises(importacion.ErrorImportacion, match="pasa de"):
+        importacion.importar(io.BytesIO(b"x" * 11), nombre)
+
+
+def test_excel_danado():
+    with pytest.raises(importacion.ErrorImportacion, match="Excel"):
+        importacion.importar(io.BytesIO(b"no es un zip"), "balance.xlsx")
@@ -0,0 +1,115 @@
+"""Formato y lectura de montos (`calculadora.moneda`)."""
+import threading
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from calculadora.moneda import MemoMontos, format_currency_serie, parse_currency, parse_currency_serie
+
+NAN = float("nan")
+
+
+def _serie(texto, locale):
+    return parse_currency_serie(pd.Series([texto]), locale, invalido=NAN).iloc[0]
+
+
+@pytest.mark.parametrize("texto, locale, esperado", [
+    ("$1,234.56", "auto", 1234.56),
+    ("1.234.567,50", "auto", 1234567.5),
+    ("$(3,000.00)", "auto", -3000.0),
+    ("-$500.25", "auto", -500.25),
+    ("$-3,701.00", "auto", -3701.0),
+    ("$40,000", "auto", 40000.0),
+    ("1.500", "auto", 1500.0),
+    ("12,5", "auto", 12.5),
+    ("COP 2.500.000", "auto", 2500000.0),
+    ("1.500", "en-US", 1.5),
+    ("1.500", "es-CO", 1500.0),
+])
+def test_parse_currency_formatos(texto, locale, esperado):
+    assert parse_currency(texto, locale) == esperado
+    if locale != "auto":
+        assert _serie(texto, locale) == esperado
+
+
+def test_parse_currency_cero_con_tres_decimales_no_es_de_miles():
+    assert parse_currency("$0.125") == 0.125
+    assert parse_currency("0,125") == 0.125
+    assert parse_currency_serie(pd.Series(["$0.125"])).iloc[0] == 0.125
+
+
+@pytest.mark.parametrize("texto", ["12.5.6", "10-20", "5-", "(5", "-(5)", "abc", "1e5", "2.5E+3"])
+@pytest.mark.parametrize("locale", ["auto", "en-US", "es-CO"])
+def test_parse_currency_malformado_es_invalido(texto, locale):
+    assert parse_currency(texto, locale, invalido=None) is None
+    assert parse_currency(texto, locale) == 0.0
+    if locale != "auto":
+        assert math.isnan(_serie(texto, locale))
+
+
+def test_parse_currency_solo_guion_inicial_o_parentesis_son_negativos():
+    assert parse_currency("-1,000") == -1000.0
+    assert parse_currency("(1,000)") == -1000.0
+    assert parse_currency("1,000-", invalido=None) is None
+
+
+def test_parse_currency_es_co_con_punto_decimal_de_excel():
+    # Celdas numéricas leídas con dtype=str llegan con punto decimal
+    assert parse_currency("1500.5", "es-CO") == 1500.5
+    serie = pd.Series(["1500.5", "1.500", "1.234.567,5", "0.75"])
+    assert parse_currency_serie(serie, "es-CO").tolist() == [1500.5, 1500.0, 1234567.5, 0.75]
+    assert parse_currency_serie(pd.Series(["1500.5", "2500.25"])).tolist() == [1500.5, 2500.25]
+
+
+def test_format_currency_serie_contable():
+    assert format_currency_serie([1234.5, -3000, 0]) == ["$1,234.50", "$(3,000.00)", "$0.00"]
+    assert format_currency_serie([1234567.5], locale="es-CO") == ["$1.234.567,50"]
+
+
+def test_format_currency_serie_nan_queda_vacio():
+    assert format_currency_serie([1.5, float("nan"), None]) == ["$1.50", "", ""]
+    serie = pd.Series([np.nan, -2.0], index=["a", "b"])
+    assert format_currency_serie(serie).tolist() == ["", "$(2.00)"]
+
+
+def test_format_currency_serie_infinitos_quedan_vacios():
+    assert format_currency_serie([np.inf, 2.0, -np.inf, 1e20]) == ["", "$2.00", "", ""]
+
+
+def test_format_currency_serie_vacia_conserva_indice():
+    serie = pd.Series([], index=pd.Index([], name="cuenta"), dtype="float64")
+    resultado = format_currency_serie(serie)
+    assert isinstance(resultado, pd.Series)
+    assert resultado.empty and resultado.index.name == "cuenta"
+    assert format_currency_serie([]) == []
+
+
+def test_memo_montos_acotada():
+    memo = MemoMontos(maximo=3)
+    assert format_currency_serie([1, 2, 3], memo=memo) == ["$1.00", "$2.00", "$3.00"]
+    assert format_currency_serie([4, 5], memo=memo) == ["$4.00", "$5.00"]
+    assert len(memo) <= 3
+
+
+def test_memo_montos_entre_hilos():
+    # Un memo diminuto obliga a vaciarlo mientras otros hilos lo están usando
+    memo = MemoMontos(maximo=5)
+    errores = []
+
+    def formatear(inicio):
+        try:
+            for i in range(300):
+                valores = [inicio + i, inicio + i + 1, inicio + i + 2]
+                assert format_currency_serie(valores, memo=memo) == format_currency_serie(valores)
+        except Exception as e:
+            errores.append(e)
+
+    hilos = [threading.Thread(target=formatear, args=(inicio * 1000,)) for inicio in range(8)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    assert errores == []
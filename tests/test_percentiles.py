@@ -0,0 +1,81 @@
+"""Percentiles por cohorte: cada participante cuenta una vez."""
+import sqlite3
+
+import pytest
+
+from calculadora import base_datos, percentiles
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    ruta = str(tmp_path / "usuarios.db")
+    base_datos.crear_base_datos(ruta)
+    monkeypatch.setattr(percentiles, "_bosquejos", None)
+    return ruta
+
+
+def _totales(ruta):
+    conn = sqlite3.connect(ruta)
+    bosquejos = percentiles.cargar(conn)
+    conn.close()
+    return {llave: bosquejo.total for llave, bosquejo in bosquejos.items()}
+
+
+def test_volver_a_analizar_reemplaza_el_aporte(db):
+    usuario_id = base_datos.guardar_usuario("Ana", 35, "ana@correo.co", "1", db_path=db)
+    otro_id = base_datos.guardar_usuario("Luis", 52, "luis@correo.co", "2", db_path=db)
+    base_datos.guardar_finanzas(otro_id, 9000, 1000, 500000, 0, "Alto", db_path=db)
+    # Carga los bosquejos en memoria antes de los análisis repetidos
+    base_datos.percentiles_usuario(35, 0, 0, db_path=db)
+    for ingresos in (1000, 2000, 3000):
+        base_datos.guardar_finanzas(usuario_id, ingresos, 500, 1000, 0, "Bajo", db_path=db)
+
+    esperado = {
+        ("flujo_caja", "todos"): 2, ("flujo_caja", "30-39"): 1, ("flujo_caja", "50-59"): 1,
+        ("patrimonio_neto", "todos"): 2, ("patrimonio_neto", "30-39"): 1, ("patrimonio_neto", "50-59"): 1,
+    }
+    assert _totales(db) == esperado
+    en_memoria = percentiles.obtener_bosquejos(lambda: base_datos.conectar(db))
+    assert {llave: b.total for llave, b in en_memoria.items() if b.total} == esperado
+    # Solo queda el último flujo de caja de Ana (2500) en su cohorte
+    assert en_memoria[("flujo_caja", "30-39")].conteos == {percentiles.clave(2500): 1}
+
+
+def test_base_anterior_se_reconstruye_con_el_ultimo_analisis(db):
+    usuario_id = base_datos.guardar_usuario("Ana", 35, "ana@correo.co", "1", db_path=db)
+    for ingresos in (1000, 2000):
+        base_datos.guardar_finanzas(usuario_id, ingresos, 500, 1000, 0, "Bajo", db_path=db)
+    # Una base de antes de los aportes contaba cada análisis
+    conn = sqlite3.connect(db)
+    conn.execute("DROP TABLE percentiles_aportes")
+    conn.execute("UPDATE percentiles_cubetas SET total = total + 5")
+    conn.commit()
+    conn.close()
+
+    base_datos.crear_base_datos(db)
+    assert _totales(db) == {("flujo_caja", "todos"): 1, ("flujo_caja", "30-39"): 1,
+                            ("patrimonio_neto", "todos"): 1, ("patrimonio_neto", "30-39"): 1}
+
+
+def test_compactar_cuenta_una_vez_al_usuario_fusionado(db):
+    conn = sqlite3.connect(db)
+    conn.execute("DROP INDEX idx_usuarios_email")
+    conn.executemany(
+        "INSERT INTO usuarios (nombre, edad, email, telefono) VALUES (?, ?, ?, ?)",
+        [("Eva", 45, "eva@correo.co", "3"), ("Eva B", 51, "EVA@correo.co ", "4")]
+    )
+    conn.commit()
+    conservado, duplicado = [fila[0] for fila in conn.execute("SELECT id FROM usuarios ORDER BY id")]
+    base_datos.guardar_finanzas(conservado, 1000, 500, 1000, 0, "Bajo", db_path=db)
+    base_datos.guardar_finanzas(duplicado, 3000, 500, 1000, 0, "Bajo", db_path=db)
+    base_datos.percentiles_usuario(51, 0, 0, db_path=db)
+
+    assert base_datos.compactar_usuarios(conn, vacuum=False) == 1
+    aportes = conn.execute("SELECT usuario_id, edad, flujo_caja FROM percentiles_aportes").fetchall()
+    conn.close()
+    assert aportes == [(conservado, 51, 2500)]
+    assert _totales(db) == {("flujo_caja", "todos"): 1, ("flujo_caja", "50-59"): 1,
+                            ("patrimonio_neto", "todos"): 1, ("patrimonio_neto", "50-59"): 1}
+    # Los bosquejos ya cargados se descartan y se vuelven a leer de la base
+    en_memoria = percentiles.obtener_bosquejos(lambda: base_datos.conectar(db))
+    assert en_memoria[("flujo_caja", "todos")].total == 1
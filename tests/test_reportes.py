@@ -0,0 +1,40 @@
+"""Caché de reportes compartida (`calculadora.reportes`)."""
+import os
+
+from calculadora import reportes
+from calculadora.cache import CacheContenido
+
+
+def test_directorio_por_defecto_fuera_del_proyecto(tmp_path, monkeypatch):
+    monkeypatch.delenv('CALCULADORA_CACHE_DIR', raising=False)
+    monkeypatch.delenv('LOCALAPPDATA', raising=False)
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+    assert reportes.directorio_cache() == os.path.join(str(tmp_path), "calculadora", "reportes")
+
+
+def test_directorio_configurable(tmp_path, monkeypatch):
+    monkeypatch.setenv('CALCULADORA_CACHE_DIR', str(tmp_path / "otra"))
+    assert reportes.directorio_cache() == str(tmp_path / "otra")
+
+
+def test_fuentes_recortadas_fuera_de_la_cache(tmp_path, monkeypatch):
+    from calculadora import reporte_pdf
+
+    monkeypatch.setenv('CALCULADORA_CACHE_DIR', str(tmp_path / "cache"))
+    assert reporte_pdf.directorio_recortes() == str(tmp_path / "fuentes")
+    ruta = reporte_pdf._ruta_recortada(
+        os.path.join(reporte_pdf.DIRECTORIO_FUENTES, reporte_pdf.ARCHIVOS_FUENTE[""])
+    )
+    assert os.path.dirname(ruta) == str(tmp_path / "fuentes")
+    CacheContenido(directorio=str(tmp_path / "cache"), max_bytes_disco=1)
+    assert os.path.exists(ruta)
+
+
+def test_caracteres_sin_glifo_se_registran(caplog):
+    from calculadora import reporte_pdf
+
+    reporte_pdf._omitidos.discard("\U0001F4B0")
+    with caplog.at_level("WARNING", logger="calculadora.reporte_pdf"):
+        texto = reporte_pdf.ReportePDF().normalize_text("Ahorro \U0001F4B0")
+    assert texto == "Ahorro "
+    assert "\U0001F4B0" in caplog.text
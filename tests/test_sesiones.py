@@ -0,0 +1,63 @@
+"""Campos pasados a disco por `sesiones` y las descargas diferidas del reporte."""
+from types import SimpleNamespace
+
+import pytest
+
+from calculadora import interfaz, reportes, sesiones
+from calculadora.cache import CacheContenido
+
+
+def _reporte_data():
+    return {
+        'usuario': {'nombre': "Ana", 'edad': 30, 'email': "ana@correo.co", 'telefono': "3001234567"},
+        'finanzas': {'ingresos': 5000, 'gastos': 3000, 'activos': 80000, 'pasivos': 20000},
+        'analisis': {
+            'resumen': "Resumen corto",
+            'plan_trabajo': "Plan de prueba para el reporte",
+            'analisis_ia': "Estrategia de prueba",
+            'proyeccion_retiro': {'analisis': "Retiro de prueba"},
+        },
+    }
+
+
+@pytest.fixture
+def sesion_descargada(tmp_path, monkeypatch):
+    monkeypatch.setattr(sesiones, "_almacen", CacheContenido(max_bytes_memoria=0, directorio=str(tmp_path)))
+    monkeypatch.setattr(sesiones, "_sesiones", {})
+    monkeypatch.setattr(reportes, "_cache", CacheContenido())
+    sesion = sesiones._Sesion()
+    sesion.estado = {'reporte_data': _reporte_data()}
+    sesiones._sesiones["sesion-1"] = sesion
+    # El botón se crea en un run de esa sesión, antes de que quede inactiva
+    monkeypatch.setattr(interfaz, "get_script_run_ctx", lambda: SimpleNamespace(session_id="sesion-1"))
+    reporte_data = sesion.estado['reporte_data']
+    data = interfaz._al_descargar(reportes.generar_html_cacheado, reporte_data)
+    sesiones._descargar(sesion)
+    return sesion, reporte_data, data
+
+
+def test_descargar_saca_los_campos_pesados(sesion_descargada):
+    sesion, reporte_data, _ = sesion_descargada
+    assert len(sesion.descargados) == 3
+    assert set(reporte_data['analisis']) == {'resumen'}
+
+
+def test_descarga_diferida_rehidrata_antes_de_generar(sesion_descargada):
+    sesion, reporte_data, data = sesion_descargada
+    html = data().decode("utf-8")
+    for texto in ("Plan de prueba para el reporte", "Estrategia de prueba", "Retiro de prueba"):
+        assert texto in html
+    assert sesion.descargados == {}
+    assert reporte_data['analisis']['plan_trabajo'] == "Plan de prueba para el reporte"
+
+
+def test_descarga_diferida_usa_la_misma_entrada_de_cache(sesion_descargada):
+    sesion, reporte_data, data = sesion_descargada
+    data()
+    # Rehidratado, el reporte es el mismo que antes de descargar: una sola entrada
+    assert data() == reportes.generar_html_cacheado(_reporte_data())
+    assert len(reportes.cache_reportes()) == 1
+
+
+def test_rehidratar_sesion_desconocida_no_falla():
+    sesiones.rehidratar("no-existe")
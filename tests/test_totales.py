@@ -0,0 +1,50 @@
+"""Totales incrementales del balance y el flujo de caja (`calculadora.totales`)."""
+import random
+
+from calculadora.totales import COLUMNAS, DERIVADOS, GrafoTotales
+
+
+def _recalcular(filas):
+    """Todos los totales sumando desde cero, como antes de los callbacks."""
+    totales = dict.fromkeys((*COLUMNAS, *DERIVADOS), 0)
+    for (columna, _), centavos in filas.items():
+        totales[columna] += centavos
+    # DERIVADOS está en orden de dependencia
+    for derivado, entradas in DERIVADOS.items():
+        totales[derivado] = sum(coeficiente * totales[entrada] for entrada, coeficiente in entradas.items())
+    return totales
+
+
+def test_un_cambio_coincide_con_recalcular_todo():
+    azar = random.Random(7)
+    grafo = GrafoTotales()
+    filas = {}
+    for _ in range(2000):
+        llave = (azar.choice(COLUMNAS), f"Fila {azar.randrange(20)}")
+        centavos = azar.choice([0, azar.randrange(-10**12, 10**12)])
+        grafo.fijar(*llave, centavos)
+        filas[llave] = centavos
+        assert grafo.totales == _recalcular(filas)
+
+
+def test_patrimonio_y_netos_por_fila():
+    grafo = GrafoTotales()
+    grafo.fijar("activos_valor", "Inmueble 1", 25_000_000_00)
+    grafo.fijar("activos_deuda", "Inmueble 1", 10_000_000_00)
+    grafo.fijar("pasivos_valor", "Tarjeta", 2_000_000_00)
+    assert grafo.neto("activos", "Inmueble 1") == 15_000_000_00
+    assert grafo.neto("pasivos", "Tarjeta") == -2_000_000_00
+    assert grafo.pesos("patrimonio_neto") == 13_000_000.0
+
+
+def test_el_mismo_monto_no_ensucia_secciones():
+    grafo = GrafoTotales()
+    assert grafo.fijar("ingresos", "Salario", 800_000_000)
+    assert grafo.limpiar("analisis")
+    assert not grafo.fijar("ingresos", "Salario", 800_000_000)
+    assert not grafo.limpiar("analisis")
+    assert grafo.actualizaciones == 1
+    # Una fila en cero no se guarda
+    grafo.fijar("ingresos", "Salario", 0)
+    assert grafo.filas == {}
+    assert grafo.total("saldo_mensual") == 0
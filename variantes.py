@@ -0,0 +1,20 @@
+"""Todas las variantes de la calculadora en un solo proceso.
+
+    streamlit run variantes.py
+
+Cada variante queda en su ruta (`/v7780`, `/v7775`, `/v23`, ...; ver
+`calculadora/variantes.py`) y `/` abre la más reciente. A diferencia de
+lanzar un `streamlit run` por variante, el proceso es uno solo: el núcleo se
+importa una vez y el esquema de la base, el cliente de OpenAI y la caché de
+reportes quedan calientes para todas.
+"""
+import streamlit as st
+
+from calculadora.variantes import VARIANTES, ruta_script
+
+paginas = [
+    st.Page(ruta_script(archivo), url_path=ruta, default=(i == 0))
+    for i, (ruta, archivo) in enumerate(VARIANTES)
+]
+# Sin menú lateral: cada variante se abre por su URL, como cuando era su propia app
+st.navigation(paginas, position="hidden").run()